@@ -0,0 +1,100 @@
+#
+# annotation_io.py
+# arma-rs-utils
+#
+# 편집된 어노테이션을 Refined CSV 형식으로 저장합니다.
+# ArmaViewer의 'Save Annotations'와 벤치마크(benchmark.py)가 같은 코드를 사용하도록 Qt와 분리했습니다.
+# 수정된 행은 ID로 한 번에 정렬(get_indexer)해서 반영하고, 파일은 임시 파일에 쓴 뒤 이름을 바꿔서(os.replace) 원자적으로 교체합니다.
+#
+import os
+import threading
+from pathlib import Path
+from typing import Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+
+from annotation_object import AnnotationStore, POINT_COLUMNS
+
+
+def modified_csv_path(csv_path: Path) -> Path:
+    """원본 'Refined-EO_<씬>_<뷰>.csv' 옆의 '<이름>_modified.csv' 경로."""
+    csv_path = Path(csv_path)
+    return csv_path.parent / f"{csv_path.stem}_modified.csv"
+
+
+def store_updates(store: AnnotationStore) -> Tuple[np.ndarray, np.ndarray]:
+    """저장소에서 수정된 행의 (ID, 변환된 꼭짓점 (K, 4, 2))를 한 번에 꺼냅니다."""
+    rows = np.flatnonzero(store.modified)
+    return store.ids[rows], store.transformed_points()[rows]
+
+
+def apply_point_updates(csv_data: pd.DataFrame, ids, points: np.ndarray) -> pd.DataFrame:
+    """
+    ids 객체의 꼭짓점과 중심 좌표를 정수로 반올림하여 csv_data 복사본에 한 번에 반영합니다.
+    csv_data에는 'id' 컬럼이 있어야 합니다. DataFrame에 없는 ID는 경고만 출력하고 건너뜁니다.
+    같은 ID가 여러 번 수정 목록에 있으면 마지막 값을, CSV에 같은 ID 행이 여러 개 있으면 모두 갱신합니다.
+    """
+    df = csv_data.copy()
+    if not len(ids): return df
+    points = np.asarray(points, dtype=np.float64).reshape(len(ids), 4, 2)
+    update_ids = pd.Index(ids)
+    keep = ~update_ids.duplicated(keep='last')
+    update_ids, points = update_ids[keep], points[keep]
+
+    # CSV 행마다 대응하는 수정 행 위치 (없으면 -1)
+    source = update_ids.get_indexer(df['id'])
+    rows = np.flatnonzero(source >= 0)
+    missing = update_ids[~update_ids.isin(df['id'])]
+    for obj_id in missing:
+        print(f"경고: DataFrame에서 ID '{obj_id}'를 찾을 수 없어 업데이트를 건너뜁니다.")
+    if not len(rows): return df
+
+    # 각 좌표를 반올림하여 가장 가까운 정수로 저장합니다 (파이썬 round와 같은 짝수 반올림).
+    matched = points[source[rows]]
+    values = np.concatenate([np.rint(matched.reshape(-1, 8)), np.rint(matched.mean(axis=1))], axis=1).astype(np.int64)
+    columns = POINT_COLUMNS + ['cx', 'cy']
+    for column in columns:
+        if column not in df.columns: df[column] = np.nan
+    column_positions = [df.columns.get_loc(c) for c in columns]
+    for position, column_values in zip(column_positions, values.T):
+        df.iloc[rows, position] = column_values
+    return df
+
+
+def apply_modifications(csv_data: pd.DataFrame, modified_objects: Iterable) -> pd.DataFrame:
+    """수정된 AnnotationObject들을 csv_data 복사본에 반영합니다 (apply_point_updates 참고)."""
+    modified_objects = list(modified_objects)
+    ids = [obj.id for obj in modified_objects]
+    points = np.array([obj.get_transformed_points() for obj in modified_objects], dtype=np.float64).reshape(-1, 4, 2)
+    return apply_point_updates(csv_data, ids, points)
+
+
+def write_csv_atomic(df: pd.DataFrame, path: Path):
+    """같은 폴더의 임시 파일에 쓴 뒤 os.replace로 바꿔서, 저장 중 중단되어도 이전 파일이나 새 파일 중 하나만 남게 합니다."""
+    path = Path(path)
+    tmp_path = path.parent / f'.{path.name}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def save_modified_annotations(csv_data: pd.DataFrame, modified_objects: Iterable, csv_path: Path) -> Path:
+    """수정 사항을 반영한 CSV를 '<원본 이름>_modified.csv'로 저장하고 저장한 경로를 반환합니다."""
+    save_path = modified_csv_path(csv_path)
+    write_csv_atomic(apply_modifications(csv_data, modified_objects), save_path)
+    return save_path
+
+
+def save_store(csv_data: pd.DataFrame, store: AnnotationStore, csv_path: Path) -> Path:
+    """저장소의 수정된 행 전체를 '<원본 이름>_modified.csv'로 저장합니다 (객체 리스트를 만들지 않는 경로)."""
+    save_path = modified_csv_path(csv_path)
+    ids, points = store_updates(store)
+    write_csv_atomic(apply_point_updates(csv_data, ids, points), save_path)
+    return save_path
@@ -1,74 +1,320 @@
 # annotation_object.py
 
-import numpy as np
-import pandas as pd
-from typing import Dict, Any
-
 import numpy as np
 import pandas as pd
 import cv2 # cv2.pointPolygonTest 사용을 위해 추가
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+
+import perf
+from spatial_index import GridIndex
+
+POINT_COLUMNS = ['x1', 'y1', 'x2', 'y2', 'x3', 'y3', 'x4', 'y4']
+
+# usable 컬럼 코드 ('T' / 'F' / 그 외)
+USABLE_TRUE, USABLE_FALSE, USABLE_UNKNOWN = 1, 0, -1
+
+
+def _column_or_default(df: pd.DataFrame, columns: List[str], default: float) -> np.ndarray:
+    """지정한 컬럼들을 float 배열로 가져옵니다. 컬럼이 없으면 default 값으로 채웁니다 (기존 row.get(col, default)와 동일)."""
+    return df.reindex(columns=columns, fill_value=default).to_numpy(dtype=np.float64)
+
+
+def transform_points(points: np.ndarray, translation: np.ndarray, scale: np.ndarray, angle_deg: np.ndarray) -> np.ndarray:
+    """
+    (K, 4, 2) 폴리곤들에 스케일 -> 회전 -> 이동을 한 번에 적용합니다.
+    AnnotationObject.get_transformed_points()와 같은 수식(중심 기준 스케일, 행 벡터 x 회전 행렬)을 벡터화한 것입니다.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    centers = points.mean(axis=1, keepdims=True)
+    scaled = (points - centers) * np.asarray(scale, dtype=np.float64)[:, None, :]
+    angle_rad = np.deg2rad(np.asarray(angle_deg, dtype=np.float64))[:, None]
+    cos, sin = np.cos(angle_rad), np.sin(angle_rad)
+    x, y = scaled[..., 0], scaled[..., 1]
+    rotated = np.stack([x * cos + y * sin, -x * sin + y * cos], axis=-1)
+    return rotated + centers + np.asarray(translation, dtype=np.float64)[:, None, :]
+
+
+def unrotate(vectors: np.ndarray, angle_deg) -> np.ndarray:
+    """transform_points의 회전을 되돌립니다: 이미지 좌표의 벡터 (..., 2)를 객체의 회전 전(스케일 축) 좌표로 옮깁니다."""
+    vectors = np.asarray(vectors, dtype=np.float64)
+    angle_rad = np.deg2rad(np.asarray(angle_deg, dtype=np.float64))
+    cos, sin = np.cos(angle_rad), np.sin(angle_rad)
+    x, y = vectors[..., 0], vectors[..., 1]
+    return np.stack([x * cos - y * sin, x * sin + y * cos], axis=-1)
+
+
+class AnnotationStore:
+    """
+    뷰 하나(CSV 하나)의 어노테이션 전체를 열 단위 NumPy 배열(structure-of-arrays)로 보관합니다.
+    행마다 AnnotationObject/pd.Series를 만들지 않고 DataFrame에서 한 번에 변환합니다.
+
+    points: (N, 4, 2) 원본 좌표, translation: (N, 2), scale: (N, 2), angle: (N,) degree,
+    selected / modified: (N,) bool, usable: (N,) int8 (USABLE_TRUE / USABLE_FALSE / USABLE_UNKNOWN)
+    """
+    def __init__(self, n: int = 0, parent_viewer: Optional[Any] = None):
+        self.ids = np.empty(n, dtype=object)
+        self.points = np.zeros((n, 4, 2), dtype=np.float32)
+        self.translation = np.zeros((n, 2), dtype=np.float32)
+        self.scale = np.ones((n, 2), dtype=np.float32)
+        self.angle = np.zeros(n, dtype=np.float64)
+        self.selected = np.zeros(n, dtype=bool)
+        self.modified = np.zeros(n, dtype=bool)
+        self.usable = np.full(n, USABLE_TRUE, dtype=np.int8)
+        self.main_class = np.empty(n, dtype=object)
+        self.middle_class = np.empty(n, dtype=object)
+        self.source: Optional[pd.DataFrame] = None # 원본 DataFrame (row_data 호환용)
+        self.parent_viewer = parent_viewer
+        self.__objects: Optional[List['AnnotationObject']] = None
+        # 변환 결과 메모이제이션: 행별 입력(원본 좌표, 이동, 스케일, 각도)이 바뀐 행만 다시 계산합니다.
+        self.__cached_inputs: Optional[np.ndarray] = None
+        self.__transformed = np.zeros((n, 4, 2), dtype=np.float64)
+        self.__centers = np.zeros((n, 2), dtype=np.float64)
+        self.__bounds = np.zeros((n, 4), dtype=np.float64)
+        # 클릭 hit-test용 공간 인덱스 (처음 필요할 때 생성, 이후 변경된 행만 갱신)
+        self.__index: Optional[GridIndex] = None
+        self.__index_pending = set()
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    @perf.timed('annotation_build')
+    def from_dataframe(cls, df: Optional[pd.DataFrame], parent_viewer: Optional[Any] = None) -> 'AnnotationStore':
+        if df is None or df.empty:
+            return cls(0, parent_viewer)
+
+        n = len(df)
+        store = cls(n, parent_viewer)
+        store.source = df
 
-class AnnotationObject:
-    def __init__(self, row_data: pd.Series, parent_viewer: Optional[Any] = None):
-        # row_data (pandas Series)는 CSV의 한 행 데이터를 담고 있습니다.
-        self.row_data = row_data
-        
         # 'id' 컬럼이 있으면 사용하고, 없으면 새로운 고유 ID를 생성합니다.
-        self.id = row_data['id'] if 'id' in row_data else f"new_obj_{id(self)}"
-        
-        # 원본 8개 좌표 (x1, y1, ..., x4, y4)를 추출하여 NumPy 배열로 저장합니다.
-        # .get()을 사용하여 컬럼이 없을 경우 기본값 0.0을 사용합니다.
-        points_cols = ['x1', 'y1', 'x2', 'y2', 'x3', 'y3', 'x4', 'y4']
-        self.original_points = np.array([row_data.get(col, 0.0) for col in points_cols], dtype=np.float32).reshape(4, 2)
-
-        # 객체의 선택 및 수정 상태를 나타내는 플래그
-        self.is_selected = False
-        self.is_modified = False
-        
-        # 객체별 변환 상태를 초기화합니다.
-        # CSV 데이터에 'tx', 'ty', 'sw', 'sh', 'angle' 컬럼이 있다면 그 값을 사용하고,
-        # 없으면 기본값 (0.0, 1.0, 0.0)으로 초기화합니다.
-        self.translation = np.array([row_data.get('tx', 0.0), row_data.get('ty', 0.0)], dtype=np.float32)
-        self.scale = np.array([row_data.get('sw', 1.0), row_data.get('sh', 1.0)], dtype=np.float32)
-        self.rotation_angle = float(row_data.get('angle', 0.0)) # 각도 (degree)
+        if 'id' in df.columns:
+            store.ids = df['id'].to_numpy(dtype=object)
+        else:
+            store.ids = np.array([f"new_obj_{i}" for i in range(n)], dtype=object)
+
+        store.points = _column_or_default(df, POINT_COLUMNS, 0.0).astype(np.float32).reshape(n, 4, 2)
+        # CSV 데이터에 'tx', 'ty', 'sw', 'sh', 'angle' 컬럼이 있다면 그 값을 사용하고, 없으면 기본값으로 초기화합니다.
+        store.translation = _column_or_default(df, ['tx', 'ty'], 0.0).astype(np.float32)
+        store.scale = _column_or_default(df, ['sw', 'sh'], 1.0).astype(np.float32)
+        store.angle = _column_or_default(df, ['angle'], 0.0)[:, 0].copy()
+
+        if 'usable' in df.columns:
+            usable = df['usable'].to_numpy(dtype=object)
+            store.usable = np.where(usable == 'T', USABLE_TRUE,
+                                    np.where(usable == 'F', USABLE_FALSE, USABLE_UNKNOWN)).astype(np.int8)
+
+        store.main_class = df['main_class'].to_numpy(dtype=object) if 'main_class' in df.columns else np.full(n, None, dtype=object)
+        store.middle_class = df['middle_class'].to_numpy(dtype=object) if 'middle_class' in df.columns else np.full(n, None, dtype=object)
+        return store
+
+    def copy(self) -> 'AnnotationStore':
+        """배열을 복사한 독립된 저장소 (미리보기, 백그라운드 저장용 스냅샷). source DataFrame은 공유합니다."""
+        store = AnnotationStore(0, self.parent_viewer)
+        for name in ('ids', 'points', 'translation', 'scale', 'angle', 'selected', 'modified', 'usable',
+                     'main_class', 'middle_class'):
+            setattr(store, name, getattr(self, name).copy())
+        store.source = self.source
+        return store
+
+    def objects(self) -> List['AnnotationObject']:
+        """각 행에 대한 가벼운 AnnotationObject 뷰 리스트 (한 번만 생성)."""
+        if self.__objects is None:
+            self.__objects = [AnnotationObject(self, i, self.parent_viewer) for i in range(len(self))]
+        return self.__objects
+
+    def __transform_inputs(self) -> np.ndarray:
+        n = len(self)
+        return np.concatenate([self.points.reshape(n, 8), self.translation, self.scale,
+                               self.angle.reshape(n, 1)], axis=1).astype(np.float64)
+
+    def __refresh_transforms(self) -> np.ndarray:
+        """입력이 바뀐 행의 변환 좌표/중심/AABB를 다시 계산하고, 다시 계산된 행 인덱스를 반환합니다."""
+        inputs = self.__transform_inputs()
+        if self.__cached_inputs is None or self.__cached_inputs.shape != inputs.shape:
+            self.__transformed = np.zeros((len(self), 4, 2), dtype=np.float64)
+            self.__centers = np.zeros((len(self), 2), dtype=np.float64)
+            self.__bounds = np.zeros((len(self), 4), dtype=np.float64)
+            dirty = np.arange(len(self))
+            self.__index = None
+        else:
+            changed = (inputs != self.__cached_inputs) & ~(np.isnan(inputs) & np.isnan(self.__cached_inputs))
+            dirty = np.flatnonzero(changed.any(axis=1))
+        if len(dirty):
+            transformed = transform_points(self.points[dirty], self.translation[dirty], self.scale[dirty], self.angle[dirty])
+            self.__transformed[dirty] = transformed
+            self.__centers[dirty] = transformed.mean(axis=1)
+            self.__bounds[dirty] = np.concatenate([transformed.min(axis=1), transformed.max(axis=1)], axis=1)
+        self.__cached_inputs = inputs
+        if self.__index is not None and len(dirty):
+            self.__index_pending.update(dirty.tolist())
+        return dirty
+
+    def spatial_index(self) -> GridIndex:
+        """변환된 AABB에 대한 격자 인덱스. 마지막 조회 이후 움직인 객체만 다시 등록합니다."""
+        self.__refresh_transforms()
+        if self.__index is None:
+            self.__index = GridIndex()
+            self.__index.build(self.__bounds)
+            self.__index_pending.clear()
+        elif self.__index_pending:
+            self.__index.update(self.__index_pending, self.__bounds)
+            self.__index_pending.clear()
+        return self.__index
+
+    def invalidate(self):
+        """메모이즈된 변환 결과를 모두 버립니다."""
+        self.__cached_inputs = None
+
+    def transformed_points(self) -> np.ndarray:
+        """모든 객체의 변환된 폴리곤 (N, 4, 2). 반환 배열은 읽기 전용으로 취급해야 합니다."""
+        self.__refresh_transforms()
+        return self.__transformed
+
+    def centers(self) -> np.ndarray:
+        """변환된 폴리곤의 중심 (N, 2)."""
+        self.__refresh_transforms()
+        return self.__centers
 
+    def bounds(self) -> np.ndarray:
+        """변환된 폴리곤의 AABB (N, 4): min_x, min_y, max_x, max_y."""
+        self.__refresh_transforms()
+        return self.__bounds
+
+    def hit_test(self, point) -> Optional[int]:
+        """
+        point를 포함하는 객체의 인덱스를 반환합니다. 여러 개가 겹치면 나중에 그려진(인덱스가 큰) 객체가 우선합니다.
+        공간 인덱스와 AABB로 후보를 먼저 거른 뒤 후보에 대해서만 cv2.pointPolygonTest를 수행합니다.
+        """
+        if not len(self): return None
+        index = self.spatial_index()
+        polygons, bounds = self.__transformed, self.__bounds
+        px, py = int(point[0]), int(point[1])
+        # 폴리곤은 int로 잘라서 검사하므로 1px 여유를 둡니다.
+        candidates = index.query_rect(px - 1, py - 1, px + 1, py + 1)
+        candidates = candidates[(bounds[candidates, 0] - 1 <= px) & (px <= bounds[candidates, 2] + 1) &
+                                (bounds[candidates, 1] - 1 <= py) & (py <= bounds[candidates, 3] + 1)]
+        for i in candidates[::-1]:
+            if cv2.pointPolygonTest(polygons[i].astype(np.int32), (px, py), False) >= 0:
+                return int(i)
+        return None
+
+    def query_box(self, min_x: float, min_y: float, max_x: float, max_y: float) -> np.ndarray:
+        """변환된 AABB가 사각형 안에 완전히 들어오는 객체의 인덱스 (러버밴드 선택). 공간 인덱스로 후보를 먼저 거릅니다."""
+        if not len(self): return np.empty(0, dtype=np.int64)
+        candidates = self.spatial_index().query_rect(min_x, min_y, max_x, max_y)
+        bounds = self.__bounds[candidates]
+        inside = (bounds[:, 0] >= min_x) & (bounds[:, 1] >= min_y) & (bounds[:, 2] <= max_x) & (bounds[:, 3] <= max_y)
+        return candidates[inside]
+
+    def selected_indices(self) -> np.ndarray:
+        return np.flatnonzero(self.selected)
+
+    def adjust(self, indices, param_type: str, value: float):
+        """
+        indices 행들의 tx / ty / sw / sh / angle에 value를 한 번에 더하고 수정됨으로 표시합니다.
+        스케일은 텍스트 입력과 같이 0.01 아래로 내려가지 않습니다.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        if param_type in ('tx', 'ty'):
+            self.translation[indices, 'xy'.index(param_type[1])] += value
+        elif param_type in ('sw', 'sh'):
+            axis = 'wh'.index(param_type[1])
+            self.scale[indices, axis] = np.maximum(0.01, self.scale[indices, axis] + value)
+        elif param_type == 'angle':
+            self.angle[indices] += value
+        else:
+            raise ValueError(f'알 수 없는 변환 항목: {param_type}')
+        self.modified[indices] = True
+
+    def visible_mask(self, show_true: bool, show_false: bool) -> np.ndarray:
+        """Usable 체크박스(True/False) 상태에 따라 화면에 표시할 행의 마스크를 반환합니다."""
+        return (show_true & (self.usable == USABLE_TRUE)) | (show_false & (self.usable == USABLE_FALSE))
+
+
+class AnnotationObject:
+    """
+    AnnotationStore의 한 행을 가리키는 가벼운 뷰입니다.
+    translation / scale / original_points는 store 배열의 view를 반환하므로 obj.translation[0] += 1 처럼 직접 수정할 수 있습니다.
+    """
+    __slots__ = ('store', 'index', 'parent_viewer')
+
+    def __init__(self, store: AnnotationStore, index: int, parent_viewer: Optional[Any] = None):
+        self.store = store
+        self.index = index
         # 부모 뷰어 인스턴스를 저장합니다 (필요한 경우 사용).
-        self.parent_viewer = parent_viewer 
+        self.parent_viewer = parent_viewer
+
+    @classmethod
+    def from_row(cls, row_data: pd.Series, parent_viewer: Optional[Any] = None) -> 'AnnotationObject':
+        """CSV의 한 행(pandas Series)으로부터 단독 객체를 만듭니다."""
+        store = AnnotationStore.from_dataframe(row_data.to_frame().T.infer_objects(), parent_viewer)
+        return store.objects()[0]
+
+    @property
+    def id(self): return self.store.ids[self.index]
+
+    @property
+    def row_data(self) -> pd.Series:
+        # 호환용: 원본 CSV 행을 필요할 때만 만들어 반환합니다.
+        return self.store.source.iloc[self.index]
+
+    @property
+    def main_class(self): return self.store.main_class[self.index]
+
+    @property
+    def middle_class(self): return self.store.middle_class[self.index]
+
+    @property
+    def usable(self) -> int: return int(self.store.usable[self.index])
+
+    @property
+    def original_points(self) -> np.ndarray: return self.store.points[self.index]
+
+    @original_points.setter
+    def original_points(self, value): self.store.points[self.index] = value
+
+    @property
+    def translation(self) -> np.ndarray: return self.store.translation[self.index]
+
+    @translation.setter
+    def translation(self, value): self.store.translation[self.index] = value
+
+    @property
+    def scale(self) -> np.ndarray: return self.store.scale[self.index]
+
+    @scale.setter
+    def scale(self, value): self.store.scale[self.index] = value
+
+    @property
+    def rotation_angle(self) -> float: return float(self.store.angle[self.index])
+
+    @rotation_angle.setter
+    def rotation_angle(self, value): self.store.angle[self.index] = value
+
+    @property
+    def is_selected(self) -> bool: return bool(self.store.selected[self.index])
+
+    @is_selected.setter
+    def is_selected(self, value): self.store.selected[self.index] = value
+
+    @property
+    def is_modified(self) -> bool: return bool(self.store.modified[self.index])
+
+    @is_modified.setter
+    def is_modified(self, value): self.store.modified[self.index] = value
 
     def get_transformed_points(self):
-        """현재 객체의 변환 상태를 반영하여 8개 좌표를 계산하여 반환합니다."""
-        tx, ty = self.translation[0], self.translation[1]
-        sw, sh = self.scale[0], self.scale[1]
-        angle_rad = np.deg2rad(self.rotation_angle) # 각도를 라디안으로 변환
-
-        # 1. 원본 좌표의 중심을 계산합니다.
-        center_x, center_y = np.mean(self.original_points, axis=0)
-        # 2. 중심을 (0,0)으로 이동합니다.
-        temp_points = self.original_points - np.array([center_x, center_y])
-
-        # 3. 스케일 변환 행렬을 적용합니다.
-        scale_matrix = np.array([[sw, 0], [0, sh]])
-        scaled_points = np.dot(temp_points, scale_matrix)
-
-        # 4. 회전 변환 행렬을 적용합니다.
-        rotation_matrix = np.array([
-            [np.cos(angle_rad), -np.sin(angle_rad)],
-            [np.sin(angle_rad), np.cos(angle_rad)]
-        ])
-        rotated_points = np.dot(scaled_points, rotation_matrix)
-
-        # 5. 다시 원래 중심으로 이동하고, 최종 이동(translate) 값을 적용합니다.
-        transformed_points = rotated_points + np.array([center_x + tx, center_y + ty])
-        
-        # 변환된 좌표는 float 형태로 유지하고 반환합니다.
-        # int 변환은 그릴 때나 특정 연산에 필요할 때 수행하는 것이 좋습니다.
-        return transformed_points 
+        """현재 객체의 변환 상태를 반영한 4개 꼭짓점 좌표를 반환합니다 (이 행만 계산하므로 객체 수와 무관)."""
+        i = self.index
+        store = self.store
+        return transform_points(store.points[i:i + 1], store.translation[i:i + 1], store.scale[i:i + 1],
+                                store.angle[i:i + 1])[0]
 
     def reset_transform(self):
         """이 객체의 변환 상태(이동, 스케일, 회전)를 초기값으로 리셋합니다."""
-        self.translation = np.array([0.0, 0.0], dtype=np.float32)
-        self.scale = np.array([1.0, 1.0], dtype=np.float32)
+        self.translation = (0.0, 0.0)
+        self.scale = (1.0, 1.0)
         self.rotation_angle = 0.0
         self.is_modified = False
 
@@ -79,18 +325,18 @@ class AnnotationObject:
     def check_selection(self, point):
         """주어진 점(point)이 현재 변환된 BBOX 내부에 있는지 확인합니다."""
         transformed_points = self.get_transformed_points()
-        
+
         # cv2.pointPolygonTest는 정수 좌표를 기대하므로 변환된 좌표를 int로 캐스팅합니다.
         polygon = transformed_points.astype(np.int32)
-        
+
         # cv2.pointPolygonTest를 사용하여 점이 폴리곤 내부에 있는지 확인합니다.
         # return 값은 내부에 있으면 양수, 외부에 있으면 음수, 선 위에 있으면 0입니다.
         result = cv2.pointPolygonTest(polygon, (int(point[0]), int(point[1])), False)
         return result >= 0 # 내부에 있거나 선 위에 있으면 True
-        
+
     def apply_transform_to_original(self):
         """현재 변환된 상태를 original_points에 적용하고 변환을 리셋합니다."""
         # 현재 변환된 좌표를 새로운 원본 좌표로 설정합니다.
-        self.original_points = self.get_transformed_points().astype(np.float32) 
+        self.original_points = self.get_transformed_points().astype(np.float32)
         self.reset_transform() # 변환 상태는 초기화됩니다.
-        self.is_modified = False # 수정 완료 후 수정 상태를 해제합니다.
\ No newline at end of file
+        self.is_modified = False # 수정 완료 후 수정 상태를 해제합니다.
@@ -0,0 +1,51 @@
+#
+# annotation_writer.py
+# arma-rs-utils
+#
+# 수정된 어노테이션 CSV를 GUI 스레드 밖에서 저장합니다. 작업은 한 개의 워커 스레드에서 순서대로 처리되며,
+# 한 번 제출한 묶음(여러 뷰)이 모두 끝나면 saved 시그널을 보냅니다 (SceneLoader와 같이 Qt가 GUI 스레드로 큐잉).
+# 각 파일은 annotation_io.save_store로 한 번에 갱신해서 임시 파일 + 이름 바꾸기로 원자적으로 씁니다.
+#
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Hashable, List, Optional, Tuple
+
+import pandas as pd
+from PyQt5.QtCore import QObject, pyqtSignal
+
+import annotation_io
+import perf
+from annotation_object import AnnotationStore
+
+SaveJob = Tuple[Hashable, pd.DataFrame, AnnotationStore, Path] # (뷰 키, 원본 CSV, 저장소 스냅샷, 원본 CSV 경로)
+
+
+class AnnotationWriter(QObject):
+    saved = pyqtSignal(int, object) # 묶음 번호, [(뷰 키, 저장 경로 또는 None, 수정 객체 수, 오류 메시지 또는 None)]
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.__executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='annotation-writer')
+        self.__batch = 0
+
+    def submit(self, jobs: List[SaveJob]) -> int:
+        """jobs를 한 번에 백그라운드로 저장하고 묶음 번호를 반환합니다. 저장소는 호출 측에서 copy()한 스냅샷이어야 합니다."""
+        self.__batch += 1
+        batch = self.__batch
+        self.__executor.submit(self.__run, batch, list(jobs))
+        return batch
+
+    def __run(self, batch: int, jobs: List[SaveJob]):
+        results = []
+        for key, csv_data, store, csv_path in jobs:
+            count = int(store.modified.sum())
+            try:
+                with perf.span('save'):
+                    save_path = annotation_io.save_store(csv_data, store, csv_path)
+                results.append((key, save_path, count, None))
+            except Exception as e: # 한 뷰의 실패가 나머지 저장을 막지 않도록 합니다.
+                results.append((key, None, count, str(e)))
+        self.saved.emit(batch, results)
+
+    def shutdown(self, wait: bool = True):
+        self.__executor.shutdown(wait=wait)
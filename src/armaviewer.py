@@ -13,14 +13,28 @@ import cv2
 import numpy as np
 import pandas as pd
 import qimage2ndarray as q2n
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt, QTimer, QEvent, QRect, QSize
 from PyQt5.QtGui import QPixmap, QIcon
 from PyQt5.QtWidgets import (QApplication, QWidget, QRadioButton, QGroupBox, QHBoxLayout, QVBoxLayout, QPushButton,
-                             QLabel, QCheckBox, QButtonGroup, QInputDialog, QSizePolicy, QListWidgetItem, QLineEdit, QFileDialog, QListWidget, QMessageBox)
+                             QLabel, QCheckBox, QButtonGroup, QInputDialog, QSizePolicy, QListWidgetItem, QLineEdit, QFileDialog, QListWidget, QMessageBox,
+                             QRubberBand, QDialog)
 from PyQt5.QtGui import QPixmap, QColor, QPainter, QPen, QFont, QIntValidator, QIcon
 import multiviewset as MVS
 import util
-from annotation_object import AnnotationObject # annotation_object.py가 필요합니다.
+from scene_loader import SceneLoader
+from render_cache import BaseLayerCache, EditLayerCache
+from tile_pyramid import TilePyramidCache
+from image_cache import default_cache_dir
+import perf
+import renderer
+import sweep_export
+from memory_budget import decoded_image, format_bytes, image_heap_bytes, image_state
+import vector_export
+from annotation_writer import AnnotationWriter
+from edit_journal import EditJournal
+from edit_session import EditSessions, apply_edits, plan_propagation
+from propagation_dialog import PREVIEW_WIDTH, PropagationDialog
+from annotation_object import AnnotationObject, AnnotationStore, unrotate # annotation_object.py가 필요합니다.
 
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
@@ -46,21 +60,16 @@ class ArmaViewer(QWidget):
             self.key_map = {
                 Qt.Key_A: self.goto_prev_scene, Qt.Key_D: self.goto_next_scene,
                 Qt.Key_W: self.goto_prev_view, Qt.Key_S: self.goto_next_view,
+                Qt.Key_R: self.reset_zoom,
+                Qt.Key_F11: self.save_perf_trace, Qt.Key_F12: self.toggle_perf_hud,
             }
-            self.FIXED_COLOR_STYLE = {
-                'Armored': [(244,67,54), '-'], 'Armored:APC': [(244,67,54), '-'], 'Armored:ASV': [(239,62,49), '--'],
-                'Armored:IFV': [(234,57,44), '-.'], 'Armored:MRAP': [(229,52,39), ':'], 'Artillery': [(255,51,204), '-'],
-                'Boat': [(156,39,176), '-'], 'Boat:Boat': [(156,39,176), '-'], 'Boat:RHIB': [(151,34,171), '--'],
-                'Helicopter': [(103,58,183), '-'], 'Helicopter:AH': [(103,58,183), '-'], 'Helicopter:CH': [(98,53,178), '--'],
-                'Helicopter:OH': [(93,48,173), '-.'], 'Helicopter:UH': [(88,43,168), ':'], 'LCU': [(63,81,181), '-'],
-                'MLRS': [(33,150,243), '-'], 'Plane': [(0,188,212), '-'], 'Plane:Attacker': [(0,188,212), '-'],
-                'Plane:Bomber': [(0,183,207), '--'], 'Plane:Cargo': [(0,178,202), '-.'], 'Plane:Fighter': [(0,173,197), ':'],
-                'RADAR': [(0,150,136), '-'], 'SAM': [(76,175,80), '-'], 'Self-propelled Artillery': [(139,195,74), '-'],
-                'Support': [(205,220,57), '-'], 'Support:Mil_car': [(205,220,57), '-'],
-                'Support:Mil_truck': [(200,215,52), '--'], 'Support:ASV':[(195,210,47), '-.'],
-                'Tank': [(255,122,0), '-'], 'TEL': [(121,85,72), '-'],
-            }
+            self.FIXED_COLOR_STYLE = renderer.FIXED_COLOR_STYLE
             self.dsize = (1280, 720)
+            self.num_workers = min(8, os.cpu_count() or 4) # 뷰 사전 로딩 스레드 수
+            self.image_cache_bytes = 4 * 1024 ** 3 # 디코딩된 EO 이미지 디스크 캐시 한도 (0이면 사용 안 함)
+            self.auto_plot_interval = 500 # Dynamic 재생 / 애니메이션 내보내기의 프레임 간격 (ms)
+            self.max_zoom = 16.0 # 프레임 전체 대비 최대 확대 배율
+            self.zoom_step = 1.25 # 휠 한 칸당 확대 배율
 
         def init_global_variables():
             self.ds: Optional[MVS.MultiViewSet] = None
@@ -69,7 +78,8 @@ class ArmaViewer(QWidget):
             self.auto_plot_timer = QTimer()
             self.auto_plot_index = 0
             self.angle = []
-            self.annotation_objects = []
+            self.annotation_store = AnnotationStore() # 현재 뷰의 어노테이션 (열 단위 저장소)
+            self.annotation_objects = [] # annotation_store의 행을 가리키는 AnnotationObject 뷰
             self.selected_object: Optional[AnnotationObject] = None
             self.transform_step = 1.0
             self.scale_step = 0.01
@@ -78,6 +88,39 @@ class ArmaViewer(QWidget):
             self.old_data_objects = [] # ★★★ Old Data BBOX를 위한 객체 리스트 ★★★
             self.current_display_objects = [] # AnnotationObject 인스턴스들을 저장할 리스트
             self.legend_widget = QListWidget(self) # 레전드 위젯 초기화
+            self.scene_loader = SceneLoader(self) # 씬 비동기 로더
+            self.scene_loader.view_loaded.connect(self.on_view_loaded)
+            self.scene_loader.scene_loaded.connect(self.on_scene_loaded)
+            self.prefetch_direction = 0
+            self.view_direction = 0 # 마지막 뷰 이동 방향 (W: -1, S: +1). lazy 모드의 미리 읽기 방향
+            self.base_layer_cache = BaseLayerCache() # 뷰별 BGR / 축소 배경 캐시
+            self.edit_layer_cache = EditLayerCache() # Edit 모드: 선택되지 않은 객체 레이어 (선택 객체만 바뀌면 그 영역만 다시 그림)
+            self.tile_pyramid_cache = TilePyramidCache() # 확대 표시용 타일 피라미드 (데이터셋을 열면 디스크 캐시 폴더 지정)
+            self.viewport = None # 확대 시 보이는 원본 영역 (x0, y0, w, h). None이면 프레임 전체
+            self.viewport_image_shape = None
+            self.pan_anchor = None # 드래그 이동 시작 위치 (lbl_img 좌표)
+            self.render_timer = QTimer(self) # 렌더링 요청을 이벤트 루프 한 틱 단위로 합칩니다.
+            self.render_timer.setSingleShot(True)
+            self.render_timer.setInterval(0)
+            self.render_timer.timeout.connect(self.render_now)
+            self.render_dirty = False
+            self.drag = None # Edit 모드 직접 조작: 모드('move' / 'scale' / 'rotate')와 시작 시점의 변환 값
+            self.drag_pos = None # 아직 반영하지 않은 마지막 마우스 위치 (원본 좌표)
+            self.drag_timer = QTimer(self) # 드래그 중 마우스 이동 반영을 화면 주사율로 제한합니다.
+            self.drag_timer.setSingleShot(True)
+            self.drag_timer.timeout.connect(self.apply_drag)
+            self.band_origin = None # 러버밴드 선택 시작 위치 (lbl_img 좌표)
+            self.edit_sessions = EditSessions() # (씬, 뷰)별 편집 중인 어노테이션 (뷰를 바꿔도 수정 유지)
+            self.annotation_writer = AnnotationWriter(self) # 수정된 CSV를 백그라운드에서 저장
+            self.annotation_writer.saved.connect(self.on_annotations_saved)
+            self.pending_saves = {} # 저장 묶음 번호 -> (제출 시점의 저널 seq, {뷰 키: 편집 상태})
+            self.edit_journal: Optional[EditJournal] = None # 저장하지 않은 편집 기록 (비정상 종료 시 복구)
+            self.render_requests = 0 # render_refined_scene 호출 수
+            self.frames_drawn = 0 # 실제로 그린 프레임 수
+            self.perf_hud = QLabel(self) # F12: 프레임 시간 / 캐시 적중률 표시
+            self.perf_hud.setStyleSheet('background-color: rgba(0, 0, 0, 170); color: #7CFC00; font-family: monospace; padding: 4px;')
+            self.perf_hud.setAttribute(Qt.WA_TransparentForMouseEvents)
+            self.perf_hud.hide()
 
         def init_lvl0_panel_widget():
             self.image_widget = QLabel(self)
@@ -149,8 +192,9 @@ class ArmaViewer(QWidget):
             self.view_mode_radio.setChecked(True)
 
             self.use_group = QButtonGroup()
-            self.usable_btngroup, self.label_btngroup, self.animate_btngroup = (QGroupBox(i) for i in ('Usable', 'Label', 'Animate'))
-            self.usable_box, self.label_box, self.animate_box = (QHBoxLayout() for _ in range(3))
+            self.usable_btngroup, self.label_btngroup, self.animate_btngroup, self.loading_btngroup = \
+                (QGroupBox(i) for i in ('Usable', 'Label', 'Animate', 'Loading'))
+            self.usable_box, self.label_box, self.animate_box, self.loading_box = (QHBoxLayout() for _ in range(4))
             self.t_check, self.f_check = (QCheckBox(i) for i in ('True', 'False'))
             
             # ★★★ 체크박스 UI 재정의 ★★★
@@ -158,6 +202,7 @@ class ArmaViewer(QWidget):
             self.center_check, self.obox_check, self.bbox_check, self.main_check, self.mid_check, self.id_check, self.show_original_box_check, self.old_obox_check = \
                 (QCheckBox(i, self) for i in label_titles) # <--- 여기 'self.old_obox_check'로 정확히 선언됩니다.
             self.static_radio, self.auto_radio = (QRadioButton(i) for i in ('Static', 'Dynamic'))
+            self.eager_radio, self.lazy_radio = (QRadioButton(i) for i in ('Eager', 'Lazy'))
 
         def lvl4_panel_widget_setting():
             self.mode_group.addButton(self.view_mode_radio, 0)
@@ -174,9 +219,7 @@ class ArmaViewer(QWidget):
             # ★★★ 모든 체크박스 연결 및 Old Data BBOX 초기화 ★★★
             for i, btn in enumerate([self.center_check, self.obox_check, self.bbox_check, self.main_check, self.mid_check, self.id_check, self.show_original_box_check, self.old_obox_check]): # <--- 이 부분!
                 self.label_box.addWidget(btn, alignment=Qt.AlignCenter)
-                btn.toggled.connect(self.checkbox_toggle)
-                btn.toggled.connect(self.render_refined_scene)
-                btn.toggled.connect(self.create_legend)
+                btn.toggled.connect(self.checkbox_toggle) # 레전드와 화면 갱신은 checkbox_toggle에서 한 번만 합니다.
                 
                 # Old Data BBOX 체크박스만 특별히
                 
@@ -193,6 +236,13 @@ class ArmaViewer(QWidget):
             self.static_radio.clicked.connect(lambda: self.auto_plot_timer.stop())
             self.auto_plot_timer.timeout.connect(self.auto_plot_step)
             self.auto_radio.clicked.connect(self.auto_plot)
+
+            # Eager: 씬 전환 시 모든 뷰를 디코딩 / Lazy: 보는 뷰만 디코딩하고 W/S 방향의 이웃 뷰를 미리 읽음
+            self.loading_btngroup.setLayout(self.loading_box)
+            self.loading_box.addWidget(self.eager_radio, alignment=Qt.AlignCenter)
+            self.loading_box.addWidget(self.lazy_radio, alignment=Qt.AlignCenter)
+            self.eager_radio.setChecked(True)
+            self.lazy_radio.toggled.connect(self.set_loading_mode)
         
         def init_lvl5_panel_widget():
             self.pixmap, self.lbl_img = QPixmap(), QLabel()
@@ -209,6 +259,7 @@ class ArmaViewer(QWidget):
             self.view_box.setFixedWidth(167)
             self.view_box.setFixedHeight(250)
             self.view_group.setExclusive(True)
+            self.view_group.buttonClicked[int].connect(self.goto_view)
 
         def init_lvl6_panel_widget():
             title = ('PNG', 'Save Annotations', 'Report Issue', 'Hello Out There')
@@ -221,9 +272,11 @@ class ArmaViewer(QWidget):
             self.save_anno_btn.setFixedWidth(120)
             for btn in (self.svg_save, self.pdf_save, self.gif_save):
                 btn.setFixedWidth(50)
-                btn.setEnabled(False)
 
             self.png_save.clicked.connect(self.save_png)
+            self.svg_save.clicked.connect(lambda: self.save_vector('svg'))
+            self.pdf_save.clicked.connect(lambda: self.save_vector('pdf'))
+            self.gif_save.clicked.connect(self.save_gif)
             self.save_anno_btn.clicked.connect(self.save_modified_annotations)
             self.report.clicked.connect(self.create_report_dialog)
             self.extra.clicked.connect(util.create_extra_dialog)
@@ -270,6 +323,8 @@ class ArmaViewer(QWidget):
 
             for layout in [self.tx_layout, self.ty_layout, self.sw_layout, self.sh_layout, self.rot_layout]:
                 main_layout.addLayout(layout)
+            self.propagate_btn = QPushButton("Propagate to Views", self) # 선택 객체의 보정 값을 다른 뷰의 같은 ID에 적용
+            main_layout.addWidget(self.propagate_btn)
             
             self.transform_box.setLayout(main_layout)
             self.transform_box.setFixedWidth(250)
@@ -292,6 +347,7 @@ class ArmaViewer(QWidget):
             self.sw_edit.editingFinished.connect(lambda: self.apply_transform_from_text_edit('sw', self.sw_edit.text()))
             self.sh_edit.editingFinished.connect(lambda: self.apply_transform_from_text_edit('sh', self.sh_edit.text()))
             self.rot_edit.editingFinished.connect(lambda: self.apply_transform_from_text_edit('angle', self.rot_edit.text()))
+            self.propagate_btn.clicked.connect(self.propagate_selection)
 
         init_ui_settings_constants()
         init_global_constants()
@@ -360,6 +416,7 @@ class ArmaViewer(QWidget):
         self.lvl4.addWidget(self.label_btngroup, alignment=Qt.AlignCenter)
         self.lvl4.addStretch(1)
         self.lvl4.addWidget(self.animate_btngroup, alignment=Qt.AlignCenter)
+        self.lvl4.addWidget(self.loading_btngroup, alignment=Qt.AlignCenter)
         self.lvl4.addSpacing(self.side_space)
 
         extra_box = QVBoxLayout()
@@ -372,6 +429,11 @@ class ArmaViewer(QWidget):
         self.lbl_img = QLabel(self)
         self.lbl_img.setScaledContents(True)
         self.lbl_img.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.lbl_img.installEventFilter(self) # 휠 확대 / 드래그 이동
+        self.perf_hud.setParent(self.lbl_img) # 이미지 왼쪽 위에 겹쳐 표시
+        self.perf_hud.move(6, 6)
+        self.perf_hud.hide()
+        self.rubber_band = QRubberBand(QRubberBand.Rectangle, self.lbl_img) # Edit 모드 영역 선택
         self.lvl5.addWidget(self.lbl_img, alignment=Qt.AlignCenter)
         self.lvl5.addStretch(1)
         self.lvl5.addLayout(extra_box)
@@ -379,6 +441,9 @@ class ArmaViewer(QWidget):
 
         self.lvl6.addSpacing(self.side_space)
         self.lvl6.addWidget(self.png_save, alignment=Qt.AlignCenter)
+        self.lvl6.addWidget(self.svg_save, alignment=Qt.AlignCenter)
+        self.lvl6.addWidget(self.pdf_save, alignment=Qt.AlignCenter)
+        self.lvl6.addWidget(self.gif_save, alignment=Qt.AlignCenter)
         self.lvl6.addWidget(self.save_anno_btn)
         self.lvl6.addStretch(1)
         self.lvl6.addWidget(self.indicator, alignment=Qt.AlignCenter)
@@ -413,6 +478,10 @@ class ArmaViewer(QWidget):
                 return
 
             preloaded_data = self.ds.get_preloaded_data_for_current_view()
+            if not preloaded_data and self.scene_loader.is_loading():
+                # 아직 로딩 중인 뷰: 로딩이 끝나면 change_image_at_view에서 다시 호출됩니다.
+                self.render_refined_scene()
+                return
             if not preloaded_data or preloaded_data['csv'] is None:
                 QMessageBox.warning(self, "경고", "현재 뷰의 CSV 데이터를 찾을 수 없습니다.")
                 self.old_obox_check.setChecked(False)
@@ -421,8 +490,8 @@ class ArmaViewer(QWidget):
                 self.create_legend()
                 return
 
-            csv_data = preloaded_data['csv']
-            if 'x1_old' not in csv_data.columns:
+            old_boxes = renderer.load_old_boxes(preloaded_data['csv'])
+            if old_boxes is None:
                 QMessageBox.information(self, "정보", "현재 CSV 파일에 'old' 데이터가 없습니다.")
                 self.old_obox_check.setChecked(False)
                 # 이 경우 old 데이터가 없으므로 체크박스 해제 후 화면 갱신 및 레전드 업데이트
@@ -430,20 +499,8 @@ class ArmaViewer(QWidget):
                 self.create_legend()
                 return
 
-            for idx, row in csv_data.iterrows():
-                if pd.notna(row.get('x1_old')):
-                    old_obj = {
-                        'points': np.array([
-                            [row['x1_old'], row['y1_old']],
-                            [row['x2_old'], row['y2_old']],
-                            [row['x3_old'], row['y3_old']],
-                            [row['x4_old'], row['y4_old']]
-                        ], dtype=np.int32),
-                        'id': row.get('id', f'obj_{idx}')
-                    }
-                    self.old_data_objects.append(old_obj)
+            self.old_data_objects = old_boxes
 
-            
         # 'checked'가 False이면, 위에서 이미 self.old_data_objects가 비워졌으므로 추가 작업 불필요.
 
         self.render_refined_scene() # 화면 다시 그리기
@@ -460,31 +517,159 @@ class ArmaViewer(QWidget):
             return
 
         try:
-            self.ds = MVS.MultiViewSet()
+            self.scene_loader.cancel()
+            if self.ds is not None: self.ds.shutdown()
+            self.ds = MVS.MultiViewSet(num_workers=self.num_workers, image_cache_bytes=self.image_cache_bytes,
+                                       lazy_loading=self.lazy_radio.isChecked())
+            self.tile_pyramid_cache = TilePyramidCache(pth.join(default_cache_dir(input_path), 'tiles'))
+            self.edit_sessions.clear()
+            if self.edit_journal is not None: self.edit_journal.close()
+            self.edit_journal = EditJournal(pth.join(default_cache_dir(input_path), 'edit_journal.jsonl'))
+            self.viewport = None
             self.ds.set_path_and_name(input_path)
             self.ds.update_best_view_idx()
-            self.num_of_scene_lbl.setText(f'# of Scenes : {util.count_legit_folder(self.ds.get_set_path())}')
-            self.ds.preload_scene_data()
-            self.change_image_at_scene()
+            self.recover_edit_journal()
+            self.num_of_scene_lbl.setText(f'# of Scenes : {len(self.ds.get_scene_name_list())}')
             self.set_mode(0)
+            self.request_scene_load(1)
         except Exception as e:
             print(f"데이터셋 파싱 중 오류 발생: {e}")
             import traceback
             traceback.print_exc()
             QMessageBox.critical(self, "오류", f"데이터셋 파싱 중 오류가 발생했습니다:\n{e}")
 
+    def request_scene_load(self, direction=0):
+        """
+        현재 씬 인덱스의 데이터를 비동기로 로딩합니다. 캐시에 있으면 즉시 표시하고,
+        없으면 현재 뷰부터 디코딩하여 도착하는 대로 화면을 채웁니다.
+        """
+        scene_index = self.ds.get_scene_index()
+        self.prefetch_direction = direction
+        self.view_direction = 0
+        cached = self.ds.get_cached_scene(scene_index)
+        if self.ds.lazy_loading:
+            # 현재 뷰는 처음 접근할 때 (get_preloaded_data_for_current_view) 디코딩하고, 이웃 뷰는 change_image_at_view에서 미리 읽습니다.
+            self.scene_loader.cancel()
+            self.ds.cancel_stale_loads([scene_index])
+            self.ds.preloaded_scene_data = cached if cached is not None else {}
+            self.change_image_at_scene()
+            self.ds.prefetch_neighbours(direction)
+            return
+
+        missing = self.ds.missing_view_names(scene_index, cached) if cached is not None else None
+        if cached is not None and not missing:
+            self.scene_loader.cancel()
+            self.ds.preloaded_scene_data = cached
+            self.change_image_at_scene()
+            self.ds.prefetch_neighbours(direction)
+            return
+
+        # 캐시에 일부 뷰만 있으면 (lazy 모드에서 본 씬) 빠진 뷰만 읽습니다.
+        self.ds.preloaded_scene_data = cached if cached is not None else {}
+        self.scene_loader.load(self.ds, scene_index, first_view=self.ds.get_view_name(), view_names=missing)
+        self.change_image_at_scene()
+
+    def set_loading_mode(self, lazy):
+        if self.ds is None: return
+        self.ds.lazy_loading = lazy
+        if not lazy and self.ds.get_scene_path_list():
+            self.request_scene_load() # Eager로 바꾸면 현재 씬의 나머지 뷰를 모두 읽습니다.
+        else:
+            self.update_view_buttons_state()
+
+    def on_view_loaded(self, generation, scene_index, view_name, data):
+        if generation != self.scene_loader.generation or self.ds is None: return
+        if scene_index != self.ds.get_scene_index(): return
+        if view_name in self.ds.preloaded_scene_data:
+            # lazy 모드에서 미리 읽기가 끝나기 전에 이미 직접 로딩한 뷰
+            self.update_view_buttons_state()
+            return
+        if data:
+            # 로딩 도중에도 씬이 메모리 몫을 넘으면 현재 뷰에서 먼 뷰부터 압축합니다.
+            self.ds.add_view_data(view_name, data)
+        self.update_view_buttons_state()
+        if view_name == self.ds.get_view_name():
+            self.change_image_at_view()
+
+    def on_scene_loaded(self, generation, scene_index):
+        if generation != self.scene_loader.generation or self.ds is None: return
+        if scene_index != self.ds.get_scene_index(): return
+        self.ds.cache_scene(scene_index, self.ds.preloaded_scene_data, focus_view=self.ds.get_view_name())
+        self.update_view_buttons_state()
+        print(f"Scene #{scene_index} loaded. {self.ds.format_cache_stats()}")
+        print(self.ds.format_memory_report())
+        self.ds.prefetch_neighbours(self.prefetch_direction)
+
+    def update_view_buttons_state(self):
+        """로딩 중에는 아직 도착하지 않은 뷰의 라디오 버튼을 비활성화하고 진행 상황을 표시합니다."""
+        if self.ds is None: return
+        loading = self.scene_loader.is_loading()
+        for idx, angle in enumerate(self.angle):
+            btn = self.view_group.button(idx)
+            if btn is not None:
+                view_data = self.ds.preloaded_scene_data.get(str(angle))
+                btn.setEnabled(self.ds.lazy_loading or not loading or view_data is not None)
+                if view_data:
+                    image = view_data['image']
+                    btn.setToolTip(f'{image_state(image)} · {format_bytes(image_heap_bytes(image))}')
+                else:
+                    btn.setToolTip('not loaded')
+        title = f'View : {self.ds.get_view_name()}'
+        if loading:
+            title += f' ({self.scene_loader.finished_views}/{self.scene_loader.total_views})'
+        elif self.ds.lazy_loading:
+            title += f' ({len(self.ds.preloaded_scene_data)}/{len(self.angle)})'
+        title += f' · {format_bytes(self.ds.memory_budget.scene_heap_bytes(self.ds.preloaded_scene_data))}'
+        self.view_box.setTitle(title)
+
     def set_mode(self, mode_id):
         self.edit_mode = (mode_id == 1)
 
-        if self.selected_object:
-            self.selected_object.is_selected = False
-            self.selected_object = None
-        
+        self.clear_selection()
         self.set_transform_controls_enabled(self.edit_mode)
         self.update_transform_display()
         self.render_refined_scene()
     
     def render_refined_scene(self):
+        """
+        화면 갱신을 요청합니다. 뷰 상태(어노테이션 로딩, 확대 해제)는 바로 맞추고 그리기는 0ms 타이머로 미뤄서,
+        같은 이벤트 루프 틱 안의 여러 요청(체크박스 토글, 모드/뷰 전환 등)을 한 번의 렌더링으로 합칩니다.
+        """
+        self.render_requests += 1
+        perf.count('render.request')
+        self.sync_view_state()
+        self.render_dirty = True
+        if not self.render_timer.isActive(): self.render_timer.start()
+
+    def render_now(self):
+        """미뤄 둔 렌더링이 있으면 바로 그립니다 (PNG 저장처럼 최신 화면이 필요한 경우에도 호출)."""
+        self.render_timer.stop()
+        if not self.render_dirty: return
+        self.render_dirty = False
+        with perf.span('frame'):
+            self.draw_refined_scene()
+        self.frames_drawn += 1
+        perf.count('render.frame')
+        if self.perf_hud.isVisible(): self.update_perf_hud()
+
+    def sync_view_state(self):
+        """현재 뷰의 CSV가 바뀌었으면 어노테이션을 새로 만들고, 해상도가 다른 뷰로 바뀌었으면 확대를 해제합니다."""
+        if not hasattr(self, 'ds') or self.ds is None: return
+        preloaded = self.ds.get_preloaded_data_for_current_view()
+        if not preloaded: return
+        image = preloaded['image'] # MultiViewSet은 RGB로 로드합니다.
+        csv_data = preloaded['csv']
+        if self.viewport is not None and self.viewport_image_shape != image.shape[:2]:
+            self.viewport = None # 해상도가 다른 뷰로 바뀌면 확대를 해제합니다.
+
+        # CSV 데이터가 변경되었는지 확인하고 AnnotationObject를 새로 로드
+        if self.anno_file is not csv_data:
+            self.load_annotations_from_csv(csv_data)
+            self.selected_object = None
+            self.set_transform_controls_enabled(False)
+            self.update_transform_display()
+
+    def draw_refined_scene(self):
         if not hasattr(self, 'ds') or self.ds is None:
             # 데이터셋이 로드되지 않았을 경우, 빈 화면을 표시하고 종료
             canvas = np.full((self.dsize[1], self.dsize[0], 3), 240, dtype=np.uint8) # 회색 배경 BGR
@@ -501,152 +686,109 @@ class ArmaViewer(QWidget):
             self.change_image_info()
             return
 
-        image = preloaded['image'] # 이 image가 RGB인지 BGR인지 확인 필요
-        csv_data = preloaded['csv']
-
-        # ★★★ 이미지 컬러 스페이스 일관성 확보: BGR로 통일 ★★★
-        # 만약 preloaded['image']가 RGB로 로드된다면, 여기서 BGR로 변환하여 OpenCV 그리기와 일치시킵니다.
-        # 대부분의 cv2.imread는 BGR로 로드하므로, 이 변환이 필요 없을 수도 있습니다.
-        # 하지만 배경색이 이상하다면 이 부분이 원인일 가능성이 높습니다.
-        if image.ndim == 3 and image.shape[2] == 3:
-            # 이 조건을 통해 image가 RGB인지 BGR인지 알 수 없으므로,
-            # 안전하게 is_rgb 플래그를 통해 한 번 더 확인하는 것이 좋습니다.
-            # (MultiViewSet의 이미지 로드 로직을 아는 것이 가장 정확하지만, 현재로서는 추정)
-            
-            # 여기서 RGB2BGR 변환을 시도해보고, 만약 이미 BGR이었다면 색이 뒤집힐 수 있습니다.
-            # 가정: `image`가 RGB로 로드되어 들어온다.
-            # 만약 이 가정이 틀렸다면, 아래 if 문을 주석 처리하고 `canvas_base = image.copy()`만 남겨두세요.
-            try:
-                # 간단한 테스트로 image[0,0,0]과 image[0,0,2]를 비교하여 BGR/RGB 추정 가능
-                # 하지만 가장 확실한 것은 로드하는 소스(MultiViewSet)의 코드를 직접 확인하는 것입니다.
-                # 임시로 RGB로 가정하고 변환을 시도합니다.
-                # 이 부분이 문제를 일으키면 제거해야 합니다.
-                canvas_base = cv2.cvtColor(image, cv2.COLOR_RGB2BGR) # RGB -> BGR 변환 시도
-            except cv2.error:
-                # 이미 BGR이거나 다른 문제로 변환 실패 시 원본 사용
-                canvas_base = image.copy()
+        self.sync_view_state() # 요청 이후에 뷰가 바뀌었을 수 있습니다.
+        image = preloaded['image']
+
+        # 그리기는 Qt와 무관한 renderer 모듈이 담당합니다 (배치 렌더러와 같은 코드 경로).
+        # 확대 중에는 타일 피라미드에서 보이는 타일만 읽어 배경을 만듭니다.
+        pyramid = self.tile_pyramid_cache.get(image, self.ds.get_refined_eo_path()) if self.viewport else None
+        if self.edit_mode:
+            # 선택된 객체만 바뀌었으면 이전/새 영역만 다시 그리고 QPixmap도 그 영역만 갱신합니다.
+            canvas, dirty = self.edit_layer_cache.render(image, self.annotation_store, self.get_render_options(),
+                                                         self.base_layer_cache, self.old_data_objects, pyramid)
+            if dirty is not None and self.update_pixmap_region(canvas, dirty): return
+            self.set_scale_and_policy(canvas, edit_layer=True)
+            return
         else:
-            # 그레이스케일 또는 다른 채널 수의 이미지
-            canvas_base = image.copy()
-
-        canvas = canvas_base.copy() # 모든 그리기 작업은 이 BGR canvas 위에서 이루어집니다.
-
-
-        # CSV 데이터가 변경되었는지 확인하고 AnnotationObject를 새로 로드
-        
-        if self.anno_file is not csv_data:
-       
-            self.load_annotations_from_csv(csv_data)
-            self.selected_object = None
-            self.set_transform_controls_enabled(False)
-            self.update_transform_display()
-
-
-        if self.annotation_objects:
-            filtered_objects = [obj for obj in self.annotation_objects if (self.t_check.isChecked() and obj.row_data.get('usable', 'T') == 'T') or (self.f_check.isChecked() and obj.row_data.get('usable', 'T') == 'F')]
-
-            for obj in filtered_objects:
-                label_text, class_color_rgb = self.get_label_and_color(obj.row_data['main_class'], obj.row_data['middle_class'])
-
-                # RGB -> BGR 변환 (OpenCV 그리기 함수는 BGR을 사용)
-                base_color_bgr = (class_color_rgb[2], class_color_rgb[1], class_color_rgb[0])
-
-                current_draw_color = base_color_bgr
-                if self.edit_mode:
-                    if obj.is_selected:
-                        current_draw_color = (0, 255, 0)  # 선택된 객체는 초록색 (BGR)
-                    elif obj.is_modified:
-                        current_draw_color = (0, 255, 255)  # 수정된 객체는 노란색 (BGR)
-
-                thickness = max(1, round(canvas.shape[1] / 640))
-                selected_thickness = max(2, round(canvas.shape[1] / 500))
-                draw_thickness = selected_thickness if (self.edit_mode and obj.is_selected) else thickness
-
-                # Edit 모드에 따라 그리기 기준점을 분기
-                if self.edit_mode:
-                    oriented_bbox_points = obj.get_transformed_points()
-
-                    original_center = np.mean(obj.original_points, axis=0).astype(int)
-                    min_x_orig, min_y_orig = np.min(obj.original_points, axis=0).astype(int)
-                    max_x_orig, max_y_orig = np.max(obj.original_points, axis=0).astype(int)
-
-                    render_center = original_center
-                    render_bbox_rect = (min_x_orig, min_y_orig, max_x_orig, max_y_orig)
-                    render_id_pos = (original_center[0] + 8, original_center[1] - 8)
-                    render_label_pos = (original_center[0] + 8, original_center[1] + 20)
-                else:
-                    oriented_bbox_points = obj.get_transformed_points()
-
-                    min_x_transformed, min_y_transformed = np.min(oriented_bbox_points, axis=0).astype(int)
-                    max_x_transformed, max_y_transformed = np.max(oriented_bbox_points, axis=0).astype(int)
-                    render_center = np.mean(oriented_bbox_points, axis=0).astype(int)
-
-                    render_bbox_rect = (min_x_transformed, min_y_transformed, max_x_transformed, max_y_transformed)
-                    render_id_pos = (render_center[0] + 8, render_center[1] - 8)
-                    render_label_pos = (render_center[0] + 8, render_center[1] + 20)
-
-                # Oriented BBOX 그리기
-                if 1 in self.checked_list:
-                    cv2.polylines(canvas, [oriented_bbox_points.astype(np.int32)], True, current_draw_color, draw_thickness)
-
-                # AABB (Axis-Aligned BBox) 그리기
-                if 2 in self.checked_list:
-                    cv2.rectangle(canvas, (render_bbox_rect[0], render_bbox_rect[1]),
-                                  (render_bbox_rect[2], render_bbox_rect[3]), current_draw_color, thickness)
-
-                # Center Point 그리기
-                if 0 in self.checked_list:
-                    cv2.circle(canvas, tuple(render_center), 3, current_draw_color, -1)
-
-                font_scale = 0.5
-                font_thickness = max(1, round(canvas.shape[1] / 1000))
-                font = cv2.FONT_HERSHEY_SIMPLEX
-
-                def draw_text_with_background(text, pos, text_color=(255, 255, 255), bg_color=(0, 0, 0)):
-                    (text_width, text_height), _ = cv2.getTextSize(text, font, font_scale, font_thickness)
-                    bg_rect_pt1 = (pos[0], pos[1] - text_height - 4)
-                    bg_rect_pt2 = (pos[0] + text_width, pos[1])
-                    cv2.rectangle(canvas, bg_rect_pt1, bg_rect_pt2, bg_color, -1)
-                    cv2.putText(canvas, text, (pos[0], pos[1] - 3), font, font_scale, text_color, font_thickness, cv2.LINE_AA)
-
-                if 5 in self.checked_list:
-                    obj_id_text = str(obj.id).replace("id_", "")
-                    draw_text_with_background(obj_id_text, render_id_pos)
-
-                if 3 in self.checked_list or 4 in self.checked_list:
-                    draw_text_with_background(label_text, render_label_pos)
-
-                if 6 in self.checked_list and obj.is_modified:  # Show Original Box
-                    original_points_for_display = obj.original_points.astype(np.int32)
-                    cv2.polylines(canvas, [original_points_for_display], True, (255, 0, 255), 1)  # 원본은 보라색 (BGR)
-
-            # Old Data BBOX 그리기 로직 (고정된 회색 (128,128,128) BGR)
-            # 여기서 old_obj는 딕셔너리 {'points': ...} 형태입니다.
-            if 7 in self.checked_list and self.old_data_objects:
-                for old_obj in self.old_data_objects:
-                
-                    cv2.polylines(canvas, [old_obj['points']], True, (128, 128, 128), 1)
-
-        canvas_resized = cv2.resize(canvas, dsize=self.dsize, interpolation=cv2.INTER_AREA)
+            canvas = renderer.render_view(image, self.annotation_store, self.get_render_options(),
+                                          self.base_layer_cache, self.old_data_objects, pyramid)
 
         # 최종적으로 QPixmap으로 변환하기 위해 set_scale_and_policy에 전달합니다.
         # set_scale_and_policy 내부에서 BGR -> RGB 변환이 이루어집니다.
-        self.set_scale_and_policy(canvas_resized)
-        preloaded = self.ds.get_preloaded_data_for_current_view()
-        if not preloaded:
-            canvas = np.full((self.dsize[1], self.dsize[0], 3), 240, dtype=np.uint8)
-            self.lbl_img.setPixmap(QPixmap(q2n.array2qimage(canvas, normalize=False)))
-            self.change_image_info()
-            return
-
-
-        
-        
-         
+        self.set_scale_and_policy(canvas)
+
+    def get_render_options(self) -> renderer.RenderOptions:
+        """현재 위젯 상태(Label/Usable 체크박스, 모드, 해상도)를 renderer 옵션으로 옮깁니다."""
+        return renderer.RenderOptions(checked=self.checked_list, show_usable_true=self.t_check.isChecked(),
+                                      show_usable_false=self.f_check.isChecked(), edit_mode=self.edit_mode,
+                                      dsize=self.dsize, viewport=self.viewport)
+
+    def current_image_shape(self):
+        preloaded = self.ds.get_preloaded_data_for_current_view() if self.ds is not None else None
+        return preloaded['image'].shape[:2] if preloaded else None
+
+    def widget_to_image(self, pos_in_widget):
+        """lbl_img 좌표를 (확대 영역을 반영한) 원본 이미지 좌표로 바꿉니다."""
+        shape = self.current_image_shape()
+        if shape is None: return None
+        orig_h, orig_w = shape
+        x0, y0, vw, vh = self.viewport or (0, 0, orig_w, orig_h)
+        widget_rect = self.lbl_img.rect()
+        return (x0 + pos_in_widget.x() * (vw / widget_rect.width()),
+                y0 + pos_in_widget.y() * (vh / widget_rect.height()))
+
+    def set_viewport(self, x0, y0, vw, vh):
+        orig_h, orig_w = self.current_image_shape()
+        if vw >= orig_w and vh >= orig_h:
+            self.viewport = None
+        else:
+            x0 = min(max(0.0, x0), orig_w - vw)
+            y0 = min(max(0.0, y0), orig_h - vh)
+            self.viewport = (x0, y0, vw, vh)
+            self.viewport_image_shape = (orig_h, orig_w)
+        self.render_refined_scene()
+        self.change_image_info()
 
+    def zoom_at(self, pos_in_widget, factor):
+        """커서 아래 지점이 제자리에 있도록 확대/축소합니다."""
+        shape = self.current_image_shape()
+        if shape is None: return
+        orig_h, orig_w = shape
+        x0, y0, vw, vh = self.viewport or (0, 0, orig_w, orig_h)
+        zoom = min(self.max_zoom, max(1.0, (orig_w / vw) * factor))
+        anchor_x, anchor_y = self.widget_to_image(pos_in_widget)
+        widget_rect = self.lbl_img.rect()
+        fx, fy = pos_in_widget.x() / widget_rect.width(), pos_in_widget.y() / widget_rect.height()
+        new_w, new_h = orig_w / zoom, orig_h / zoom
+        self.set_viewport(anchor_x - fx * new_w, anchor_y - fy * new_h, new_w, new_h)
+
+    def pan_by(self, dx_widget, dy_widget):
+        if self.viewport is None: return
+        x0, y0, vw, vh = self.viewport
+        widget_rect = self.lbl_img.rect()
+        self.set_viewport(x0 - dx_widget * vw / widget_rect.width(), y0 - dy_widget * vh / widget_rect.height(), vw, vh)
+
+    def reset_zoom(self):
+        if self.viewport is None: return
+        self.viewport = None
+        self.render_refined_scene()
+        self.change_image_info()
 
-        canvas_resized = cv2.resize(canvas, dsize=self.dsize, interpolation=cv2.INTER_AREA)
-        self.set_scale_and_policy(canvas_resized)
+    def eventFilter(self, obj, event):
+        # lbl_img: 휠 = 확대/축소, 가운데/오른쪽 버튼 드래그(View 모드에서는 왼쪽 버튼도) = 이동, 더블클릭 = 전체 보기
+        if obj is self.lbl_img and self.ds is not None:
+            etype = event.type()
+            if etype == QEvent.Wheel:
+                steps = event.angleDelta().y() / 120
+                if steps: self.zoom_at(event.pos(), self.zoom_step ** steps)
+                return True
+            if etype == QEvent.MouseButtonPress and self.viewport is not None and (
+                    event.button() in (Qt.MiddleButton, Qt.RightButton) or
+                    (event.button() == Qt.LeftButton and not self.edit_mode)):
+                self.pan_anchor = event.pos()
+                return True
+            if etype == QEvent.MouseMove and self.pan_anchor is not None:
+                delta = event.pos() - self.pan_anchor
+                self.pan_anchor = event.pos()
+                self.pan_by(delta.x(), delta.y())
+                return True
+            if etype == QEvent.MouseButtonRelease and self.pan_anchor is not None:
+                self.pan_anchor = None
+                return True
+            if etype == QEvent.MouseButtonDblClick and not self.edit_mode:
+                self.reset_zoom()
+                return True
+        return super().eventFilter(obj, event)
 
     def load_annotations_from_csv(self, csv_data):
         self.anno_file = csv_data 
@@ -655,29 +797,51 @@ class ArmaViewer(QWidget):
         self.set_transform_controls_enabled(False)
         self.update_transform_display()
 
-        if csv_data is None or csv_data.empty: return
+        # CSV 전체를 열 단위 배열로 한 번에 변환하고, AnnotationObject는 각 행을 가리키는 뷰로만 사용합니다.
+        # 이 뷰에 저장하지 않은 수정(직접 편집 또는 전파)이 있으면 그 저장소를 그대로 사용합니다.
+        if self.ds is not None:
+            key = self.current_session_key()
+            self.edit_sessions.drop_clean(keep=key)
+            self.annotation_store = self.edit_sessions.store_for(key, csv_data, self)
+            self.annotation_store.selected[:] = False
+        else:
+            self.annotation_store = AnnotationStore.from_dataframe(csv_data, self)
+        self.annotation_objects = self.annotation_store.objects()
+
+    def current_session_key(self):
+        return self.ds.get_scene_index(), self.ds.get_view_name()
 
-        for idx, row in csv_data.iterrows():
-            # AnnotationObject 생성자에 'row' (pandas Series)와 'self' (ArmaViewer 인스턴스)를 전달합니다.
-            # AnnotationObject 내부에서 row_data를 파싱하고 변환 상태를 초기화합니다.
-            self.annotation_objects.append(AnnotationObject(row, self))
+    def journal_edit(self, key, store, rows):
+        """store의 rows 객체의 현재 변환 값을 편집 저널에 기록합니다."""
+        if self.edit_journal is None or not len(rows): return
+        self.edit_journal.record(self.ds.get_scene_name_list()[key[0]], key[1], store.ids[rows],
+                                 store.translation[rows], store.scale[rows], store.angle[rows])
+
+    def journal_selection(self):
+        self.journal_edit(self.current_session_key(), self.annotation_store, self.annotation_store.selected_indices())
 
     def set_transform_controls_enabled(self, enabled):
         self.transform_box.setEnabled(enabled)
-        if not enabled and self.selected_object:
-            self.selected_object.is_selected = False
-            self.selected_object = None
+        if not enabled: self.clear_selection()
+
+    def clear_selection(self):
+        self.annotation_store.selected[:] = False
+        self.selected_object = None
+
+    def set_primary_selection(self):
+        """selected_object(변환 값 표시 / 핸들 기준)가 선택 안에 있도록 맞추고 변환 UI를 갱신합니다."""
+        indices = self.annotation_store.selected_indices()
+        if self.selected_object is None or not self.selected_object.is_selected:
+            self.selected_object = self.annotation_objects[indices[-1]] if len(indices) else None
+        self.transform_box.setEnabled(self.selected_object is not None)
+        self.update_transform_display()
 
     def adjust_transform(self, param_type, value):
         if self.selected_object is None or not self.edit_mode: return
-        
-        if param_type == 'tx': self.selected_object.translation[0] += value
-        elif param_type == 'ty': self.selected_object.translation[1] += value
-        elif param_type == 'sw': self.selected_object.scale[0] += value
-        elif param_type == 'sh': self.selected_object.scale[1] += value
-        elif param_type == 'angle': self.selected_object.rotation_angle += value
-        
-        self.selected_object.mark_as_modified()
+
+        # 선택된 객체 전체에 같은 값을 한 번에 더합니다 (한 번의 렌더링).
+        self.annotation_store.adjust(self.annotation_store.selected_indices(), param_type, value)
+        self.journal_selection()
         self.update_transform_display()
         self.render_refined_scene()
 
@@ -690,13 +854,16 @@ class ArmaViewer(QWidget):
             self.update_transform_display()
             return
         
-        if param_type == 'tx': self.selected_object.translation[0] = value
-        elif param_type == 'ty': self.selected_object.translation[1] = value
-        elif param_type == 'sw': self.selected_object.scale[0] = max(0.01, value)
-        elif param_type == 'sh': self.selected_object.scale[1] = max(0.01, value)
-        elif param_type == 'angle': self.selected_object.rotation_angle = value
-        
-        self.selected_object.mark_as_modified()
+        # 기준 객체(selected_object)가 입력값이 되도록 하고, 나머지 선택 객체에는 같은 차이만큼 더합니다.
+        if param_type == 'tx': current = self.selected_object.translation[0]
+        elif param_type == 'ty': current = self.selected_object.translation[1]
+        elif param_type == 'sw': current, value = self.selected_object.scale[0], max(0.01, value)
+        elif param_type == 'sh': current, value = self.selected_object.scale[1], max(0.01, value)
+        elif param_type == 'angle': current = self.selected_object.rotation_angle
+        else: return
+
+        self.annotation_store.adjust(self.annotation_store.selected_indices(), param_type, value - float(current))
+        self.journal_selection()
         self.update_transform_display()
         self.render_refined_scene()  
 
@@ -707,7 +874,8 @@ class ArmaViewer(QWidget):
             self.sw_edit.setText(f"{self.selected_object.scale[0]:.2f}")
             self.sh_edit.setText(f"{self.selected_object.scale[1]:.2f}")
             self.rot_edit.setText(f"{self.selected_object.rotation_angle:.2f}")
-            self.selected_id_label.setText(f"Selected ID: {self.selected_object.id}")
+            others = int(self.annotation_store.selected.sum()) - 1
+            self.selected_id_label.setText(f"Selected ID: {self.selected_object.id}" + (f" (+{others})" if others > 0 else ""))
         else:
             self.tx_edit.setText("0.00"); self.ty_edit.setText("0.00")
             self.sw_edit.setText("1.00"); self.sh_edit.setText("1.00")
@@ -721,62 +889,150 @@ class ArmaViewer(QWidget):
             widget_rect = self.lbl_img.rect()
 
             if widget_rect.contains(pos_in_widget):
-                preloaded = self.ds.get_preloaded_data_for_current_view()
-                if not preloaded or 'image' not in preloaded: return
-
-                orig_h, orig_w = preloaded['image'].shape[:2]
-                click_x = pos_in_widget.x() * (orig_w / widget_rect.width())
-                click_y = pos_in_widget.y() * (orig_h / widget_rect.height())
-                click_point = (click_x, click_y)
-
-                found_object = None
-                for obj in reversed(self.annotation_objects):
-                    if obj.check_selection(click_point):
-                        found_object = obj
-                        break
-                
-                if self.selected_object and self.selected_object is not found_object:
-                    self.selected_object.is_selected = False
-                
-                self.selected_object = found_object
-                
-                if self.selected_object:
-                    self.selected_object.is_selected = True
-                    self.set_transform_controls_enabled(True)
+                # 확대 중이면 보이는 영역 기준으로 원본 좌표를 계산합니다.
+                click_point = self.widget_to_image(pos_in_widget)
+                if click_point is None: return
+                additive = bool(event.modifiers() & Qt.ShiftModifier) # Shift: 선택에 추가 / 선택 토글
+
+                # 선택된 객체의 핸들을 누르면 스케일/회전 드래그를 시작합니다.
+                handle = self.handle_at(click_point) if not additive else None
+                if handle is not None:
+                    self.selected_object = self.annotation_objects[handle[0]]
                     self.update_transform_display()
+                    self.begin_drag(handle[1], click_point, handle[2])
+                    return
+
+                # 뒤에 그려진(위에 보이는) 객체가 우선합니다. 일괄 변환 결과와 AABB로 후보를 좁힌 뒤 폴리곤 검사를 합니다.
+                hit_index = self.annotation_store.hit_test(click_point)
+                found_object = self.annotation_objects[hit_index] if hit_index is not None else None
+
+                if found_object is None:
+                    # 빈 곳을 누르면 러버밴드 선택을 시작합니다 (Shift 없이 누르면 기존 선택 해제).
+                    if not additive: self.clear_selection()
+                    self.band_origin = pos_in_widget
+                    self.rubber_band.setGeometry(QRect(pos_in_widget, QSize()))
+                    self.rubber_band.show()
+                elif additive:
+                    found_object.is_selected = not found_object.is_selected
+                    if found_object.is_selected: self.selected_object = found_object
                 else:
-                    self.set_transform_controls_enabled(False)
-                    self.update_transform_display()
+                    # 이미 선택된 객체를 누르면 선택을 유지한 채 그룹 전체를 끌어서 옮깁니다.
+                    if not found_object.is_selected: self.clear_selection()
+                    found_object.is_selected = True
+                    self.selected_object = found_object
+                    self.begin_drag('move', click_point) # 객체를 누른 채 끌면 이동
 
+                self.set_primary_selection()
                 self.render_refined_scene()
+
+    def mouseMoveEvent(self, event):
+        pos_in_widget = self.lbl_img.mapFromGlobal(self.mapToGlobal(event.pos()))
+        if self.band_origin is not None:
+            self.rubber_band.setGeometry(QRect(self.band_origin, pos_in_widget).normalized())
+            return
+        if self.drag is None: return
+        point = self.widget_to_image(pos_in_widget)
+        if point is None: return
+        self.drag_pos = point
+        # 첫 이동은 바로 반영하고, 이후에는 타이머가 끝날 때 마지막 위치만 반영합니다 (프레임당 한 번).
+        if not self.drag_timer.isActive():
+            self.apply_drag()
+            self.drag_timer.start()
+
+    def mouseReleaseEvent(self, event):
+        if self.band_origin is not None:
+            self.finish_rubber_band(self.lbl_img.mapFromGlobal(self.mapToGlobal(event.pos())))
+            return
+        if self.drag is None: return
+        self.drag_timer.stop()
+        self.apply_drag()
+        if self.drag['changed'] and self.ds is not None:
+            self.journal_edit(self.current_session_key(), self.annotation_store, self.drag['indices'])
+        self.drag = None
+
+    def finish_rubber_band(self, pos_in_widget):
+        """러버밴드 안에 완전히 들어온 (표시 중인) 객체를 선택에 더합니다."""
+        origin, self.band_origin = self.band_origin, None
+        self.rubber_band.hide()
+        rect = QRect(origin, pos_in_widget).normalized()
+        p0, p1 = self.widget_to_image(rect.topLeft()), self.widget_to_image(rect.bottomRight())
+        if p0 is None or p1 is None: return
+        store = self.annotation_store
+        inside = store.query_box(p0[0], p0[1], p1[0], p1[1])
+        inside = inside[store.visible_mask(self.t_check.isChecked(), self.f_check.isChecked())[inside]]
+        if not len(inside): return
+        store.selected[inside] = True
+        self.selected_object = self.annotation_objects[inside[-1]]
+        self.set_primary_selection()
+        self.render_refined_scene()
+
+    def refresh_interval(self) -> int:
+        """화면 주사율에 맞춘 드래그 갱신 간격 (ms, 기본 60Hz)."""
+        screen = QApplication.primaryScreen()
+        rate = screen.refreshRate() if screen is not None else 0
+        return max(1, int(1000 / (rate if rate > 0 else 60)))
+
+    def handle_at(self, point):
+        """원본 좌표 point에 있는 선택된 객체의 편집 핸들: (객체 인덱스, 'scale' / 'rotate', 꼭짓점 번호) 또는 None."""
+        indices = self.annotation_store.selected_indices()
+        shape = self.current_image_shape()
+        if not len(indices) or shape is None: return None
+        disp_scale, disp_offset = renderer.display_transform(shape, self.get_render_options())
+        polygons = (self.annotation_store.transformed_points()[indices] - disp_offset) * disp_scale
+        point = (np.asarray(point) - disp_offset) * disp_scale
+        for index, polygon in zip(indices[::-1], polygons[::-1]): # 위에 그려진 객체부터
+            handle = renderer.handle_at(polygon, point)
+            if handle is not None: return (int(index),) + handle
+        return None
+
+    def begin_drag(self, mode, point, corner=None):
+        """드래그 시작 시점의 기준 객체와 선택 전체의 변환 값을 저장합니다."""
+        obj, store = self.selected_object, self.annotation_store
+        indices = store.selected_indices()
+        self.drag = {'mode': mode, 'corner': corner, 'start': np.asarray(point, dtype=np.float64), 'indices': indices,
+                     'scale': obj.scale.astype(np.float64), 'angle': obj.rotation_angle,
+                     'group_translation': store.translation[indices].copy(), 'group_scale': store.scale[indices].copy(),
+                     'group_angle': store.angle[indices].copy(), 'changed': False}
+        self.drag_pos = None
+        self.drag_timer.setInterval(self.refresh_interval())
+
+    def apply_drag(self):
+        """
+        마지막 마우스 위치를 기준 객체(selected_object)의 이동/스케일/회전으로 바꾸고, 같은 변화량을 선택 전체에 한 번에 적용합니다.
+        드래그 시작 값 기준으로 계산하므로 오차가 쌓이지 않습니다.
+        """
+        if self.drag is None or self.drag_pos is None or self.selected_object is None: return
+        obj, drag, store = self.selected_object, self.drag, self.annotation_store
+        indices = drag['indices']
+        point = np.asarray(self.drag_pos, dtype=np.float64)
+        self.drag_pos = None
+        base_center = obj.original_points.mean(axis=0)
+        center = base_center + obj.translation # 스케일/회전의 기준점 (변환된 중심)
+
+        if drag['mode'] == 'move':
+            store.translation[indices] = drag['group_translation'] + (point - drag['start'])
+        elif drag['mode'] == 'scale':
+            # 마우스 위치를 객체의 회전 전 좌표로 옮겨서, 잡은 꼭짓점이 그 위치에 오도록 축별 스케일을 정합니다 (중심 기준).
+            local = unrotate(point - center, obj.rotation_angle)
+            corner = obj.original_points[drag['corner']] - base_center
+            scale = drag['scale'].copy()
+            for axis in range(2):
+                if abs(corner[axis]) > 1e-6: scale[axis] = max(0.01, local[axis] / corner[axis])
+            store.scale[indices] = np.maximum(0.01, drag['group_scale'] * (scale / drag['scale']))
+        elif drag['mode'] == 'rotate':
+            start, current = drag['start'] - center, point - center
+            delta = np.degrees(np.arctan2(start[1], start[0]) - np.arctan2(current[1], current[0]))
+            store.angle[indices] = (drag['group_angle'] + delta + 180) % 360 - 180
+
+        store.modified[indices] = True
+        drag['changed'] = True
+        self.update_transform_display()
+        self.render_refined_scene()
     
     def get_label_and_color(self, main_class, middle_class):
-        # 'Middle' 체크박스의 상태를 가져옵니다.
+        # 'Middle' 체크박스의 상태에 따라 레이블을 정하고 색상을 찾습니다 (renderer와 같은 규칙).
         middle_checkbox_is_checked = self.mid_check.isChecked() if hasattr(self, 'mid_check') else False
-
-        if middle_checkbox_is_checked:
-            # Middle Class가 Main Class와 같으면 Main Class만 표시
-            # 그렇지 않으면 "Main:Middle" 형식으로 표시
-            label = main_class if main_class == middle_class else f'{main_class}:{middle_class}'
-        else:
-            # Middle Class 체크박스가 비활성화되어 있으면 Main Class만 표시
-            label = main_class
-
-        # ★★★ 색상 검색 로직 개선 ★★★
-        # 1. 먼저 정확한 label (main:middle 또는 main)로 색상 검색 시도
-        color_entry = self.FIXED_COLOR_STYLE.get(label)
-        
-        # 2. 정확한 label로 못 찾았으면, main_class만으로 다시 검색 시도 (폴백)
-        if color_entry is None:
-            color_entry = self.FIXED_COLOR_STYLE.get(main_class)
-        
-        # 3. 그래도 못 찾았으면, 기본 회색 (혹은 다른 적절한 색상)으로 설정
-        if color_entry is None:
-            color_rgb = (100, 100, 100) # 기본 회색
-        else:
-            color_rgb = color_entry[0] # 색상 정보만 가져옴
-
-        return label, color_rgb
+        return renderer.get_label_and_color(main_class, middle_class, middle_checkbox_is_checked)
 
     def change_image_at_scene(self):
         if not hasattr(self, 'ds') or self.ds is None: return
@@ -801,11 +1057,10 @@ class ArmaViewer(QWidget):
         
         was_edit_mode = self.edit_mode
 
-        selected_object_id = None
-        if self.selected_object:
-            selected_object_id = self.selected_object.id
-            self.selected_object.is_selected = False
-        self.selected_object = None
+        # 새 뷰에서 같은 ID의 객체들을 다시 선택합니다 (기준 객체 포함).
+        selected_ids = set(self.annotation_store.ids[self.annotation_store.selected].tolist())
+        selected_object_id = self.selected_object.id if self.selected_object else None
+        self.clear_selection()
         
         
         current_view_name = self.ds.get_view_name()
@@ -818,7 +1073,7 @@ class ArmaViewer(QWidget):
         except (ValueError, IndexError):
             pass
             
-        self.view_box.setTitle(f'View : {current_view_name}')
+        self.update_view_buttons_state()
         self.change_image_info()
         self.create_legend()
         if self.old_obox_check.isChecked():
@@ -832,25 +1087,19 @@ class ArmaViewer(QWidget):
         else:
             self.set_mode(0) # 이전에 View 모드였다면 View 모드로 설정
         
-        if was_edit_mode and selected_object_id: # Edit 모드였고 이전에 선택된 ID가 있다면
-            found_object = None
-            for obj in self.annotation_objects:
-                if obj.id == selected_object_id:
-                    found_object = obj
-                    break
-            
-            if found_object:
-                self.selected_object = found_object
-                self.selected_object.is_selected = True
-                self.set_transform_controls_enabled(True) # 다시 활성화
-                self.update_transform_display() # UI 업데이트 (ID 라벨, 변환 값 등)
-            else:
-                # 같은 ID의 객체를 새 View에서 찾지 못하면 선택 해제
-                self.selected_object = None
-                self.set_transform_controls_enabled(False) # 비활성화
-                self.update_transform_display() # UI 초기화
+        if was_edit_mode and selected_ids: # Edit 모드였고 이전에 선택된 ID가 있다면
+            store = self.annotation_store
+            found = np.fromiter((obj_id in selected_ids for obj_id in store.ids), dtype=bool, count=len(store))
+            store.selected[:] = found
+            primary = np.flatnonzero(store.ids == selected_object_id) if selected_object_id is not None else []
+            self.selected_object = self.annotation_objects[primary[0]] if len(primary) and found[primary[0]] else None
+            # 같은 ID의 객체를 새 View에서 하나도 찾지 못하면 선택 해제 (UI도 함께 갱신)
+            self.set_primary_selection()
         
         self.render_refined_scene()
+        if self.ds.lazy_loading:
+            # 다음에 볼 가능성이 높은 W/S 방향의 이웃 각도를 백그라운드로 미리 읽습니다.
+            self.scene_loader.prefetch(self.ds, self.ds.get_scene_index(), self.ds.adjacent_view_names(self.view_direction))
 
     
 
@@ -882,7 +1131,10 @@ class ArmaViewer(QWidget):
         current_view_name = self.ds.get_view_name()
         csv_path = self.ds.get_current_refined_csv_path()
         csv_name = csv_path.name if csv_path else "N/A"
-        self.file_num_name.setText(f'#{idx} | Scene: {name} | View: {current_view_name} | File: {csv_name}')
+        zoom_text = ''
+        if self.viewport is not None and self.viewport_image_shape:
+            zoom_text = f' | Zoom: x{self.viewport_image_shape[1] / self.viewport[2]:.1f}'
+        self.file_num_name.setText(f'#{idx} | Scene: {name} | View: {current_view_name} | File: {csv_name}{zoom_text}')
        
     def create_legend(self):
         self.legend_widget.clear() # QListWidget의 내용을 지웁니다.
@@ -890,15 +1142,14 @@ class ArmaViewer(QWidget):
         if not self.annotation_objects: return
             
         # 현재 화면에 표시될 객체 (usable 필터링 적용)
-        filtered_objects_for_legend = [obj for obj in self.annotation_objects if (self.t_check.isChecked() and obj.row_data.get('usable', 'T') == 'T') or (self.f_check.isChecked() and obj.row_data.get('usable', 'T') == 'F')]
+        store = self.annotation_store
+        visible = store.visible_mask(self.t_check.isChecked(), self.f_check.isChecked())
 
         # 고유한 (label_text, color_rgb) 조합을 저장할 set
         unique_legend_entries = set()
 
-        for obj in filtered_objects_for_legend:
-            main_c = obj.row_data['main_class']
-            middle_c = obj.row_data['middle_class']
-            
+        # 객체마다가 아니라 고유한 (main, middle) 클래스 쌍마다 한 번씩만 계산합니다.
+        for main_c, middle_c in set(zip(store.main_class[visible], store.middle_class[visible])):
             # get_label_and_color 함수를 호출하여 그림과 동일한 레이블 및 색상 가져오기
             legend_label, legend_color_rgb = self.get_label_and_color(main_c, middle_c)
             unique_legend_entries.add((legend_label, legend_color_rgb))
@@ -937,6 +1188,8 @@ class ArmaViewer(QWidget):
             self.legend_widget.setItemWidget(item, legend_item_widget)
 
     def create_multiview(self):
+        for btn in self.view_group.buttons():
+            self.view_group.removeButton(btn) # deleteLater 전에 그룹에서 빼야 button(idx)가 새 버튼을 가리킵니다.
         for i in reversed(range(self.view_layout.count())):
             self.view_layout.itemAt(i).widget().deleteLater()
         self.view_box.setLayout(self.view_layout)
@@ -944,9 +1197,7 @@ class ArmaViewer(QWidget):
         if not hasattr(self, 'ds') or self.ds is None: return
 
         try:
-            current_scene_path = self.ds.get_scene_path()
-            if not current_scene_path or not os.path.isdir(current_scene_path): self.angle = []
-            else: self.angle = sorted([int(d) for d in os.listdir(current_scene_path) if d.isdigit()])
+            self.angle = sorted(int(d) for d in self.ds.get_view_names_for_scene(self.ds.get_scene_index()))
         except Exception as e:
             print(f"Error listing view angles: {e}"); self.angle = []
 
@@ -963,7 +1214,7 @@ class ArmaViewer(QWidget):
                     clicked_angle_id = self.angle.index(current_view_int)
                     self.view_group.button(clicked_angle_id).setChecked(True)
             except ValueError: pass
-        self.view_group.buttonClicked[int].connect(self.goto_view)
+        self.update_view_buttons_state()
 
     def change_indicator(self):
         if not hasattr(self, 'ds') or self.ds is None: self.indicator.setText(f'{"|" * 45}'); return
@@ -972,7 +1223,10 @@ class ArmaViewer(QWidget):
         if length > 0: self.indicator.setText(f'{"|" * int(((idx / length) * 45))}')
         else: self.indicator.setText(f'{"|" * 45}')
     
-    def set_scale_and_policy(self, canvas_):
+    def set_scale_and_policy(self, canvas_, edit_layer=False):
+        # edit_layer_cache가 만든 프레임이 아니면 화면이 캐시의 마지막 프레임과 달라지므로 캐시를 무효화합니다.
+        # (그대로 두면 View -> Edit 전환 시 '바뀐 것 없음'으로 판단해 View 모드 화면이 남습니다.)
+        if not edit_layer: self.edit_layer_cache.invalidate()
         # OpenCV 결과는 보통 BGR. qimage2ndarray.array2qimage는 RGB 기대.
         # 따라서 여기서 최종적으로 QImage로 변환하기 전에 채널 순서를 확인하고 조정합니다.
         if canvas_.ndim == 3:
@@ -985,9 +1239,24 @@ class ArmaViewer(QWidget):
         else: # 그레이스케일 또는 단일 채널 이미지는 그대로 사용
             canvas_show = canvas_
 
-        self.pixmap = QPixmap(q2n.array2qimage(canvas_show, normalize=False))
+        with perf.span('qpixmap'):
+            self.pixmap = QPixmap(q2n.array2qimage(canvas_show, normalize=False))
         self.lbl_img.setPixmap(self.pixmap)
 
+    def update_pixmap_region(self, canvas, rect) -> bool:
+        """canvas(BGR)의 rect (x0, y0, x1, y1) 영역만 현재 QPixmap에 덮어씁니다. 크기가 다르면 False (전체 갱신 필요)."""
+        if getattr(self, "pixmap", None) is None or self.pixmap.isNull(): return False
+        if (self.pixmap.width(), self.pixmap.height()) != (canvas.shape[1], canvas.shape[0]): return False
+        x0, y0, x1, y1 = rect
+        if x0 >= x1 or y0 >= y1: return True
+        with perf.span('qpixmap'):
+            region = cv2.cvtColor(canvas[y0:y1, x0:x1], cv2.COLOR_BGR2RGB)
+            painter = QPainter(self.pixmap)
+            painter.drawImage(x0, y0, q2n.array2qimage(region, normalize=False))
+            painter.end()
+        self.lbl_img.setPixmap(self.pixmap)
+        return True
+
     
 
     def goto_scene(self):
@@ -997,9 +1266,8 @@ class ArmaViewer(QWidget):
         if scene_name not in self.ds.get_scene_name_list(): self.goto_input.setText('Not Found'); return
         
         self.ds.set_scene_name(scene_name)
-        self.ds.preload_scene_data()
         self.ds.set_view_name(str(self.ds.base_view_idx))
-        self.change_image_at_scene()
+        self.request_scene_load()
 
     def filter_non_supported_classes(self, anno_file):
         if anno_file is None or anno_file.empty: return pd.DataFrame()
@@ -1009,28 +1277,34 @@ class ArmaViewer(QWidget):
     def goto_prev_scene(self):
         new_idx = self.ds.get_scene_index() - 1
         if new_idx < 0: new_idx = len(self.ds.get_scene_name_list()) - 1
-        self.ds.set_scene_index(new_idx); self.ds.preload_scene_data(); self.change_image_at_scene()
+        self.ds.set_scene_index(new_idx); self.ds.set_view_name(str(self.ds.base_view_idx)); self.request_scene_load(-1)
 
     @util.scene_navigation_modified
     def goto_next_scene(self):
         new_idx = self.ds.get_scene_index() + 1
         if new_idx >= len(self.ds.get_scene_name_list()): new_idx = 0
-        self.ds.set_scene_index(new_idx); self.ds.preload_scene_data(); self.change_image_at_scene()
+        self.ds.set_scene_index(new_idx); self.ds.set_view_name(str(self.ds.base_view_idx)); self.request_scene_load(1)
 
     @util.scene_navigation_modified
     def goto_first_scene(self):
-        self.ds.set_scene_index(0); self.ds.preload_scene_data(); self.change_image_at_scene()
+        self.ds.set_scene_index(0); self.ds.set_view_name(str(self.ds.base_view_idx)); self.request_scene_load()
 
     def goto_view(self, selected_id):
         if not hasattr(self, 'ds') or self.ds is None or not self.angle: return
-        if 0 <= selected_id < len(self.angle): self.ds.set_view_name(str(self.angle[selected_id])); self.change_image_at_view()
+        if 0 <= selected_id < len(self.angle):
+            current = self.ds.get_view_name()
+            previous_id = self.angle.index(int(current)) if current.isdigit() and int(current) in self.angle else selected_id
+            self.view_direction = (selected_id > previous_id) - (selected_id < previous_id)
+            self.ds.set_view_name(str(self.angle[selected_id])); self.change_image_at_view()
 
     @util.view_navigation_modified
     def goto_prev_view(self, view_names, idx):
+        self.view_direction = -1
         if idx > 0: self.ds.set_view_name(str(view_names[idx - 1])); self.change_image_at_view()
 
     @util.view_navigation_modified
     def goto_next_view(self, view_names, idx):
+        self.view_direction = 1
         if idx < len(view_names) - 1: self.ds.set_view_name(str(view_names[idx + 1])); self.change_image_at_view()
 
     @util.view_navigation_modified
@@ -1039,64 +1313,190 @@ class ArmaViewer(QWidget):
         if self.ds.get_view_name() != new_view_name: self.ds.set_view_name(new_view_name); self.change_image_at_view()
 
     def save_png(self):
+        self.render_now()
         if not hasattr(self, 'ds') or self.pixmap.isNull(): QMessageBox.warning(self, "경고", "표시된 이미지가 없습니다."); return
         scene_name = self.ds.get_scene_name(); view_name = self.ds.get_view_name()
         default_filename = f"AMOD_Viewer_{scene_name}_{view_name}.png"
         file_name, _ = QFileDialog.getSaveFileName(self, 'Save File', default_filename, 'PNG(*.png)')
         if file_name: self.pixmap.save(file_name, 'png')
 
-    def save_modified_annotations(self):
-        modified_objects = [obj for obj in self.annotation_objects if obj.is_modified]
-        if not modified_objects: 
-            QMessageBox.information(self, "정보", "수정된 어노테이션이 없습니다."); 
-            return
-
-        original_csv_path = self.ds.get_current_refined_csv_path()
-        if not original_csv_path: 
-            QMessageBox.warning(self, "경고", "원본 어노테이션 파일 경로를 찾을 수 없습니다."); 
-            return
+    def save_vector(self, fmt):
+        """현재 뷰의 어노테이션을 SVG/PDF 벡터 도형으로 저장합니다. 배경은 원본 이미지를 포함하거나(SVG는 링크도 가능) 생략합니다."""
+        data = self.ds.get_preloaded_data_for_current_view() if self.ds is not None else None
+        if not data: QMessageBox.warning(self, "경고", "표시된 이미지가 없습니다."); return
+        scene_name = self.ds.get_scene_name(); view_name = self.ds.get_view_name()
+        default_filename = f"AMOD_Viewer_{scene_name}_{view_name}.{fmt}"
+        file_name, _ = QFileDialog.getSaveFileName(self, 'Save File', default_filename, f'{fmt.upper()}(*.{fmt})')
+        if not file_name: return
+        if pth.splitext(file_name)[1].lower() != f'.{fmt}': file_name += f'.{fmt}'
 
-        dir_name, file_stem = original_csv_path.parent, original_csv_path.stem
-        new_filename = f"{file_stem}_modified.csv"
-        save_path = dir_name / new_filename
+        image_modes = ['embed', 'link', 'none'] if fmt == 'svg' else ['embed', 'none']
+        image_mode, ok = QInputDialog.getItem(self, '배경 이미지', '배경 이미지 처리 방식:', image_modes, 0, False)
+        if not ok: return
 
+        QApplication.setOverrideCursor(Qt.WaitCursor)
         try:
-            preloaded_data = self.ds.get_preloaded_data_for_current_view()
-            if not preloaded_data or preloaded_data['csv'] is None: 
-                QMessageBox.warning(self, "경고", "저장할 원본 데이터가 없습니다."); 
-                return
-            
-            df_to_save = preloaded_data['csv'].copy()
-            
-            if 'id' in df_to_save.columns: 
-                df_to_save.set_index('id', inplace=True)
-            else: 
-                QMessageBox.warning(self, "경고", "CSV 파일에 'id' 컬럼이 없어 저장이 불가합니다."); 
-                return
+            vector_export.export_view(file_name, data['image'], self.annotation_store, self.get_render_options(),
+                                      self.old_data_objects, image_mode, self.ds.get_refined_eo_path())
+        except Exception as e:
+            QApplication.restoreOverrideCursor()
+            QMessageBox.critical(self, "저장 오류", f"{fmt.upper()} 저장 중 오류가 발생했습니다:\n{e}")
+            return
+        QApplication.restoreOverrideCursor()
+
+    def save_gif(self):
+        """현재 씬의 look-angle 스윕(Dynamic 재생 순서)을 GIF/MP4로 저장합니다. 프레임은 하나씩 인코더로 넘깁니다."""
+        if self.ds is None or not self.ds.preloaded_scene_data: QMessageBox.warning(self, "경고", "표시된 씬이 없습니다."); return
+        if self.scene_loader.is_loading(): QMessageBox.warning(self, "경고", "씬을 불러오는 중입니다. 잠시 후 다시 시도해주세요."); return
+        scene_name = self.ds.get_scene_name()
+        default_filename = f"AMOD_Viewer_{scene_name}.gif"
+        file_name, _ = QFileDialog.getSaveFileName(self, 'Save File', default_filename, 'GIF(*.gif);;MP4(*.mp4)')
+        if not file_name: return
+        if pth.splitext(file_name)[1].lower() not in ('.gif', '.mp4'): file_name += '.gif'
+
+        options = self.get_render_options()
+        options.edit_mode = False
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            if self.ds.lazy_loading: self.ds.load_all_views() # 아직 보지 않은 뷰도 모두 필요합니다.
+            frames = sweep_export.iter_sweep_frames(self.iter_current_scene_sources(options), options)
+            written = sweep_export.write_animation(frames, file_name, 1000 / self.auto_plot_interval)
+        except Exception as e:
+            QApplication.restoreOverrideCursor()
+            QMessageBox.critical(self, "저장 오류", f"애니메이션 저장 중 오류가 발생했습니다:\n{e}")
+            return
+        QApplication.restoreOverrideCursor()
+        QMessageBox.information(self, "성공", f"{written}개 뷰를 다음 파일로 저장했습니다:\n{file_name}")
+
+    def iter_current_scene_sources(self, options):
+        """사전 로딩된 현재 씬의 뷰들을 (이미지, AnnotationStore, old boxes)로 하나씩 돌려줍니다. 현재 뷰는 편집 중인 상태를 사용합니다."""
+        for view_name in sweep_export.sweep_view_order(self.ds.preloaded_scene_data):
+            data = self.ds.preloaded_scene_data[view_name]
+            csv_data = data['csv']
+            store = self.annotation_store if csv_data is self.anno_file else AnnotationStore.from_dataframe(csv_data)
+            old_boxes = renderer.load_old_boxes(csv_data) if renderer.CHECK_OLD in options.checked else None
+            yield decoded_image(data), store, old_boxes
 
-            for obj in modified_objects:
-                points = obj.get_transformed_points() # 이 좌표는 float 형태일 수 있습니다.
-                obj_id = obj.id
-                if obj_id in df_to_save.index:
-                    points_flat = points.flatten()
-                    
-                    # ★★★ 이 부분을 수정하여 정수 형태로 저장합니다. ★★★
-                    # 각 좌표를 int로 캐스팅하고, 반올림하여 가장 가까운 정수로 만듭니다.
-                    df_to_save.loc[obj_id, ['x1','y1','x2','y2','x3','y3','x4','y4']] = [int(round(p)) for p in points_flat]
-                    
-                    new_center = np.mean(points, axis=0)
-                    # ★★★ 중심 좌표도 정수 형태로 저장합니다. ★★★
-                    df_to_save.loc[obj_id, ['cx', 'cy']] = [int(round(c)) for c in new_center]
-                else: 
-                    print(f"경고: DataFrame에서 ID '{obj_id}'를 찾을 수 없어 업데이트를 건너뜁니다.")
-            
-            df_to_save.reset_index(inplace=True)
-            df_to_save.to_csv(save_path, index=False)
-            QMessageBox.information(self, "성공", f"수정된 어노테이션 {len(modified_objects)}개가 다음 파일로 저장되었습니다:\n{save_path}")
+    def save_modified_annotations(self):
+        """현재 씬에서 저장하지 않은 편집이 있는 모든 뷰를 (원하면 다른 씬의 뷰도) 한 번에 저장합니다."""
+        if self.ds is None: return
+        scene_index = self.ds.get_scene_index()
+        keys = self.edit_sessions.dirty_keys(scene_index)
+        others = [key for key in self.edit_sessions.dirty_keys() if key[0] != scene_index]
+        if others:
+            answer = QMessageBox.question(self, "저장", f"다른 씬에도 저장하지 않은 뷰가 {len(others)}개 있습니다. 함께 저장할까요?",
+                                          QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes)
+            if answer == QMessageBox.Yes: keys += others
+        if not keys:
+            QMessageBox.information(self, "정보", "수정된 어노테이션이 없습니다.")
+            return
+        self.save_views(keys)
+
+    def propagate_selection(self):
+        """선택된(수정된) 객체의 이동/스케일/회전 값을 씬의 사전 로딩된 다른 뷰에서 ID가 같은 객체에 적용합니다."""
+        if not self.edit_mode or self.ds is None: return
+        store = self.annotation_store
+        rows = np.flatnonzero(store.selected & store.modified)
+        if not len(rows):
+            QMessageBox.information(self, "정보", "전파할 수정된 객체를 선택하세요."); return
+
+        scene_index, current_view = self.ds.get_scene_index(), self.ds.get_view_name()
+        targets = {}
+        for view_name in self.ds.get_view_name_list():
+            view_data = self.ds.preloaded_scene_data.get(view_name)
+            if view_name == current_view or not view_data or view_data.get('csv') is None: continue
+            key = (scene_index, view_name)
+            targets[key] = self.edit_sessions.store_for(key, view_data['csv'], self)
+
+        plan = plan_propagation(store, rows, targets)
+        if not plan.object_count:
+            QMessageBox.information(self, "정보", "사전 로딩된 다른 뷰에서 같은 ID의 객체를 찾지 못했습니다."); return
+
+        dialog = PropagationDialog(self, plan, lambda key: f'View {key[1]}',
+                                   lambda key: self.render_propagation_preview(plan, key, targets[key]))
+        if dialog.exec() != QDialog.Accepted: return
+
+        changed = [key for key, target in targets.items() if len(plan.matches[key][0])]
+        for key in changed:
+            plan.apply(key, targets[key])
+            self.journal_edit(key, targets[key], plan.matches[key][0])
+        self.save_views([(scene_index, current_view)] + changed)
+
+    def render_propagation_preview(self, plan, key, target):
+        """target 뷰에 전파를 적용한 결과 (복사본에 적용하므로 원래 저장소는 바뀌지 않습니다)."""
+        view_data = self.ds.preloaded_scene_data.get(key[1])
+        image = decoded_image(view_data) if view_data else None
+        if image is None: return None
+        preview = target.copy()
+        plan.apply(key, preview)
+        height, width = image.shape[:2]
+        options = self.get_render_options()
+        options.checked |= {renderer.CHECK_OBOX, renderer.CHECK_ORIGINAL} # 전파된 박스(노란색)와 원래 박스(보라색)
+        options.edit_mode, options.viewport = True, None
+        options.dsize = (PREVIEW_WIDTH, max(1, round(PREVIEW_WIDTH * height / width)))
+        return renderer.render_view(image, preview, options)
+
+    def save_views(self, keys):
+        """keys (씬 인덱스, 뷰 이름)의 편집 내용을 각 뷰의 _modified.csv로 한 번에 백그라운드 저장합니다."""
+        jobs, states, skipped = [], {}, []
+        for key in keys:
+            store = self.edit_sessions.get(key)
+            csv_path = self.ds.get_refined_csv_path_for(*key)
+            if store is None or store.source is None or 'id' not in store.source.columns or csv_path is None:
+                skipped.append(self.session_label(key))
+                continue
+            # 저장 중에도 계속 편집할 수 있도록 현재 상태의 복사본을 넘깁니다.
+            jobs.append((key, store.source, store.copy(), csv_path))
+            states[key] = self.edit_sessions.edit_state(store)
+        if skipped:
+            QMessageBox.warning(self, "경고", f"원본 CSV 경로나 'id' 컬럼이 없어 저장하지 못하는 뷰: {', '.join(skipped)}")
+        if not jobs: return
+        seq = self.edit_journal.seq if self.edit_journal is not None else 0
+        self.pending_saves[self.annotation_writer.submit(jobs)] = (seq, states)
+
+    def session_label(self, key) -> str:
+        return f'{self.ds.get_scene_name_list()[key[0]]}_{key[1]}'
+
+    def on_annotations_saved(self, batch, results):
+        seq, states = self.pending_saves.pop(batch, (0, {}))
+        saved, failed = [], []
+        for key, path, count, error in results:
+            if error is not None:
+                failed.append(f'{self.session_label(key)}: {error}')
+                continue
+            saved.append(f'{self.session_label(key)}: {count}개 -> {path}')
+            self.edit_sessions.mark_saved(key, states[key])
+            if self.edit_journal is not None: self.edit_journal.mark_saved(self.ds.get_scene_name_list()[key[0]], key[1], seq)
+        if self.edit_journal is not None and not self.edit_sessions.dirty_keys() and not self.pending_saves:
+            self.edit_journal.reset() # 저장하지 않은 편집이 없으면 저널을 비웁니다.
+        if failed:
+            QMessageBox.critical(self, "저장 오류", "어노테이션 저장 중 오류가 발생했습니다:\n" + '\n'.join(failed + saved))
+        else:
+            QMessageBox.information(self, "성공", f"{len(saved)}개 뷰의 수정된 어노테이션을 저장했습니다:\n" + '\n'.join(saved))
+
+    def recover_edit_journal(self):
+        """이전 실행에서 저장하지 않은 편집이 저널에 남아 있으면 복구할지 묻고 편집 세션에 다시 적용합니다."""
+        pending = self.edit_journal.pending()
+        if not pending:
+            self.edit_journal.reset()
+            return
+        answer = QMessageBox.question(self, "편집 복구", f"저장하지 않은 편집이 {len(pending)}개 뷰에 남아 있습니다. 복구할까요?",
+                                      QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes)
+        if answer != QMessageBox.Yes:
+            self.edit_journal.reset()
+            return
+        scene_names = self.ds.get_scene_name_list()
+        restored = 0
+        for (scene_name, view_name), edits in pending.items():
+            if scene_name not in scene_names: continue
+            scene_index = scene_names.index(scene_name)
+            csv_data = self.ds.load_refined_csv(self.ds.get_refined_csv_path_for(scene_index, view_name))
+            if csv_data is None: continue
+            store = self.edit_sessions.store_for((scene_index, view_name), csv_data, self)
+            translation, scale, angle = zip(*edits.values())
+            restored += apply_edits(store, list(edits), translation, scale, angle)
+        print(f'[edit journal] {len(pending)}개 뷰의 객체 {restored}개 편집을 복구했습니다.')
 
-        except Exception as e:
-            QMessageBox.critical(self, "저장 오류", f"어노테이션 저장 중 오류가 발생했습니다:\n{e}")
-    
     def create_report_dialog(self):
         if not hasattr(self, 'ds') or not self.ds.get_set_path(): QMessageBox.warning(self, "경고", "데이터셋이 로드되지 않았습니다."); return
         text, ok = QInputDialog.getMultiLineText(self, 'Report', "What's the issue?")
@@ -1120,7 +1520,7 @@ class ArmaViewer(QWidget):
             return
 
         self.auto_plot_index = 0
-        self.auto_plot_timer.start(500)
+        self.auto_plot_timer.start(self.auto_plot_interval)
 
     def auto_plot_step(self):
         if not hasattr(self, 'ds') or self.ds is None:
@@ -1128,6 +1528,7 @@ class ArmaViewer(QWidget):
             self.static_radio.setChecked(True)
             return
             
+        self.view_direction = 1
         if self.auto_plot_index < len(self.angle):
             self.ds.set_view_name(str(self.angle[self.auto_plot_index]))
             self.change_image_at_view()
@@ -1141,6 +1542,64 @@ class ArmaViewer(QWidget):
         if e.key() in self.key_map:
             self.key_map[e.key()]()
 
+    def toggle_perf_hud(self):
+        if self.perf_hud.isVisible():
+            self.perf_hud.hide()
+            # HUD로 켠 측정은 HUD를 닫으면 끕니다. 이미 기록한 이벤트는 F11로 저장할 때까지 남겨 둡니다.
+            if not perf.ENABLED_BY_ENV: perf.disable()
+            return
+        perf.enable(trace=True) # HUD를 켜면 이후 동작을 trace로도 기록합니다 (F11로 저장).
+        self.perf_hud.show()
+        self.update_perf_hud()
+
+    def update_perf_hud(self):
+        def rate(hits, misses):
+            return f'{100 * hits / (hits + misses):.0f}%' if hits + misses else '-'
+
+        lines = []
+        frame = perf.span_stats('frame')
+        if frame:
+            lines.append(f"frame {frame['last_ms']:6.1f} ms  avg {frame['mean_ms']:.1f}  max {frame['max_ms']:.1f}  "
+                         f"drawn {self.frames_drawn}/{self.render_requests} requests")
+        stages = [(name, perf.span_stats(name)) for name in ('resize', 'draw', 'qpixmap')]
+        lines.append('  '.join(f"{name} {stats['last_ms']:.1f}" for name, stats in stages if stats) or 'no stage timings yet')
+        if self.ds is not None:
+            scene = self.ds.scene_cache.stats()
+            caches = [f"scene {rate(scene['hits'], scene['misses'])}"]
+            if self.ds.image_cache is not None:
+                image = self.ds.image_cache.stats()
+                caches.append(f"image {rate(image['hits'], image['misses'])}")
+            if self.ds.label_cache is not None:
+                caches.append(f'label {rate(self.ds.label_cache.hits, self.ds.label_cache.misses)}')
+            base_rate = perf.hit_rate('base_layer')
+            if base_rate is not None: caches.append(f'base layer {100 * base_rate:.0f}%')
+            lines.append('hit rate: ' + '  '.join(caches))
+        self.perf_hud.setText('\n'.join(lines))
+        self.perf_hud.adjustSize()
+
+    def save_perf_trace(self):
+        if not perf.trace_event_count():
+            QMessageBox.information(self, "정보", "저장할 trace 이벤트가 없습니다. F12로 HUD를 켜거나 AMOD_PERF_TRACE로 실행하세요.")
+            return
+        file_name, _ = QFileDialog.getSaveFileName(self, 'Save Trace', f"amod_trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json", 'JSON(*.json)')
+        if not file_name: return
+        written = perf.dump_trace(file_name)
+        print(perf.summary())
+        if not perf.ENABLED_BY_ENV: perf.clear_trace() # 저장한 이벤트는 더 이상 메모리에 두지 않습니다.
+        QMessageBox.information(self, "성공", f"{written}개 이벤트를 다음 파일로 저장했습니다 (chrome://tracing 또는 Perfetto에서 열기):\n{file_name}")
+
+    def closeEvent(self, e):
+        # 백그라운드 로딩/prefetch 작업이 종료를 막지 않도록 스레드 풀을 정리합니다.
+        self.scene_loader.cancel()
+        if self.ds is not None: self.ds.shutdown()
+        self.annotation_writer.shutdown(wait=True) # 진행 중인 저장은 끝까지 씁니다.
+        if self.edit_journal is not None: self.edit_journal.close() # 저장하지 않은 편집은 다음 실행에서 복구할 수 있습니다.
+        if perf.is_enabled():
+            print(perf.summary())
+            trace_path = os.environ.get('AMOD_PERF_TRACE')
+            if trace_path: print(f'perf trace: {perf.dump_trace(trace_path)} events -> {trace_path}')
+        super().closeEvent(e)
+
 if __name__ == '__main__':
     if os.path.basename(os.getcwd()) == 'src': os.chdir('..')
     app = QApplication(sys.argv)
@@ -0,0 +1,167 @@
+#
+# batch_render.py
+# arma-rs-utils
+#
+# GUI 없이 데이터셋의 씬/뷰를 오버레이가 그려진 PNG/JPEG 또는 벡터 SVG/PDF로 내보냅니다. (headless 서버에서 사용)
+#   python src/batch_render.py /path/to/dataset -o ./overlays --labels obox,id --workers 8
+#   python src/batch_render.py /path/to/dataset -o ./figures --format svg --image-mode link
+#
+import argparse
+import os
+import os.path as pth
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional
+
+import cv2
+
+import multiviewset as MVS
+import renderer
+import vector_export
+from annotation_object import AnnotationStore
+
+_worker_ds: Optional[MVS.MultiViewSet] = None
+
+
+def add_render_arguments(parser: argparse.ArgumentParser):
+    """배치 렌더링 계열 CLI가 공통으로 쓰는 인자 (데이터셋, 씬/뷰 필터, 그리기 옵션, 워커 수)."""
+    parser.add_argument('dataset', help='데이터셋 루트 경로 (숫자 씬 폴더와 train/test_label_v1.5 포함)')
+    parser.add_argument('-o', '--out', required=True, help='출력 폴더')
+    parser.add_argument('--scenes', default='', help='렌더링할 씬 이름 (쉼표 구분, 기본: 전체)')
+    parser.add_argument('--views', default='', help='렌더링할 뷰 이름 (쉼표 구분, 기본: 전체)')
+    parser.add_argument('--limit', type=int, default=0, help='앞에서부터 N개 씬만 렌더링')
+    parser.add_argument('--labels', default='obox',
+                        help=f'그릴 항목 (쉼표 구분): {",".join(renderer.LABEL_OPTION_NAMES)}')
+    parser.add_argument('--usable', default='T', help='표시할 usable 값 (T, F 또는 T,F)')
+    parser.add_argument('--size', default='1280x720', help="출력 해상도 WxH 또는 'native'")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='프로세스 수')
+    parser.add_argument('--image-cache-gb', type=float, default=0,
+                        help='디코딩된 EO 이미지 디스크 캐시 한도 (GB, 0이면 사용 안 함). 워커 프로세스들이 공유합니다.')
+
+
+def parse_size(text: str):
+    if text.lower() == 'native': return None
+    w, h = (int(v) for v in text.lower().split('x'))
+    if w <= 0 or h <= 0: raise ValueError(f'invalid size: {text}')
+    return w, h
+
+
+def options_from_args(args) -> renderer.RenderOptions:
+    names = [n.strip() for n in args.labels.split(',') if n.strip()]
+    unknown = [n for n in names if n not in renderer.LABEL_OPTION_NAMES]
+    if unknown: raise ValueError(f'unknown label option(s): {", ".join(unknown)}')
+    usable = {u.strip().upper() for u in args.usable.split(',')}
+    size = parse_size(args.size)
+    return renderer.RenderOptions(checked=[renderer.LABEL_OPTION_NAMES.index(n) for n in names],
+                                  show_usable_true='T' in usable, show_usable_false='F' in usable,
+                                  dsize=size or (0, 0))
+
+
+def select_scenes(ds: MVS.MultiViewSet, scenes_arg: str, limit: int = 0) -> List[int]:
+    scene_names = ds.get_scene_name_list()
+    if scenes_arg:
+        max_length = ds.get_max_name_length()
+        wanted = [s.strip().zfill(max_length) for s in scenes_arg.split(',') if s.strip()]
+        indices = [scene_names.index(s) for s in wanted if s in scene_names]
+    else:
+        indices = list(range(len(scene_names)))
+    return indices[:limit] if limit > 0 else indices
+
+
+def select_views(view_names: List[str], views_arg: str) -> List[str]:
+    if not views_arg: return view_names
+    wanted = {v.strip() for v in views_arg.split(',') if v.strip()}
+    return [v for v in view_names if v in wanted]
+
+
+def image_cache_bytes_from_args(args) -> int:
+    return int(args.image_cache_gb * 1024 ** 3)
+
+
+def init_worker(dataset_path: str, image_cache_bytes: int = 0):
+    """워커 프로세스마다 MultiViewSet을 한 번만 만듭니다. OpenCV 내부 스레드는 1개로 제한합니다."""
+    global _worker_ds
+    cv2.setNumThreads(1)
+    _worker_ds = MVS.MultiViewSet(num_workers=1, image_cache_bytes=image_cache_bytes)
+    _worker_ds.set_path_and_name(dataset_path)
+
+
+def load_view(ds: MVS.MultiViewSet, scene_index: int, view_name: str, options: renderer.RenderOptions):
+    """뷰 하나를 읽어 (이미지, AnnotationStore, old boxes, 이 뷰에 쓸 옵션)을 반환합니다."""
+    data = ds.get_refined_data_for_view(scene_index, view_name)
+    if not data: return None
+    image, csv_data = data['image'], data['csv']
+    store = AnnotationStore.from_dataframe(csv_data)
+    old_boxes = renderer.load_old_boxes(csv_data) if renderer.CHECK_OLD in options.checked else None
+    if not options.dsize[0]:
+        options = renderer.RenderOptions(options.checked, options.show_usable_true, options.show_usable_false,
+                                         options.edit_mode, (image.shape[1], image.shape[0]))
+    return image, store, old_boxes, options
+
+
+def render_scene(scene_index: int, views_arg: str, options: renderer.RenderOptions, out_dir: str, ext: str,
+                 jpeg_quality: int, image_mode: str = 'embed'):
+    """워커에서 실행: 씬 하나의 (필터된) 뷰들을 렌더링하여 저장합니다. svg/pdf는 래스터 대신 벡터 도형으로 기록합니다."""
+    ds = _worker_ds
+    scene_name = ds.get_scene_name_list()[scene_index]
+    params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality] if ext == 'jpg' else []
+    written, pixels = 0, 0
+    t_start = time.perf_counter()
+    for view_name in select_views(ds.get_view_names_for_scene(scene_index), views_arg):
+        loaded = load_view(ds, scene_index, view_name, options)
+        if loaded is None: continue
+        image, store, old_boxes, view_options = loaded
+        out_path = pth.join(out_dir, f'AMOD_Viewer_{scene_name}_{view_name}.{ext}')
+        if ext in vector_export.VECTOR_FORMATS:
+            vector_export.export_view(out_path, image, store, view_options, old_boxes, image_mode,
+                                      ds.get_refined_eo_path_for(scene_index, view_name))
+        else:
+            frame = renderer.render_view(image, store, view_options, old_objects=old_boxes)
+            cv2.imwrite(out_path, frame, params)
+        written += 1
+        pixels += image.shape[0] * image.shape[1]
+    return scene_name, written, pixels, time.perf_counter() - t_start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='AMOD 데이터셋 오버레이 일괄 렌더링 (GUI 불필요)')
+    add_render_arguments(parser)
+    parser.add_argument('--format', choices=('png', 'jpg') + vector_export.VECTOR_FORMATS, default='png',
+                        help='출력 형식 (svg/pdf는 벡터 도형)')
+    parser.add_argument('--jpeg-quality', type=int, default=95)
+    parser.add_argument('--image-mode', choices=vector_export.IMAGE_MODES, default='embed',
+                        help='svg/pdf 배경 이미지: 포함(embed), 원본 링크(link, svg 전용), 생략(none)')
+    args = parser.parse_args(argv)
+
+    options = options_from_args(args)
+    ds = MVS.MultiViewSet(num_workers=1)
+    ds.set_path_and_name(args.dataset)
+    scene_indices = select_scenes(ds, args.scenes, args.limit)
+    if not scene_indices:
+        print('렌더링할 씬이 없습니다.')
+        return 1
+    os.makedirs(args.out, exist_ok=True)
+
+    workers = max(1, args.workers)
+    print(f'Rendering {len(scene_indices)} scenes with {workers} workers -> {args.out}')
+    t_start = time.perf_counter()
+    total_frames, total_pixels = 0, 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(args.dataset, image_cache_bytes_from_args(args))) as executor:
+        futures = [executor.submit(render_scene, i, args.views, options, args.out, args.format, args.jpeg_quality,
+                                   args.image_mode)
+                   for i in scene_indices]
+        for done, future in enumerate(as_completed(futures), 1):
+            scene_name, written, pixels, seconds = future.result()
+            total_frames += written
+            total_pixels += pixels
+            print(f'  [{done}/{len(futures)}] scene {scene_name}: {written} frames in {seconds:.2f} s')
+
+    elapsed = time.perf_counter() - t_start
+    print(f'Done: {total_frames} frames in {elapsed:.2f} s '
+          f'({total_frames / elapsed:.1f} frames/s, {total_pixels / 1e6 / elapsed:.1f} source MPix/s)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,310 @@
+#
+# benchmark.py
+# arma-rs-utils
+#
+# 합성 AMOD 데이터셋을 만들어 뷰어의 주요 경로(씬 사전 로딩, 어노테이션 변환, 렌더링, 객체 선택, 저장)의 시간을 재고
+# 결과를 JSON으로 저장합니다. 이전 커밋의 결과 파일과 비교하려면 --compare를 사용합니다.
+#   python src/benchmark.py -o bench.json --objects 200,2000 --resolution 1920x1080,4096x2160
+#   python src/benchmark.py -o new.json --compare old.json --work-dir /tmp/amod_bench   # 같은 합성 데이터 재사용
+#
+import argparse
+import contextlib
+import io
+import json
+import os
+import os.path as pth
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+import pandas as pd
+
+import annotation_io
+import multiviewset as MVS
+import renderer
+from annotation_object import POINT_COLUMNS
+
+REPO_ROOT = pth.dirname(pth.dirname(pth.abspath(__file__)))
+DATASET_INFO_NAME = '.benchmark_dataset.json'
+LINEAR_SCAN_QUERIES = 20
+CLASS_PAIRS = [tuple(name.split(':')) for name in renderer.FIXED_COLOR_STYLE if ':' in name]
+
+
+def parse_size(text: str) -> Tuple[int, int]:
+    w, h = text.lower().split('x')
+    return int(w), int(h)
+
+
+def synthetic_image(width: int, height: int, rng: np.random.Generator) -> np.ndarray:
+    """항공 영상처럼 저주파 배경에 약한 노이즈를 더한 BGR 이미지 (PNG 크기와 디코딩 시간이 실제와 비슷하도록)."""
+    low = rng.integers(40, 200, size=(max(2, height // 64), max(2, width // 64), 3), dtype=np.uint8)
+    image = cv2.resize(low, (width, height), interpolation=cv2.INTER_CUBIC)
+    noise = rng.integers(-12, 13, size=image.shape, dtype=np.int16)
+    return np.clip(image.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def synthetic_labels(num_objects: int, width: int, height: int, rng: np.random.Generator) -> pd.DataFrame:
+    """회전된 사각형 객체들의 Refined CSV (id, 클래스, usable, x1..y4, cx, cy, *_old)."""
+    centers = np.column_stack([rng.uniform(0.02, 0.98, num_objects) * width, rng.uniform(0.02, 0.98, num_objects) * height])
+    half = np.column_stack([rng.uniform(8, 40, num_objects), rng.uniform(4, 20, num_objects)])
+    angle = np.deg2rad(rng.uniform(0, 180, num_objects))
+    corners = np.array([[-1, -1], [1, -1], [1, 1], [-1, 1]], dtype=np.float64)
+    local = corners[None] * half[:, None, :]
+    cos, sin = np.cos(angle)[:, None], np.sin(angle)[:, None]
+    points = np.stack([local[..., 0] * cos - local[..., 1] * sin, local[..., 0] * sin + local[..., 1] * cos], axis=-1)
+    points = np.rint(points + centers[:, None, :]).reshape(num_objects, 8)
+
+    classes = [CLASS_PAIRS[i] for i in rng.integers(0, len(CLASS_PAIRS), num_objects)]
+    df = pd.DataFrame(points.astype(np.int64), columns=POINT_COLUMNS)
+    df.insert(0, 'id', [f'{i:05d}' for i in range(num_objects)])
+    df.insert(1, 'main_class', [c[0] for c in classes])
+    df.insert(2, 'middle_class', [c[1] for c in classes])
+    df.insert(3, 'usable', np.where(rng.random(num_objects) < 0.9, 'T', 'F'))
+    df['cx'], df['cy'] = np.rint(centers[:, 0]).astype(np.int64), np.rint(centers[:, 1]).astype(np.int64)
+    for column in POINT_COLUMNS:
+        df[f'{column}_old'] = df[column] + rng.integers(-3, 4, num_objects)
+    return df
+
+
+def generate_dataset(root: str, num_scenes: int, view_names: List[str], num_objects: int,
+                     width: int, height: int, seed: int = 0) -> str:
+    """
+    숫자 씬/뷰 폴더 구조의 합성 데이터셋을 만듭니다: <root>/<씬>/<뷰>/EO_<씬>_<뷰>.png, <root>/train_label_v1.5/Refined-EO_<씬>_<뷰>.csv
+    같은 설정으로 이미 만들어 둔 폴더가 있으면 그대로 사용합니다.
+    """
+    info = {'scenes': num_scenes, 'views': view_names, 'objects': num_objects, 'width': width, 'height': height, 'seed': seed}
+    info_path = pth.join(root, DATASET_INFO_NAME)
+    try:
+        with open(info_path, encoding='utf-8') as f:
+            if json.load(f) == info: return root
+    except (OSError, ValueError):
+        pass
+    shutil.rmtree(root, ignore_errors=True)
+    rng = np.random.default_rng(seed)
+    label_dir = pth.join(root, 'train_label_v1.5')
+    os.makedirs(label_dir)
+    for scene in range(num_scenes):
+        scene_name = f'{scene:04d}'
+        for view_name in view_names:
+            view_dir = pth.join(root, scene_name, view_name)
+            os.makedirs(view_dir)
+            cv2.imwrite(pth.join(view_dir, f'EO_{scene_name}_{view_name}.png'), synthetic_image(width, height, rng))
+            synthetic_labels(num_objects, width, height, rng).to_csv(
+                pth.join(label_dir, f'Refined-EO_{scene_name}_{view_name}.csv'), index=False)
+    with open(info_path, 'w', encoding='utf-8') as f:
+        json.dump(info, f)
+    return root
+
+
+def measure(fn: Callable, repeat: int, setup: Optional[Callable] = None) -> List[float]:
+    """fn을 repeat번 실행한 시간 (ms). setup은 매번 fn 직전에 실행되며 시간에 포함되지 않습니다."""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None: setup()
+        t_start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t_start) * 1000)
+    return samples
+
+
+def quiet(fn: Callable) -> Callable:
+    """진행 상황 print를 숨기고 fn을 실행하는 함수."""
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+    return run
+
+
+def make_result(name: str, config: dict, samples: List[float], unit: str = 'ms') -> dict:
+    return {'name': name, 'config': config, 'unit': unit, 'samples': [round(s, 4) for s in samples],
+            'min': min(samples), 'median': statistics.median(samples), 'mean': statistics.fmean(samples)}
+
+
+def open_dataset(root: str, args) -> MVS.MultiViewSet:
+    ds = MVS.MultiViewSet(num_workers=args.workers, image_cache_bytes=int(args.image_cache_gb * 1024 ** 3),
+                          image_cache_dir=pth.join(root, '.amod_cache', 'images'), manifest_dir=pth.join(root, '.amod_cache'))
+    quiet(lambda: ds.set_path_and_name(root))()
+    ds.set_scene_index(0)
+    ds.set_view_name(ds.get_view_names_for_scene(0)[len(ds.get_view_names_for_scene(0)) // 2])
+    return ds
+
+
+def bench_preload(root: str, config: dict, args) -> Tuple[List[dict], MVS.MultiViewSet]:
+    """preload_scene_data: 첫 실행은 라벨/이미지 캐시가 없는 상태(cold), 이후는 디스크 캐시가 있는 상태입니다."""
+    shutil.rmtree(pth.join(root, '.amod_cache'), ignore_errors=True)
+    samples, ds = [], None
+    for _ in range(args.repeat + 1):
+        if ds is not None: ds.shutdown()
+        ds = open_dataset(root, args)
+        samples += measure(quiet(ds.preload_scene_data), 1)
+    return [make_result('preload_scene_data (cold cache)', config, samples[:1]),
+            make_result('preload_scene_data', config, samples[1:])], ds
+
+
+def bench_selection(store, objects, config: dict, args) -> List[dict]:
+    """클릭 위치(절반은 객체 중심, 절반은 임의 위치)에 대한 객체 선택 시간 (μs/클릭)."""
+    rng = np.random.default_rng(args.seed)
+    height, width = config['height'], config['width']
+    centers = store.centers()
+    num_queries = args.queries
+    inside = centers[rng.integers(0, len(centers), num_queries // 2)] if len(centers) else np.empty((0, 2))
+    outside = np.column_stack([rng.uniform(0, width, num_queries - len(inside)), rng.uniform(0, height, num_queries - len(inside))])
+    points = np.concatenate([inside, outside])
+
+    scan_points = points[::max(1, len(points) // LINEAR_SCAN_QUERIES)] # 객체 수에 비례해 느리므로 일부 클릭만 사용
+
+    def linear_scan():
+        # 공간 인덱스 이전의 선택 방식: 위에 그려진 객체부터 AnnotationObject.check_selection으로 검사
+        for point in scan_points:
+            next((obj for obj in reversed(objects) if obj.check_selection(point)), None)
+
+    def hit_test():
+        for point in points:
+            store.hit_test(point)
+
+    return [make_result('check_selection (linear scan)', config,
+                        [s * 1000 / len(scan_points) for s in measure(linear_scan, args.repeat)], 'us/query'),
+            make_result('hit_test (spatial index)', config,
+                        [s * 1000 / len(points) for s in measure(hit_test, args.repeat)], 'us/query')]
+
+
+def bench_viewer(viewer, ds: MVS.MultiViewSet, config: dict, args) -> List[dict]:
+    view_data = ds.preloaded_scene_data[ds.get_view_name()]
+    csv_data = view_data['csv']
+    viewer.ds = ds
+    # 편집 세션에 남은 저장소(이전 설정에서 수정한 같은 (씬, 뷰) 키)를 재사용하지 않도록 매번 비우고 CSV에서 다시 만듭니다.
+    results = [make_result('load_annotations_from_csv', config,
+                           measure(lambda: viewer.load_annotations_from_csv(csv_data), args.repeat,
+                                   setup=viewer.edit_sessions.clear))]
+
+    def render():
+        # render_refined_scene은 그리기를 다음 이벤트 루프 틱으로 미루므로 render_now로 바로 그립니다.
+        viewer.render_refined_scene()
+        viewer.render_now()
+
+    render()
+    results.append(make_result('render_refined_scene', config, measure(render, args.repeat)))
+    results.append(make_result('render_refined_scene (new view)', config,
+                               measure(render, args.repeat, setup=viewer.base_layer_cache.clear)))
+    results += bench_selection(viewer.annotation_store, viewer.annotation_objects, config, args)
+
+    rng = np.random.default_rng(args.seed)
+    objects = viewer.annotation_objects
+    modified = [objects[i] for i in rng.choice(len(objects), max(1, int(len(objects) * args.modified)), replace=False)]
+    for obj in modified:
+        obj.translation = rng.uniform(-5, 5, 2)
+        obj.mark_as_modified()
+    viewer.annotation_store.invalidate()
+    csv_path = ds.get_current_refined_csv_path()
+    results.append(make_result('save_modified_annotations', config,
+                               measure(lambda: annotation_io.save_modified_annotations(csv_data, modified, csv_path), args.repeat)))
+    os.remove(annotation_io.modified_csv_path(csv_path))
+    return results
+
+
+def create_viewer():
+    """오프스크린 Qt 플랫폼에서 ArmaViewer를 만듭니다 (figs/ 상대 경로 때문에 저장소 루트에서 생성)."""
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+    import armaviewer
+    cwd = os.getcwd()
+    os.chdir(REPO_ROOT)
+    try:
+        viewer = armaviewer.ArmaViewer()
+    finally:
+        os.chdir(cwd)
+    return app, viewer
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def result_key(result: dict) -> str:
+    config = result['config']
+    return f"{result['name']} [{config['objects']} obj, {config['width']}x{config['height']}]"
+
+
+def print_comparison(results: List[dict], baseline_path: str):
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {result_key(r): r for r in json.load(f)['results']}
+    print(f'\nComparison with {baseline_path} (median):')
+    for result in results:
+        old = baseline.get(result_key(result))
+        if old is None: continue
+        ratio = result['median'] / old['median'] if old['median'] else float('inf')
+        print(f"  {result_key(result):<72} {old['median']:10.3f} -> {result['median']:10.3f} {result['unit']:<8} x{ratio:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='AMOD-Viewer 주요 경로 벤치마크 (합성 데이터셋)')
+    parser.add_argument('-o', '--out', default='benchmark.json', help='결과 JSON 파일')
+    parser.add_argument('--objects', default='200,2000', help='뷰당 객체 수 (쉼표 구분)')
+    parser.add_argument('--resolution', default='1920x1080', help='EO 이미지 해상도 WxH (쉼표 구분)')
+    parser.add_argument('--scenes', type=int, default=2, help='씬 수')
+    parser.add_argument('--views', default='0,10,20,30,40', help='뷰(look angle) 이름 (쉼표 구분)')
+    parser.add_argument('--repeat', type=int, default=5, help='항목별 반복 횟수')
+    parser.add_argument('--queries', type=int, default=200, help='선택 측정에 사용할 클릭 수')
+    parser.add_argument('--modified', type=float, default=0.1, help='저장 측정에서 수정된 객체 비율')
+    parser.add_argument('--workers', type=int, default=min(8, os.cpu_count() or 4), help='사전 로딩 스레드 수')
+    parser.add_argument('--image-cache-gb', type=float, default=0, help='디코딩 이미지 캐시 한도 (GB, 0이면 사용 안 함)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--work-dir', default='', help='합성 데이터셋 폴더 (지정하면 남겨 두고 다음 실행에서 재사용)')
+    parser.add_argument('--skip-gui', action='store_true', help='ArmaViewer가 필요한 항목(렌더링, 선택, 저장)을 건너뜀')
+    parser.add_argument('--compare', default='', help='비교할 이전 결과 JSON')
+    args = parser.parse_args(argv)
+
+    view_names = [v.strip() for v in args.views.split(',') if v.strip()]
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix='amod_bench_')
+    app, viewer = (None, None) if args.skip_gui else create_viewer()
+    results = []
+    try:
+        for width, height in (parse_size(s) for s in args.resolution.split(',')):
+            for num_objects in (int(n) for n in args.objects.split(',')):
+                config = {'objects': num_objects, 'width': width, 'height': height,
+                          'scenes': args.scenes, 'views': len(view_names)}
+                root = pth.join(work_dir, f'ds_{num_objects}obj_{width}x{height}')
+                print(f'[{num_objects} objects, {width}x{height}] dataset: {root}')
+                generate_dataset(root, args.scenes, view_names, num_objects, width, height, args.seed)
+
+                config_results, ds = bench_preload(root, config, args)
+                if viewer is not None:
+                    config_results += bench_viewer(viewer, ds, config, args)
+                ds.shutdown()
+                for result in config_results:
+                    print(f"  {result['name']:<36} median {result['median']:10.3f} {result['unit']:<8} "
+                          f"(min {result['min']:.3f}, n={len(result['samples'])})")
+                results += config_results
+    finally:
+        if viewer is not None: viewer.close()
+        if not args.work_dir: shutil.rmtree(work_dir, ignore_errors=True)
+
+    payload = {
+        'meta': {'timestamp': datetime.now().isoformat(timespec='seconds'), 'git': git_revision(),
+                 'python': platform.python_version(), 'platform': platform.platform(), 'cpu_count': os.cpu_count(),
+                 'numpy': np.__version__, 'opencv': cv2.__version__, 'pandas': pd.__version__, 'args': vars(args)},
+        'results': results,
+    }
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=1)
+    print(f'Results written to {args.out}')
+    if args.compare:
+        print_comparison(results, args.compare)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
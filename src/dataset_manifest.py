@@ -0,0 +1,187 @@
+#
+# dataset_manifest.py
+# arma-rs-utils
+#
+# 데이터셋 폴더 구조(씬/뷰/이미지/라벨 CSV 파일 이름과 폴더 mtime)를 로컬 캐시 폴더(image_cache.default_cache_dir)의
+# manifest.json에 저장해 두고, 이후의 모든 경로 조회를 메모리에서 처리합니다.
+# 다시 열 때는 폴더 mtime만 비교하여 바뀐 폴더만 다시 읽습니다 (씬은 처음 접근할 때 검사).
+# 매니페스트를 데이터셋 루트 안에 쓰면 그 쓰기로 루트 mtime이 바뀌어 매번 루트를 다시 읽게 되므로 루트 밖에 둡니다.
+#
+import json
+import os
+import os.path as pth
+import threading
+from typing import List, Optional, Set
+
+from image_cache import default_cache_dir
+
+LABEL_DIR_NAMES = ('train_label_v1.5', 'test_label_v1.5')
+
+
+def _scan_files(dir_path: str) -> Set[str]:
+    """폴더 안의 파일 이름들을 읽습니다 (폴더 mtime으로 다시 읽을지 판단하므로 파일별 stat은 하지 않습니다)."""
+    with os.scandir(dir_path) as it:
+        return {entry.name for entry in it if entry.is_file()}
+
+
+def _mtime(path: str) -> Optional[float]:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+class DatasetManifest:
+    """
+    데이터셋 루트 하나에 대한 매니페스트.
+    scenes: {씬 이름: {'mtime': 폴더 mtime, 'views': {뷰 이름: {'mtime': 폴더 mtime, 'files': {파일 이름}}}}}
+    labels: {라벨 폴더 이름: {'mtime': 폴더 mtime, 'files': {CSV 파일 이름}}}
+    파일 목록은 메모리에서 set, 매니페스트 파일에는 정렬된 리스트로 저장합니다.
+    매니페스트 파일을 쓸 수 없으면 (읽기 전용 저장소 등) 메모리에서만 사용합니다.
+    """
+    FILE_NAME = 'manifest.json'
+    VERSION = 2
+
+    def __init__(self, root: str, cache_dir: Optional[str] = None):
+        self.root = root
+        self.path = pth.join(cache_dir or default_cache_dir(root), self.FILE_NAME)
+        self.root_mtime = None
+        self.scenes = {}
+        self.labels = {}
+        self.__validated = set() # 이번 세션에서 mtime 검사를 마친 씬
+        self.__dirty = False
+        self.__persist = True
+        self.__lock = threading.RLock()
+
+    def open(self) -> 'DatasetManifest':
+        """매니페스트를 읽고 (없으면 전체를 한 번 스캔하여 만들고) 루트와 라벨 폴더를 다시 검사합니다."""
+        loaded = self.__read()
+        self.__refresh_root()
+        for name in LABEL_DIR_NAMES:
+            self.__refresh_label_dir(name)
+        if not loaded:
+            for scene_name in self.scenes:
+                self.__validate_scene(scene_name)
+        self.flush()
+        return self
+
+    # ---------- 조회 (메모리) ----------
+    def scene_names(self) -> List[str]:
+        return sorted(self.scenes)
+
+    def label_dir_name(self) -> Optional[str]:
+        return next((name for name in LABEL_DIR_NAMES if name in self.labels), None)
+
+    def has_label_file(self, file_name: str) -> bool:
+        label_dir = self.label_dir_name()
+        return label_dir is not None and file_name in self.labels[label_dir]['files']
+
+    def view_names(self, scene_name: str) -> List[str]:
+        scene = self.__scene(scene_name)
+        return sorted(scene['views']) if scene else []
+
+    def view_files(self, scene_name: str, view_name: str) -> Set[str]:
+        scene = self.__scene(scene_name)
+        view = scene['views'].get(view_name) if scene else None
+        return view['files'] if view else set()
+
+    def has_view_file(self, scene_name: str, view_name: str, file_name: str) -> bool:
+        return file_name in self.view_files(scene_name, view_name)
+
+    # ---------- 저장 ----------
+    def flush(self):
+        """변경 사항이 있으면 임시 파일에 쓴 뒤 교체합니다. 쓸 수 없으면 이후로는 메모리에서만 유지합니다."""
+        with self.__lock:
+            if not self.__dirty or not self.__persist: return
+            scenes = {name: {'mtime': scene['mtime'],
+                             'views': {view_name: {'mtime': view['mtime'], 'files': sorted(view['files'])}
+                                       for view_name, view in scene['views'].items()}}
+                      for name, scene in self.scenes.items()}
+            labels = {name: {'mtime': label['mtime'], 'files': sorted(label['files'])} for name, label in self.labels.items()}
+            payload = {'version': self.VERSION, 'root_mtime': self.root_mtime, 'scenes': scenes, 'labels': labels}
+            tmp_path = f'{self.path}.{os.getpid()}.tmp'
+            try:
+                os.makedirs(pth.dirname(self.path), exist_ok=True)
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(payload, f, separators=(',', ':'))
+                os.replace(tmp_path, self.path)
+                self.__dirty = False
+            except OSError as e:
+                print(f"경고: 매니페스트를 저장할 수 없어 메모리에서만 사용합니다: {self.path} - {e}")
+                self.__persist = False
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+    # ---------- 검사 ----------
+    def __read(self) -> bool:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if payload.get('version') != self.VERSION: return False
+        self.root_mtime = payload.get('root_mtime')
+        self.scenes = payload.get('scenes', {})
+        self.labels = payload.get('labels', {})
+        for entry in [view for scene in self.scenes.values() for view in scene['views'].values()] + list(self.labels.values()):
+            entry['files'] = set(entry['files'])
+        return True
+
+    def __refresh_root(self):
+        mtime = _mtime(self.root)
+        if mtime == self.root_mtime and self.scenes: return
+        names = {f for f in os.listdir(self.root) if f.isdigit() and pth.isdir(pth.join(self.root, f))}
+        for removed in set(self.scenes) - names:
+            del self.scenes[removed]
+        for added in names - set(self.scenes):
+            self.scenes[added] = {'mtime': None, 'views': {}}
+        self.root_mtime = mtime
+        self.__dirty = True
+
+    def __refresh_label_dir(self, name: str):
+        dir_path = pth.join(self.root, name)
+        mtime = _mtime(dir_path)
+        if mtime is None or not pth.isdir(dir_path):
+            if self.labels.pop(name, None) is not None: self.__dirty = True
+            return
+        cached = self.labels.get(name)
+        if cached is not None and cached['mtime'] == mtime: return
+        self.labels[name] = {'mtime': mtime, 'files': _scan_files(dir_path)}
+        self.__dirty = True
+
+    def __scene(self, scene_name: str) -> Optional[dict]:
+        if scene_name not in self.__validated:
+            with self.__lock:
+                if scene_name not in self.__validated:
+                    self.__validate_scene(scene_name)
+        return self.scenes.get(scene_name)
+
+    def __validate_scene(self, scene_name: str):
+        """씬 폴더와 각 뷰 폴더의 mtime을 비교하여 바뀐 폴더만 다시 읽습니다."""
+        self.__validated.add(scene_name)
+        scene = self.scenes.get(scene_name)
+        if scene is None: return
+        scene_path = pth.join(self.root, scene_name)
+        mtime = _mtime(scene_path)
+        if mtime is None:
+            del self.scenes[scene_name]
+            self.__dirty = True
+            return
+        views = scene['views']
+        if mtime != scene['mtime']:
+            names = {d for d in os.listdir(scene_path) if d.isdigit() and pth.isdir(pth.join(scene_path, d))}
+            for removed in set(views) - names:
+                del views[removed]
+            for added in names - set(views):
+                views[added] = {'mtime': None, 'files': set()}
+            scene['mtime'] = mtime
+            self.__dirty = True
+        for view_name, view in views.items():
+            view_path = pth.join(scene_path, view_name)
+            view_mtime = _mtime(view_path)
+            if view_mtime is not None and view_mtime != view['mtime']:
+                view['files'] = _scan_files(view_path)
+                view['mtime'] = view_mtime
+                self.__dirty = True
@@ -0,0 +1,98 @@
+#
+# edit_journal.py
+# arma-rs-utils
+#
+# 저장하지 않은 편집을 추가 전용(append-only) JSONL 파일에 기록해서, 뷰어가 비정상 종료되어도 다음 실행에서 복구할 수 있게 합니다.
+# 각 줄은 한 번의 편집으로 바뀐 객체들의 최종 변환 값(이동/스케일/회전)이므로 순서대로 다시 적용하면 같은 상태가 됩니다.
+#   {"seq": 12, "type": "edit", "scene": "0000", "view": "20", "ids": [...], "translation": [[tx, ty], ...], "scale": [...], "angle": [...]}
+#   {"seq": 13, "type": "saved", "scene": "0000", "view": "20", "upto": 12}   # 이 뷰는 seq 12까지 _modified.csv에 저장됨
+#
+import json
+import os
+import time
+from typing import Dict, Tuple
+
+import numpy as np
+
+JournalKey = Tuple[str, str] # (씬 이름, 뷰 이름)
+
+
+def _plain(values) -> list:
+    """NumPy 스칼라를 JSON으로 쓸 수 있는 파이썬 값으로 바꿉니다 (ID의 int / str 구분은 유지)."""
+    return [v.item() if isinstance(v, np.generic) else v for v in values]
+
+
+class EditJournal:
+    """
+    record()는 한 줄을 쓰고 바로 flush하므로, 프로세스가 죽어도 그 전까지의 편집은 파일에 남습니다.
+    저장이 끝난 뷰는 mark_saved()로 표시하고, 저장하지 않은 편집이 하나도 없으면 reset()으로 비웁니다.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.seq = 0
+        self.__file = None
+        for entry in self.__entries():
+            self.seq = max(self.seq, int(entry.get('seq', 0)))
+
+    def record(self, scene: str, view: str, ids, translation: np.ndarray, scale: np.ndarray, angle: np.ndarray) -> int:
+        return self.__append({'type': 'edit', 'scene': scene, 'view': view, 'ids': _plain(ids),
+                              'translation': np.asarray(translation, dtype=np.float64).round(4).tolist(),
+                              'scale': np.asarray(scale, dtype=np.float64).round(6).tolist(),
+                              'angle': np.asarray(angle, dtype=np.float64).round(6).tolist()})
+
+    def mark_saved(self, scene: str, view: str, upto: int):
+        self.__append({'type': 'saved', 'scene': scene, 'view': view, 'upto': int(upto)})
+
+    def pending(self) -> Dict[JournalKey, Dict[object, tuple]]:
+        """
+        마지막 저장 이후에 편집된 뷰마다 {ID: (translation, scale, angle)}.
+        복구는 원본 CSV에서 시작하므로, 그런 뷰는 저널에 있는 그 뷰의 모든 편집(저장 이전 것 포함)을 돌려줍니다.
+        """
+        states: Dict[JournalKey, Dict[object, tuple]] = {}
+        last_edit: Dict[JournalKey, int] = {}
+        saved_upto: Dict[JournalKey, int] = {}
+        for entry in self.__entries():
+            key = (entry.get('scene'), entry.get('view'))
+            if entry.get('type') == 'saved':
+                saved_upto[key] = max(saved_upto.get(key, 0), int(entry.get('upto', 0)))
+                continue
+            view_state = states.setdefault(key, {})
+            for obj_id, t, s, a in zip(entry['ids'], entry['translation'], entry['scale'], entry['angle']):
+                view_state[obj_id] = (t, s, a)
+            last_edit[key] = int(entry['seq'])
+        return {key: state for key, state in states.items() if last_edit[key] > saved_upto.get(key, 0)}
+
+    def reset(self):
+        """모든 편집이 저장되었으면 저널을 비웁니다."""
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def close(self):
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+    def __append(self, entry: dict) -> int:
+        self.seq += 1
+        entry = dict(seq=self.seq, time=round(time.time(), 3), **entry)
+        if self.__file is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self.__file = open(self.path, 'a', encoding='utf-8')
+        self.__file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self.__file.flush()
+        return self.seq
+
+    def __entries(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                lines = f.readlines()
+        except OSError:
+            return
+        for line in lines:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue # 기록 도중 종료되어 잘린 마지막 줄
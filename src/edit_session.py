@@ -0,0 +1,134 @@
+#
+# edit_session.py
+# arma-rs-utils
+#
+# 뷰별 편집 상태(AnnotationStore)를 (씬 인덱스, 뷰 이름) 단위로 보관하고, 객체의 보정 값을 다른 뷰의 같은 ID로 전파합니다.
+# 뷰를 옮겨 다녀도 저장하지 않은 수정이 남아 있으며, 전파/저장은 이 저장소들을 대상으로 합니다.
+#
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from annotation_object import AnnotationStore
+
+SessionKey = Tuple[int, str] # (씬 인덱스, 뷰 이름)
+
+
+class EditSessions:
+    """
+    (씬 인덱스, 뷰 이름) -> AnnotationStore. 수정된 객체가 있는 저장소는 다시 쓰므로 뷰를 바꿔도 수정 사항이 유지됩니다.
+    수정이 없는 저장소는 CSV에서 다시 만든 것과 같으므로 store_for()가 새로 만들고, drop_clean()으로 정리합니다.
+    """
+    def __init__(self):
+        self.__stores: Dict[SessionKey, AnnotationStore] = {}
+        self.__saved: Dict[SessionKey, np.ndarray] = {} # 마지막으로 저장한 시점의 편집 상태
+
+    @staticmethod
+    def edit_state(store: AnnotationStore) -> np.ndarray:
+        return np.concatenate([store.translation.ravel(), store.scale.ravel(), store.angle,
+                               store.modified]).astype(np.float64)
+
+    def is_dirty(self, key: SessionKey) -> bool:
+        """수정된 객체가 있고, 마지막 저장 이후 편집 상태가 바뀌었으면 True."""
+        store = self.__stores.get(key)
+        if store is None or not store.modified.any(): return False
+        saved = self.__saved.get(key)
+        return saved is None or not np.array_equal(saved, self.edit_state(store))
+
+    def mark_saved(self, key: SessionKey, state: np.ndarray):
+        self.__saved[key] = state
+
+    def __contains__(self, key: SessionKey) -> bool:
+        return key in self.__stores
+
+    def get(self, key: SessionKey) -> Optional[AnnotationStore]:
+        return self.__stores.get(key)
+
+    def store_for(self, key: SessionKey, csv_data: Optional[pd.DataFrame], parent_viewer=None) -> AnnotationStore:
+        store = self.__stores.get(key)
+        if store is None or not store.modified.any():
+            store = AnnotationStore.from_dataframe(csv_data, parent_viewer)
+            self.__stores[key] = store
+        return store
+
+    def dirty_keys(self, scene_index: Optional[int] = None) -> List[SessionKey]:
+        """저장하지 않은 편집이 있는 뷰 (scene_index가 주어지면 그 씬만)."""
+        return sorted(key for key in self.__stores
+                      if (scene_index is None or key[0] == scene_index) and self.is_dirty(key))
+
+    def drop_clean(self, keep: Optional[SessionKey] = None):
+        for key in [k for k, store in self.__stores.items() if k != keep and not store.modified.any()]:
+            del self.__stores[key]
+            self.__saved.pop(key, None)
+
+    def clear(self):
+        self.__stores.clear()
+        self.__saved.clear()
+
+
+class PropagationPlan:
+    """
+    source 저장소의 rows 객체 보정 값을 targets의 같은 ID 객체에 옮기는 계획.
+    matches[key] = (target 행 인덱스, 대응하는 source 행 인덱스), missing[key] = 그 뷰에 없는 source ID 수
+    """
+    def __init__(self, source: AnnotationStore, rows: np.ndarray):
+        self.source = source
+        self.rows = rows
+        self.matches: Dict[Hashable, Tuple[np.ndarray, np.ndarray]] = {}
+        self.missing: Dict[Hashable, int] = {}
+
+    @property
+    def object_count(self) -> int:
+        return sum(len(target_rows) for target_rows, _ in self.matches.values())
+
+    def apply(self, key: Hashable, target: AnnotationStore):
+        """key 뷰에 대해 계획된 이동/스케일/회전 값을 한 번에 덮어쓰고 수정됨으로 표시합니다."""
+        target_rows, source_rows = self.matches.get(key, (None, None))
+        if target_rows is None or not len(target_rows): return
+        target.translation[target_rows] = self.source.translation[source_rows]
+        target.scale[target_rows] = self.source.scale[source_rows]
+        target.angle[target_rows] = self.source.angle[source_rows]
+        target.modified[target_rows] = True
+
+
+def plan_propagation(source: AnnotationStore, rows, targets: Dict[Hashable, AnnotationStore]) -> PropagationPlan:
+    """
+    source의 rows 객체와 ID가 같은 객체를 모든 targets에서 찾습니다.
+    대상 뷰들의 ID를 한 배열로 이어 붙여 ID 조회를 한 번에 수행한 뒤 뷰별로 나눕니다.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    plan = PropagationPlan(source, rows)
+    if not len(rows) or not targets: return plan
+
+    # 같은 ID가 여러 번 있으면 마지막(위에 그려진) 행을 사용합니다.
+    source_ids = pd.Index(source.ids[rows])
+    unique = ~source_ids.duplicated(keep='last')
+    source_index, source_rows = source_ids[unique], rows[unique]
+
+    keys = list(targets)
+    lengths = [len(targets[key]) for key in keys]
+    all_ids = np.concatenate([targets[key].ids for key in keys]) if sum(lengths) else np.empty(0, dtype=object)
+    found = source_index.get_indexer(all_ids) # 대상 행마다 source 행 위치 (없으면 -1)
+
+    for key, start, length in zip(keys, np.cumsum([0] + lengths[:-1]), lengths):
+        view_found = found[start:start + length]
+        target_rows = np.flatnonzero(view_found >= 0)
+        plan.matches[key] = (target_rows, source_rows[view_found[target_rows]])
+        plan.missing[key] = len(source_rows) - len(np.unique(view_found[target_rows]))
+    return plan
+
+
+def apply_edits(store: AnnotationStore, ids, translation, scale, angle) -> int:
+    """
+    ids(중복 없음) 객체에 변환 값을 한 번에 덮어쓰고 수정됨으로 표시합니다 (편집 저널 복구).
+    저장소에 같은 ID 행이 여러 개면 모두 갱신하며, 갱신한 행 수를 반환합니다.
+    """
+    if not len(ids) or not len(store): return 0
+    source = pd.Index(ids).get_indexer(store.ids) # 저장소 행마다 ids 위치 (없으면 -1)
+    rows = np.flatnonzero(source >= 0)
+    store.translation[rows] = np.asarray(translation, dtype=np.float64)[source[rows]]
+    store.scale[rows] = np.asarray(scale, dtype=np.float64)[source[rows]]
+    store.angle[rows] = np.asarray(angle, dtype=np.float64)[source[rows]]
+    store.modified[rows] = True
+    return len(rows)
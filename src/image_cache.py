@@ -0,0 +1,132 @@
+#
+# image_cache.py
+# arma-rs-utils
+#
+# 디코딩된 EO 이미지(RGB uint8)를 캐시 폴더에 .npy로 저장해 두고, 다시 열 때는 PNG 디코딩 대신
+# np.load(mmap_mode='r')로 복사 없이 매핑합니다. 같은 머신의 여러 뷰어 프로세스가 캐시 파일(과 OS 페이지 캐시)을 공유합니다.
+# 파일 mtime을 마지막 사용 시각으로 사용하며, 전체 크기가 max_bytes를 넘으면 오래된 파일부터 지웁니다.
+#
+import hashlib
+import os
+import os.path as pth
+import threading
+from typing import Optional
+
+import cv2
+import numpy as np
+
+import perf
+
+DEFAULT_CACHE_ROOT = pth.join(pth.expanduser('~'), '.cache', 'amod_viewer', 'images')
+
+
+def default_cache_dir(dataset_root: str) -> str:
+    """데이터셋마다 로컬 디스크의 별도 폴더를 사용합니다 (네트워크 저장소에 큰 파일을 쓰지 않도록)."""
+    digest = hashlib.sha1(pth.abspath(dataset_root).encode('utf-8')).hexdigest()[:12]
+    return pth.join(DEFAULT_CACHE_ROOT, f'{pth.basename(pth.normpath(dataset_root))}_{digest}')
+
+
+def decode_rgb(image_path: str) -> Optional[np.ndarray]:
+    # 디스크 읽기와 디코딩을 따로 측정할 수 있도록 cv2.imread 대신 파일 바이트를 읽은 뒤 imdecode합니다.
+    with perf.span('disk_read'):
+        try:
+            buf = np.fromfile(image_path, dtype=np.uint8)
+        except OSError:
+            return None
+    with perf.span('decode'):
+        image = cv2.imdecode(buf, cv2.IMREAD_COLOR)
+        if image is None: return None
+        return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+
+class ImageCache:
+    """
+    '<이미지 이름>.<크기>_<mtime_ns>.npy' 파일로 디코딩 결과를 저장합니다. 원본이 바뀌면 이름이 달라지므로 다시 디코딩합니다.
+    반환되는 배열은 읽기 전용 np.memmap이므로 제자리 수정하면 안 됩니다.
+    """
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_bytes)
+        self.enabled = self.max_bytes > 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__approx_bytes: Optional[int] = None # 마지막 스캔 이후 추정한 캐시 폴더 크기
+        self.__lock = threading.Lock()
+
+    def cache_path(self, image_path: str, st: Optional[os.stat_result] = None) -> str:
+        st = st or os.stat(image_path)
+        stem = pth.splitext(pth.basename(image_path))[0]
+        return pth.join(self.cache_dir, f'{stem}.{st.st_size}_{st.st_mtime_ns}.npy')
+
+    def load(self, image_path: str) -> Optional[np.ndarray]:
+        if not self.enabled: return decode_rgb(image_path)
+        cache_path = self.cache_path(image_path)
+        try:
+            with perf.span('image_cache_map'):
+                image = np.load(cache_path, mmap_mode='r', allow_pickle=False)
+            try:
+                os.utime(cache_path) # LRU: 마지막 사용 시각 갱신
+            except OSError:
+                pass
+            with self.__lock: self.hits += 1
+            perf.count('image_cache.hit')
+            return image
+        except (OSError, ValueError):
+            pass # 캐시 없음 / 손상 -> 디코딩
+
+        image = decode_rgb(image_path)
+        with self.__lock: self.misses += 1
+        perf.count('image_cache.miss')
+        if image is not None:
+            self.__write(cache_path, image)
+        return image
+
+    def __write(self, cache_path: str, image: np.ndarray):
+        tmp_path = f'{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                np.save(f, image, allow_pickle=False)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"경고: 이미지 캐시를 쓸 수 없어 캐시 없이 디코딩합니다: {self.cache_dir} - {e}")
+            self.enabled = False
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        with self.__lock:
+            if self.__approx_bytes is not None:
+                self.__approx_bytes += image.nbytes
+            if self.__approx_bytes is None or self.__approx_bytes > self.max_bytes:
+                self.__evict()
+
+    def __evict(self):
+        """캐시 폴더를 스캔하여 max_bytes 이하가 될 때까지 가장 오래 사용되지 않은 파일을 지웁니다."""
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith('.npy'):
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes: break
+            try:
+                os.remove(path) # 다른 프로세스가 매핑 중이어도 POSIX에서는 매핑이 유지됩니다.
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+        self.__approx_bytes = total
+
+    def stats(self) -> dict:
+        with self.__lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'approx_bytes': self.__approx_bytes, 'max_bytes': self.max_bytes}
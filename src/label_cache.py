@@ -0,0 +1,179 @@
+#
+# label_cache.py
+# arma-rs-utils
+#
+# Refined 라벨 CSV를 NumPy .npy(구조체 배열, 컬럼별 명시적 dtype)로 변환해 두고 다음부터는 텍스트 파싱 없이 읽습니다.
+# 캐시 파일 이름에 원본 CSV의 크기/mtime이 들어가며, CSV가 바뀌면 자동으로 다시 변환합니다.
+#   python src/label_cache.py /path/to/dataset --workers 8   # 데이터셋 전체 라벨을 미리 변환
+#
+import argparse
+import glob
+import os
+import os.path as pth
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+import perf
+from dataset_manifest import DatasetManifest
+
+CACHE_DIR_NAME = pth.join('.amod_cache', 'labels')
+
+
+NULL_PREFIX = '__null__:'
+
+
+def dataframe_to_table(df: pd.DataFrame) -> np.ndarray:
+    """
+    DataFrame을 컬럼별 명시적 dtype의 구조체 배열 하나로 바꿉니다 (필드 이름 = 컬럼 이름).
+    문자열(object) 컬럼은 고정 길이 유니코드로 저장하고, 빈 값은 '__null__:<컬럼>' bool 필드에 따로 기록합니다.
+    """
+    fields, values = [], []
+    for column in df.columns:
+        series = df[column]
+        name = str(column)
+        if pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+            array = series.to_numpy()
+        else:
+            null_mask = series.isna().to_numpy()
+            array = np.array([str(v) for v in series.astype(object).where(~null_mask, '')], dtype=np.str_)
+            fields.append((NULL_PREFIX + name, np.bool_))
+            values.append(null_mask)
+        fields.append((name, array.dtype))
+        values.append(array)
+    table = np.empty(len(df), dtype=fields)
+    for (name, _), array in zip(fields, values):
+        table[name] = array
+    return table
+
+
+def table_to_dataframe(table: np.ndarray) -> pd.DataFrame:
+    data = {}
+    for name in table.dtype.names:
+        if name.startswith(NULL_PREFIX): continue
+        values = table[name]
+        if values.dtype.kind == 'U':
+            # read_csv와 같이 빈 값은 NaN인 문자열 컬럼으로 되돌립니다.
+            values = values.astype(object)
+            values[table[NULL_PREFIX + name]] = np.nan
+        data[name] = values
+    return pd.DataFrame(data, columns=list(data))
+
+
+class LabelCache:
+    """
+    cache_dir 아래에 '<CSV 이름>.<크기>_<mtime_ns>.npy'로 변환 결과를 둡니다 (zip 없는 단일 .npy라 여는 비용이 작음).
+    원본 CSV의 크기/mtime이 바뀌면 파일 이름이 달라지므로 CSV를 다시 파싱하여 새로 쓰고 이전 파일은 지웁니다.
+    캐시 폴더를 쓸 수 없으면 CSV 파싱만 합니다.
+    """
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self.__lock = threading.Lock()
+
+    @classmethod
+    def for_dataset(cls, dataset_root: str) -> 'LabelCache':
+        return cls(pth.join(dataset_root, CACHE_DIR_NAME))
+
+    def cache_path(self, csv_path, st: Optional[os.stat_result] = None) -> str:
+        st = st or os.stat(csv_path)
+        stem = pth.splitext(pth.basename(csv_path))[0]
+        return pth.join(self.cache_dir, f'{stem}.{st.st_size}_{st.st_mtime_ns}.npy')
+
+    def load(self, csv_path) -> pd.DataFrame:
+        cache_path = self.cache_path(csv_path)
+        if self.enabled:
+            try:
+                with perf.span('label_cache_read'):
+                    df = table_to_dataframe(np.load(cache_path, allow_pickle=False))
+                with self.__lock: self.hits += 1
+                perf.count('label_cache.hit')
+                return df
+            except (OSError, ValueError):
+                pass # 캐시 없음 / 손상 -> 다시 변환
+
+        with perf.span('csv_parse'):
+            df = pd.read_csv(csv_path)
+        with self.__lock: self.misses += 1
+        perf.count('label_cache.miss')
+        if self.enabled:
+            self.__write(csv_path, cache_path, df)
+        return df
+
+    def warm(self, csv_path) -> bool:
+        """캐시가 최신이 아니면 변환합니다. 변환했으면 True."""
+        if pth.exists(self.cache_path(csv_path)): return False
+        self.load(csv_path)
+        return True
+
+    def __write(self, csv_path, cache_path: str, df: pd.DataFrame):
+        tmp_path = f'{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                np.save(f, dataframe_to_table(df), allow_pickle=False)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"경고: 라벨 캐시를 쓸 수 없어 CSV를 직접 읽습니다: {self.cache_dir} - {e}")
+            self.enabled = False
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        # 같은 CSV의 이전 버전 변환 결과를 정리합니다.
+        stem = pth.splitext(pth.basename(csv_path))[0]
+        for stale in glob.glob(pth.join(glob.escape(self.cache_dir), f'{glob.escape(stem)}.*.npy')):
+            if stale != cache_path:
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+
+
+_worker_cache: Optional[LabelCache] = None
+
+
+def _init_worker(cache_dir: str):
+    global _worker_cache
+    _worker_cache = LabelCache(cache_dir)
+
+
+def _warm_one(csv_path: str) -> bool:
+    return _worker_cache.warm(csv_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='AMOD Refined 라벨 CSV를 바이너리 캐시로 미리 변환')
+    parser.add_argument('dataset', help='데이터셋 루트 경로 (train/test_label_v1.5 포함)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='프로세스 수')
+    args = parser.parse_args(argv)
+
+    manifest = DatasetManifest(args.dataset).open()
+    label_dir_name = manifest.label_dir_name()
+    if not label_dir_name:
+        print("경고: 'train_label_v1.5' 또는 'test_label_v1.5' 폴더를 찾을 수 없습니다.")
+        return 1
+    label_dir = pth.join(args.dataset, label_dir_name)
+    csv_paths = sorted(pth.join(label_dir, f) for f in manifest.labels[label_dir_name]['files'] if f.endswith('.csv'))
+    cache_dir = pth.join(args.dataset, CACHE_DIR_NAME)
+
+    workers = max(1, args.workers)
+    print(f'Warming {len(csv_paths)} label files with {workers} workers -> {cache_dir}')
+    t_start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cache_dir,)) as executor:
+        converted = sum(executor.map(_warm_one, csv_paths, chunksize=16))
+    elapsed = time.perf_counter() - t_start
+    print(f'Done: {converted} converted, {len(csv_paths) - converted} already up to date in {elapsed:.2f} s')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
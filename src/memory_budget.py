@@ -0,0 +1,143 @@
+#
+# memory_budget.py
+# arma-rs-utils
+#
+# 사전 로딩된 뷰 데이터의 메모리 사용량을 집계하고 상한을 적용합니다.
+# 씬 하나가 상한(scene_limit)을 넘으면 현재 뷰 주변 keep_decoded개 뷰만 디코딩 상태로 두고,
+# 나머지 뷰의 이미지는 무손실 PNG 바이트로 압축해 두었다가 다시 볼 때 디코딩합니다.
+# 이미지 캐시의 memmap 이미지는 파일에 기반하므로(OS가 회수 가능) 힙 사용량으로 세지 않습니다.
+#
+from typing import Dict, Iterable, List, Optional
+
+import cv2
+import numpy as np
+
+import perf
+
+STATE_DECODED, STATE_COMPRESSED, STATE_MAPPED = 'decoded', 'compressed', 'mapped'
+
+
+class CompressedImage:
+    """디코딩된 이미지를 무손실 PNG(빠른 압축 레벨)로 보관합니다. 채널 순서는 그대로 유지됩니다."""
+    __slots__ = ('data', 'shape', 'dtype')
+
+    def __init__(self, image: np.ndarray, compression: int = 1):
+        ok, buf = cv2.imencode('.png', np.ascontiguousarray(image), [cv2.IMWRITE_PNG_COMPRESSION, compression])
+        if not ok: raise RuntimeError('이미지 압축 실패')
+        self.data = buf
+        self.shape = image.shape
+        self.dtype = image.dtype
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.data.nbytes)
+
+    def decode(self) -> np.ndarray:
+        with perf.span('decompress'):
+            return cv2.imdecode(self.data, cv2.IMREAD_UNCHANGED)
+
+
+def image_state(image) -> str:
+    if isinstance(image, CompressedImage): return STATE_COMPRESSED
+    if isinstance(image, np.memmap): return STATE_MAPPED
+    return STATE_DECODED
+
+
+def image_heap_bytes(image) -> int:
+    """프로세스 힙을 차지하는 byte 수 (memmap은 0, 압축 이미지는 압축된 크기)."""
+    if image is None or isinstance(image, np.memmap): return 0
+    return int(image.nbytes)
+
+
+def decoded_image(view_data: dict) -> Optional[np.ndarray]:
+    """뷰 데이터를 바꾸지 않고 디코딩된 이미지를 돌려줍니다 (내보내기처럼 한 번만 쓰는 경우)."""
+    image = view_data.get('image')
+    return image.decode() if isinstance(image, CompressedImage) else image
+
+
+def view_memory(view_data: Optional[dict]) -> dict:
+    if not view_data: return {'image_bytes': 0, 'csv_bytes': 0, 'mapped_bytes': 0, 'state': None}
+    image = view_data.get('image')
+    csv_data = view_data.get('csv')
+    return {
+        'image_bytes': image_heap_bytes(image),
+        'csv_bytes': int(csv_data.memory_usage(index=True, deep=True).sum()) if csv_data is not None else 0,
+        'mapped_bytes': int(image.nbytes) if isinstance(image, np.memmap) else 0,
+        'state': image_state(image),
+    }
+
+
+def format_bytes(nbytes: int) -> str:
+    return f'{nbytes / 1024 ** 2:.1f} MiB'
+
+
+class MemoryBudget:
+    """
+    max_bytes: 뷰 데이터 전체(씬 캐시 포함)의 상한. 씬 하나에는 max_bytes / scene_share까지 허용합니다
+    (현재 씬과 앞뒤로 미리 읽은 씬이 함께 들어가도록 기본 3).
+    keep_decoded: 상한을 넘어도 항상 디코딩 상태로 둘 현재 뷰 주변 뷰 개수.
+    min_saving: 압축 후 크기가 원본의 이 비율을 넘으면 압축하지 않습니다.
+    """
+    def __init__(self, max_bytes: int, keep_decoded: int = 3, scene_share: int = 3, min_saving: float = 0.8):
+        self.max_bytes = int(max_bytes)
+        self.keep_decoded = max(1, int(keep_decoded))
+        self.scene_share = max(1, int(scene_share))
+        self.min_saving = min_saving
+        self.compressed_count = 0
+        self.decompressed_count = 0
+
+    @property
+    def scene_limit(self) -> int:
+        return self.max_bytes // self.scene_share
+
+    @staticmethod
+    def scene_heap_bytes(scene_data: Dict[str, dict]) -> int:
+        """상한 비교용: 대부분을 차지하는 이미지만 셉니다 (CSV의 deep memory_usage는 매번 계산하기에 비쌉니다)."""
+        return sum(image_heap_bytes(v.get('image')) for v in scene_data.values() if v)
+
+    @staticmethod
+    def views_by_distance(view_names: Iterable[str], focus_view: Optional[str]) -> List[str]:
+        """각도 순서상 focus_view에서 가까운 뷰부터 정렬합니다."""
+        ordered = sorted(view_names, key=lambda v: int(v) if str(v).isdigit() else 0)
+        if focus_view not in ordered: return ordered
+        center = ordered.index(focus_view)
+        return sorted(ordered, key=lambda v: abs(ordered.index(v) - center))
+
+    def fit_scene(self, scene_data: Dict[str, dict], focus_view: Optional[str] = None) -> int:
+        """씬이 scene_limit을 넘으면 focus_view에서 먼 뷰부터 압축합니다. 압축한 뷰 수를 반환합니다."""
+        total = self.scene_heap_bytes(scene_data)
+        if total <= self.scene_limit: return 0
+        compressed = 0
+        candidates = self.views_by_distance(list(scene_data), focus_view)[self.keep_decoded:]
+        for view_name in reversed(candidates):
+            if total <= self.scene_limit: break
+            view_data = scene_data.get(view_name)
+            image = view_data.get('image') if view_data else None
+            if image_state(image) != STATE_DECODED: continue
+            packed = CompressedImage(image)
+            if packed.nbytes > image.nbytes * self.min_saving: continue # 거의 줄지 않으면 (노이즈가 많은 영상) 디코딩 상태로 둡니다.
+            view_data['image'] = packed
+            total -= image.nbytes - packed.nbytes
+            compressed += 1
+        self.compressed_count += compressed
+        return compressed
+
+    @staticmethod
+    def is_compressed(view_data: Optional[dict]) -> bool:
+        return bool(view_data) and isinstance(view_data.get('image'), CompressedImage)
+
+    def ensure_decoded(self, view_data: Optional[dict]) -> Optional[dict]:
+        """압축된 뷰라면 디코딩하여 그 자리에 되돌려 놓습니다."""
+        if view_data and isinstance(view_data.get('image'), CompressedImage):
+            view_data['image'] = view_data['image'].decode()
+            self.decompressed_count += 1
+        return view_data
+
+    def report(self, scene_data: Dict[str, dict]) -> dict:
+        views = {v: view_memory(d) for v, d in scene_data.items()}
+        return {
+            'views': views,
+            'heap_bytes': sum(m['image_bytes'] + m['csv_bytes'] for m in views.values()),
+            'mapped_bytes': sum(m['mapped_bytes'] for m in views.values()),
+            'compressed_views': sum(1 for m in views.values() if m['state'] == STATE_COMPRESSED),
+        }
@@ -7,20 +7,31 @@
 #
 import os
 import os.path as pth
+import threading
+import time
 import pandas as pd
-import numpy as np
-import re
-import glob
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional
-import cv2
+from typing import List, Optional, Tuple
+
+import perf
+from dataset_manifest import DatasetManifest
+from image_cache import ImageCache, decode_rgb, default_cache_dir
+from label_cache import LabelCache
+from memory_budget import MemoryBudget, format_bytes
+from scene_cache import SceneCache
 
 
 class MultiViewSet:
     """
     A class representing a dataset.
     """
-    def __init__(self, base_scene_idx=0, base_view_idx='0'):
+    VIEW_TIMING_LIMIT = 256 # view_load_timings에 남길 최근 뷰 로딩 기록 수 (씬 몇 개 분량)
+
+    def __init__(self, base_scene_idx=0, base_view_idx='0', num_workers=4, cache_bytes=1536 * 1024 ** 2,
+                 use_label_cache=True, image_cache_bytes=0, image_cache_dir=None, keep_decoded_views=3, lazy_loading=False,
+                 manifest_dir=None):
         self.__set_path = ''
         self.__set_name = ''
         self.__scene_name = ''
@@ -31,7 +42,25 @@ class MultiViewSet:
         self.__view_path_list = []
         self.base_view_idx = base_view_idx
         self.__refined_label_root = ''
+        self.manifest: Optional[DatasetManifest] = None # 폴더 구조 조회는 모두 매니페스트(메모리)에서 처리합니다.
+        self.manifest_dir = manifest_dir # None이면 image_cache.default_cache_dir(데이터셋 루트 밖)
+        self.use_label_cache = use_label_cache
+        self.label_cache: Optional[LabelCache] = None # Refined CSV -> .npy 변환 캐시
+        self.image_cache_bytes = image_cache_bytes # 0이면 디코딩 이미지 캐시를 쓰지 않습니다.
+        self.image_cache_dir = image_cache_dir
+        self.image_cache: Optional[ImageCache] = None # EO PNG -> 메모리 매핑 .npy 캐시
         self.preloaded_scene_data = {} # ★★★ 씬 데이터를 캐시할 딕셔너리 추가 ★★★
+        self.lazy_loading = lazy_loading # True면 씬 전환 시 모든 뷰를 디코딩하지 않고, 뷰를 처음 볼 때 하나씩 로딩합니다.
+        self.num_workers = max(1, int(num_workers))
+        self.__executor: Optional[ThreadPoolExecutor] = None
+        # (씬 인덱스, 뷰 이름)별 로딩 시간 (ms) 기록. 최근 VIEW_TIMING_LIMIT개만 유지합니다 (워커 스레드에서 기록).
+        self.view_load_timings = OrderedDict()
+        self.__timings_lock = threading.Lock()
+        self.scene_cache = SceneCache(max_bytes=cache_bytes) # 씬 인덱스 -> {뷰 이름: 뷰 데이터}
+        # 뷰 데이터 전체의 메모리 상한. 씬 하나가 몫을 넘으면 현재 뷰에서 먼 뷰의 이미지를 압축해 둡니다.
+        self.memory_budget = MemoryBudget(max_bytes=cache_bytes, keep_decoded=keep_decoded_views)
+        self.__inflight = {} # (씬 인덱스, 뷰 이름) -> 진행 중인 Future
+        self.__inflight_lock = threading.Lock()
 
     def get_set_path(self): return self.__set_path
     def set_set_path(self, path): self.__set_path = path
@@ -59,8 +88,9 @@ class MultiViewSet:
         return pth.join(self.__scene_path_list[self.__current_scene_idx], self.__current_view_idx)
 
     def get_ir_path(self):
+        files = self.manifest.view_files(self.get_scene_name(), self.__current_view_idx)
         view_path = self.get_view_path()
-        return next((pth.join(view_path, i) for i in os.listdir(view_path) if 'IR' in i and i.endswith('png')), None)
+        return next((pth.join(view_path, i) for i in sorted(files) if 'IR' in i and i.endswith('png')), None)
 
     def get_scene_path_list(self):
         return self.__scene_path_list
@@ -74,32 +104,27 @@ class MultiViewSet:
         self.__set_path = path
         self.__set_name = pth.basename(path)
 
-        base_list = []
-        for f in os.listdir(path):
-            if f.isdigit():
-                base_list.append(f)
-        
-        base_list.sort()
-        self.__scene_name_list = sorted(base_list)
+        # 씬/뷰/라벨 목록은 매니페스트에서 가져옵니다 (바뀐 폴더만 mtime으로 다시 읽음).
+        self.manifest = DatasetManifest(path, self.manifest_dir).open()
+        self.__scene_name_list = self.manifest.scene_names()
         self.__scene_path_list = [os.path.join(path, f) for f in self.__scene_name_list]
+        self.label_cache = LabelCache.for_dataset(path) if self.use_label_cache else None
+        if self.image_cache_bytes > 0:
+            self.image_cache = ImageCache(self.image_cache_dir or default_cache_dir(path), self.image_cache_bytes)
 
         # Refined 라벨 폴더 (train/test) 자동 감지
-        train_label_path = pth.join(path, "train_label_v1.5")
-        test_label_path = pth.join(path, "test_label_v1.5")
-
-        if pth.isdir(train_label_path):
-            self.set_refined_label_root(train_label_path)
-            print(f"감지된 라벨 폴더: {train_label_path}")
-        elif pth.isdir(test_label_path):
-            self.set_refined_label_root(test_label_path)
-            print(f"감지된 라벨 폴더: {test_label_path}")
+        label_dir_name = self.manifest.label_dir_name()
+        if label_dir_name:
+            label_path = pth.join(path, label_dir_name)
+            self.set_refined_label_root(label_path)
+            print(f"감지된 라벨 폴더: {label_path}")
         else:
             self.set_refined_label_root('')
             print("경고: 'train_label_v1.5' 또는 'test_label_v1.5' 폴더를 찾을 수 없습니다.")
 
     def update_best_view_idx(self):
         try:
-            look_angles = sorted([d for d in os.listdir(self.__scene_path_list[0]) if d.isdigit()])
+            look_angles = self.manifest.view_names(self.__scene_name_list[0])
             if not look_angles: return '0'
             
             median_idx = len(look_angles) // 2
@@ -124,12 +149,20 @@ class MultiViewSet:
         self.__refined_label_root = path
 
     def get_current_refined_csv_path(self) -> Optional[Path]:
-        scene_name = self.get_scene_name()
-        view_name = self.get_view_name()
+        return self.get_refined_csv_path_for(self.get_scene_index(), self.get_view_name())
+
+    def __is_manifest_label_root(self, path: str) -> bool:
+        label_dir_name = self.manifest.label_dir_name() if self.manifest is not None else None
+        return bool(label_dir_name) and path == pth.join(self.__set_path, label_dir_name)
+
+    def get_refined_csv_path_for(self, scene_index: int, view_name: str) -> Optional[Path]:
+        scene_name = self.__scene_name_list[scene_index]
         target_csv_name = f"Refined-EO_{scene_name}_{view_name}.csv"
         refined_root_path = self.get_refined_label_root()
         if not refined_root_path: return None
         
+        if self.__is_manifest_label_root(refined_root_path):
+            return Path(refined_root_path) / target_csv_name if self.manifest.has_label_file(target_csv_name) else None
         target_path = Path(refined_root_path) / target_csv_name
         
         if target_path.exists():
@@ -137,72 +170,317 @@ class MultiViewSet:
         return None
 
     def get_refined_csv(self) -> Optional[pd.DataFrame]:
-        csv_path = self.get_current_refined_csv_path()
+        return self.load_refined_csv(self.get_current_refined_csv_path())
+
+    def load_refined_csv(self, csv_path: Optional[Path]) -> Optional[pd.DataFrame]:
+        """라벨 캐시가 켜져 있으면 .npy 캐시를 통해 읽습니다 (CSV가 바뀌었으면 다시 변환)."""
+        if csv_path and self.label_cache is not None:
+            try:
+                return self.label_cache.load(csv_path)
+            except Exception as e:
+                print(f"Refined CSV 파일 읽기 오류: {csv_path} - {e}")
+                return None
+        return self.read_refined_csv(csv_path)
+
+    @staticmethod
+    def read_refined_csv(csv_path: Optional[Path]) -> Optional[pd.DataFrame]:
         if csv_path:
             try:
-                return pd.read_csv(csv_path)
+                with perf.span('csv_parse'):
+                    return pd.read_csv(csv_path)
             except Exception as e:
                 print(f"Refined CSV 파일 읽기 오류: {csv_path} - {e}")
         return None
 
     def get_refined_eo_path(self) -> Optional[str]:
-        scene_name = self.get_scene_name()
-        view_name = self.get_view_name()
+        return self.get_refined_eo_path_for(self.get_scene_index(), self.get_view_name())
+
+    def get_refined_eo_path_for(self, scene_index: int, view_name: str) -> Optional[str]:
+        scene_name = self.__scene_name_list[scene_index]
         target_img_name = f"EO_{scene_name}_{view_name}.png"
-        view_path = self.get_view_path()
-        target_path = pth.join(view_path, target_img_name)
-        
-        if pth.exists(target_path):
-            return target_path
-        return None
+        if not self.manifest.has_view_file(scene_name, view_name, target_img_name): return None
+        return pth.join(self.__scene_path_list[scene_index], view_name, target_img_name)
 
     def get_refined_data_for_view(self, scene_index: int, view_name: str) -> Optional[dict]:
-        original_scene_idx = self.__current_scene_idx
-        original_view_idx = self.__current_view_idx
-        
-        self.__current_scene_idx = scene_index
-        self.__current_view_idx = view_name
+        """
+        한 뷰의 EO 이미지와 Refined CSV를 읽어옵니다.
+        현재 씬/뷰 상태를 건드리지 않으므로 여러 스레드에서 동시에 호출해도 안전합니다.
+        """
+        t_start = time.perf_counter()
+        img_path = self.get_refined_eo_path_for(scene_index, view_name)
+        csv_data = self.load_refined_csv(self.get_refined_csv_path_for(scene_index, view_name))
+        t_csv = time.perf_counter()
 
-        img_path = self.get_refined_eo_path()
-        csv_data = self.get_refined_csv()
-        
-        self.__current_scene_idx = original_scene_idx
-        self.__current_view_idx = original_view_idx
-
-        if img_path and os.path.exists(img_path):
-            image = cv2.imread(img_path)
+        data = None
+        if img_path:
+            # 이미지 캐시가 있으면 디코딩 대신 읽기 전용 memmap을 받습니다.
+            image = self.image_cache.load(img_path) if self.image_cache is not None else decode_rgb(img_path)
             if image is not None:
-                image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-                return {'image': image, 'csv': csv_data}
-        return None
+                data = {'image': image, 'csv': csv_data}
+        t_end = time.perf_counter()
+
+        timing = {
+            'csv_ms': (t_csv - t_start) * 1000,
+            'image_ms': (t_end - t_csv) * 1000,
+            'total_ms': (t_end - t_start) * 1000,
+        }
+        with self.__timings_lock:
+            self.view_load_timings.pop((scene_index, view_name), None)
+            self.view_load_timings[(scene_index, view_name)] = timing
+            while len(self.view_load_timings) > self.VIEW_TIMING_LIMIT:
+                self.view_load_timings.popitem(last=False)
+        return data
+
+    def get_executor(self) -> ThreadPoolExecutor:
+        """이미지 디코딩 / CSV 파싱용 스레드 풀 (cv2, pandas I/O는 GIL을 놓으므로 스레드로 충분합니다)."""
+        if self.__executor is None:
+            self.__executor = ThreadPoolExecutor(max_workers=self.num_workers, thread_name_prefix='mvs-loader')
+        return self.__executor
+
+    def set_num_workers(self, num_workers: int):
+        num_workers = max(1, int(num_workers))
+        if num_workers != self.num_workers:
+            self.shutdown()
+            self.num_workers = num_workers
+
+    def shutdown(self):
+        with self.__inflight_lock:
+            for future in self.__inflight.values():
+                future.cancel()
+            self.__inflight.clear()
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=False)
+            self.__executor = None
+        if self.manifest is not None:
+            self.manifest.flush() # 이번 세션에서 다시 검사한 씬 정보를 기록합니다.
+
+    def get_view_names_for_scene(self, scene_index: int) -> List[str]:
+        # 각도 순으로 정렬합니다 (매니페스트는 문자열 순이라 '330'이 '60'보다 앞에 옵니다).
+        return sorted(self.manifest.view_names(self.__scene_name_list[scene_index]), key=int)
+
+    def get_view_name_list(self) -> List[str]:
+        """현재 씬의 뷰 이름 목록 (각도 순). W/S 이동에 사용합니다."""
+        if self.manifest is None or not self.__scene_name_list: return []
+        return self.get_view_names_for_scene(self.__current_scene_idx)
+
+    def missing_view_names(self, scene_index: int, scene_data: dict) -> List[str]:
+        return [v for v in self.get_view_names_for_scene(scene_index) if v not in scene_data]
+
+    def get_scene_cache_tag(self, scene_index: int) -> str:
+        # 씬 경로 리스트가 셔플/정렬되면 같은 인덱스가 다른 씬을 가리키므로 경로를 태그로 사용합니다.
+        return self.__scene_path_list[scene_index]
+
+    def get_cached_scene(self, scene_index: int) -> Optional[dict]:
+        return self.scene_cache.get(scene_index, self.get_scene_cache_tag(scene_index))
+
+    def submit_view_load(self, scene_index: int, view_name: str) -> Future:
+        """뷰 로딩을 스레드 풀에 제출합니다. 같은 뷰가 이미 로딩 중이면 그 Future를 그대로 돌려줍니다."""
+        key = (scene_index, view_name)
+        with self.__inflight_lock:
+            future = self.__inflight.get(key)
+            if future is not None and not future.cancelled():
+                return future
+            future = self.get_executor().submit(self.get_refined_data_for_view, scene_index, view_name)
+            self.__inflight[key] = future
+
+        def _forget(done_future, key=key):
+            with self.__inflight_lock:
+                if self.__inflight.get(key) is done_future:
+                    del self.__inflight[key]
+        future.add_done_callback(_forget)
+        return future
+
+    def submit_scene_load(self, scene_index: int, first_view: Optional[str] = None,
+                          view_names: Optional[List[str]] = None, cache_when_done: bool = True) -> List[Tuple[str, Future]]:
+        """
+        씬의 모든 뷰(view_names가 주어지면 그 뷰들만) 로딩을 제출하고 (뷰 이름, Future) 리스트를 반환합니다.
+        first_view가 주어지면 가장 먼저 제출하여 먼저 디코딩되도록 합니다.
+        cache_when_done이면 (백그라운드 미리 읽기) 모든 뷰가 정상적으로 끝났을 때 워커 스레드에서 씬 캐시에 저장합니다
+        (이미 캐시된 씬이나 현재 씬이면 그대로 둡니다). 결과를 직접 쓰는 호출자(SceneLoader, preload_scene_data)는
+        False를 주고 자기 스레드에서 cache_scene()을 호출합니다.
+        """
+        view_names = list(view_names) if view_names is not None else self.get_view_names_for_scene(scene_index)
+        if first_view in view_names:
+            view_names.remove(first_view)
+            view_names.insert(0, first_view)
+        futures = [(view_name, self.submit_view_load(scene_index, view_name)) for view_name in view_names]
+        if not futures or not cache_when_done:
+            return futures
+
+        tag = self.get_scene_cache_tag(scene_index)
+        remaining = [len(futures)]
+        counter_lock = threading.Lock()
+
+        def _on_view_done(_):
+            with counter_lock:
+                remaining[0] -= 1
+                if remaining[0]: return
+            if any(f.cancelled() or f.exception() is not None for _, f in futures): return
+            # 현재 씬은 GUI 스레드가 화면에 쓰는 dict로 캐시합니다 (이 스레드에서 압축하면 렌더링과 경쟁).
+            if scene_index == self.get_scene_index() or self.scene_cache.contains(scene_index, tag): return
+            # 같은 Future의 결과를 나중에 화면에서 쓸 수 있으므로, 압축은 뷰 dict의 복사본에만 적용합니다.
+            scene_data = {v: dict(f.result()) for v, f in futures if f.result()}
+            self.cache_scene(scene_index, scene_data, focus_view=first_view or self.base_view_idx, tag=tag)
+
+        for _, future in futures:
+            future.add_done_callback(_on_view_done)
+        return futures
+
+    def cache_scene(self, scene_index: int, scene_data: dict, focus_view: Optional[str] = None, tag=None):
+        """메모리 상한에 맞게 먼 뷰를 압축한 뒤 씬 캐시에 넣습니다."""
+        self.memory_budget.fit_scene(scene_data, focus_view)
+        self.scene_cache.put(scene_index, scene_data, tag=tag if tag is not None else self.get_scene_cache_tag(scene_index))
+
+    def cancel_stale_loads(self, keep_scene_indices):
+        """keep_scene_indices 이외의 씬에 대해 아직 시작되지 않은 로딩 작업을 취소합니다."""
+        keep = set(keep_scene_indices)
+        with self.__inflight_lock:
+            stale = [f for (scene_index, _), f in self.__inflight.items() if scene_index not in keep]
+        for future in stale:
+            future.cancel()
+
+    def prefetch_neighbours(self, direction: int = 0):
+        """
+        현재 씬의 앞뒤(N±1) 씬과, 이동 방향이 주어지면 N+2*direction 씬을 백그라운드로 미리 로딩합니다.
+        이미 캐시되어 있거나 로딩 중인 뷰는 다시 제출하지 않습니다. lazy 모드에서는 씬 전환 시 처음 보게 될 기본 뷰만 읽습니다.
+        """
+        length = len(self.__scene_path_list)
+        if length <= 1: return
+        scene_index = self.get_scene_index()
+        offsets = [direction, -direction, 2 * direction] if direction else [1, -1]
+        for offset in offsets:
+            target = (scene_index + offset) % length
+            if target == scene_index or self.scene_cache.contains(target, self.get_scene_cache_tag(target)):
+                continue
+            view_names = None
+            if self.lazy_loading:
+                view_names = [v for v in self.get_view_names_for_scene(target) if v == str(self.base_view_idx)]
+            try:
+                self.submit_scene_load(target, view_names=view_names)
+            except OSError as e:
+                print(f"prefetch 실패 (Scene #{target}): {e}")
 
     def preload_scene_data(self):
         scene_index = self.get_scene_index()
-        scene_path = self.get_scene_path()
-        
+        tag = self.get_scene_cache_tag(scene_index)
+
+        cached = self.get_cached_scene(scene_index)
+        if cached is not None:
+            self.preloaded_scene_data = cached
+            print(f"\nScene #{scene_index} served from scene cache. {self.format_cache_stats()}")
+            return
+
+        self.cancel_stale_loads([scene_index])
         self.preloaded_scene_data = {} 
-        print(f"\nPre-loading data for Scene #{scene_index}...")
+        t_start = time.perf_counter()
+        futures = self.submit_scene_load(scene_index, cache_when_done=False)
+        print(f"\nPre-loading data for Scene #{scene_index} ({len(futures)} views, {self.num_workers} workers)...")
 
-        view_names = sorted([d for d in os.listdir(scene_path) if d.isdigit()])
+        scene_data = {}
+        for view_name, future in futures:
+            data = future.result()
+            if data:
+                scene_data[view_name] = data
+        wall_ms = (time.perf_counter() - t_start) * 1000
+        self.preloaded_scene_data = scene_data
+        self.cache_scene(scene_index, scene_data, focus_view=self.get_view_name(), tag=tag)
+
+        view_names = sorted(v for v, _ in futures)
         for view_name in view_names:
+            timing = self.view_load_timings.get((scene_index, view_name))
+            if timing:
+                print(f"  view {view_name:>4}: image {timing['image_ms']:7.1f} ms | "
+                      f"csv {timing['csv_ms']:7.1f} ms | total {timing['total_ms']:7.1f} ms")
+        serial_ms = sum(self.view_load_timings[(scene_index, v)]['total_ms'] for v in view_names
+                        if (scene_index, v) in self.view_load_timings)
+        print(f"Pre-loading complete. wall {wall_ms:.1f} ms / sum of views {serial_ms:.1f} ms. {self.format_cache_stats()}")
+        print(self.format_memory_report(scene_data))
+
+    def format_cache_stats(self) -> str:
+        stats = self.scene_cache.stats()
+        return (f"[scene cache] hits={stats['hits']} misses={stats['misses']} evictions={stats['evictions']} "
+                f"entries={stats['entries']} size={stats['bytes'] / 1024 ** 2:.1f}/{stats['max_bytes'] / 1024 ** 2:.0f} MiB")
+
+    def format_memory_report(self, scene_data: Optional[dict] = None) -> str:
+        """뷰별 / 씬 전체 메모리 사용량 (이미지 상태: decoded, compressed, mapped)."""
+        report = self.memory_budget.report(self.preloaded_scene_data if scene_data is None else scene_data)
+        lines = [f"  view {view_name:>4}: image {format_bytes(m['image_bytes']):>10} | csv {format_bytes(m['csv_bytes']):>9} | {m['state']}"
+                 for view_name, m in sorted(report['views'].items(), key=lambda item: int(item[0]))]
+        lines.append(f"[memory] scene heap {format_bytes(report['heap_bytes'])} (limit {format_bytes(self.memory_budget.scene_limit)}), "
+                     f"mapped {format_bytes(report['mapped_bytes'])}, compressed views {report['compressed_views']}/{len(report['views'])}")
+        return '\n'.join(lines)
+
+    def add_view_data(self, view_name: str, data: dict):
+        """현재 씬에 로딩된 뷰를 추가합니다 (GUI 스레드에서 호출). lazy 모드에서는 일부만 로딩된 씬도 씬 캐시에 반영합니다."""
+        self.preloaded_scene_data[view_name] = data
+        if self.lazy_loading:
+            self.cache_scene(self.get_scene_index(), self.preloaded_scene_data, focus_view=self.get_view_name())
+        else:
+            self.memory_budget.fit_scene(self.preloaded_scene_data, self.get_view_name())
+
+    def load_view_now(self, view_name: str) -> Optional[dict]:
+        """lazy 모드: 현재 씬의 뷰 하나를 바로 로딩합니다. 미리 읽기로 이미 로딩 중이면 그 결과를 기다립니다."""
+        scene_index = self.get_scene_index()
+        if view_name not in self.get_view_name_list(): return None
+        try:
+            data = self.submit_view_load(scene_index, view_name).result()
+        except CancelledError:
             data = self.get_refined_data_for_view(scene_index, view_name)
+        if data:
+            self.add_view_data(view_name, data)
+        return data
+
+    def adjacent_view_names(self, direction: int = 0) -> List[str]:
+        """
+        lazy 모드의 미리 읽기 대상: 현재 뷰에서 W/S 이동 방향(direction = -1/+1)으로 1, 2칸과 반대 방향 1칸
+        (방향이 없으면 앞뒤 1칸) 중 아직 로딩되지 않은 뷰입니다.
+        """
+        view_names = self.get_view_name_list()
+        current = self.get_view_name()
+        if current not in view_names: return []
+        idx = view_names.index(current)
+        offsets = [direction, -direction, 2 * direction] if direction else [1, -1]
+        targets = []
+        for offset in offsets:
+            target = idx + offset
+            if 0 <= target < len(view_names) and view_names[target] not in self.preloaded_scene_data:
+                targets.append(view_names[target])
+        return targets
+
+    def load_all_views(self):
+        """lazy 모드에서 씬 전체가 필요할 때 (애니메이션 내보내기 등) 아직 로딩되지 않은 뷰를 병렬로 읽습니다."""
+        scene_index = self.get_scene_index()
+        futures = [(v, self.submit_view_load(scene_index, v))
+                   for v in self.missing_view_names(scene_index, self.preloaded_scene_data)]
+        for view_name, future in futures:
+            try:
+                data = future.result()
+            except CancelledError:
+                data = self.get_refined_data_for_view(scene_index, view_name)
             if data:
-                self.preloaded_scene_data[view_name] = data
-        print("Pre-loading complete.")
+                self.add_view_data(view_name, data)
 
     def get_preloaded_data_for_current_view(self) -> Optional[dict]:
-        return self.preloaded_scene_data.get(self.get_view_name())
+        view_name = self.get_view_name()
+        data = self.preloaded_scene_data.get(view_name)
+        if data is None and self.lazy_loading and self.manifest is not None:
+            return self.load_view_now(view_name) # 처음 보는 뷰: 이 뷰 하나만 디코딩합니다.
+        if data is not None and self.memory_budget.is_compressed(data):
+            # 압축해 둔 뷰로 이동하면 디코딩하고, 상한을 넘으면 이번에는 새 현재 뷰에서 먼 뷰를 압축합니다.
+            self.memory_budget.ensure_decoded(data)
+            self.memory_budget.fit_scene(self.preloaded_scene_data, view_name)
+            scene_index = self.get_scene_index()
+            tag = self.get_scene_cache_tag(scene_index)
+            if self.scene_cache.contains(scene_index, tag):
+                self.scene_cache.put(scene_index, self.preloaded_scene_data, tag=tag) # 크기 다시 계산
+        return data
     
     def get_view_name_path_list(self):
         current_scene_path = self.get_scene_path()
         if not current_scene_path: return [], []
         
-        # 현재 씬 경로에서 숫자로 된 서브디렉토리를 찾아 뷰 이름으로 사용
-        # (예: '0', '30', '330' 등)
-        view_dirs = sorted([
-            d for d in os.listdir(current_scene_path) 
-            if pth.isdir(pth.join(current_scene_path, d)) and d.isdigit()
-        ])
+        # 현재 씬의 숫자 서브디렉토리(예: '0', '30', '330')를 매니페스트에서 가져와 뷰 이름으로 사용
+        view_dirs = self.get_view_names_for_scene(self.__current_scene_idx)
         view_paths = [pth.join(current_scene_path, d) for d in view_dirs]
         
         # 뷰 이름을 int로 변환하여 반환 (armaviewer.py의 self.angle과 호환)
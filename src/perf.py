@@ -0,0 +1,178 @@
+#
+# perf.py
+# arma-rs-utils
+#
+# 주요 경로(디스크 읽기, 디코딩, CSV 파싱, 어노테이션 변환, 그리기, 리사이즈, QPixmap 변환)의 시간 측정과 카운터입니다.
+# 기본은 꺼져 있으며, 꺼져 있을 때 span()은 공유된 빈 컨텍스트를 돌려주므로 비용이 전역 변수 확인 한 번 정도입니다.
+#   AMOD_PERF=1 python src/armaviewer.py                          # 측정 켜기 (F12: HUD 표시)
+#   AMOD_PERF_TRACE=trace.json python src/armaviewer.py           # 종료 시 Chrome trace(chrome://tracing, Perfetto) 저장
+#
+import functools
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+MAX_TRACE_EVENTS = 200000 # 긴 세션에서 메모리가 계속 늘지 않도록 이벤트 수를 제한합니다.
+
+_enabled = False
+_tracing = False
+_lock = threading.Lock()
+_spans: Dict[str, list] = {}  # 이름 -> [횟수, 합계 ms, 최대 ms, 마지막 ms]
+_counters: Dict[str, int] = {}
+_events = []  # Chrome trace 'X' 이벤트
+_t0 = time.perf_counter()
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self): return self
+
+    def __exit__(self, *exc): return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _record(self.name, self.start, time.perf_counter())
+        return False
+
+
+def _record(name: str, start: float, end: float):
+    ms = (end - start) * 1000
+    with _lock:
+        entry = _spans.get(name)
+        if entry is None:
+            _spans[name] = [1, ms, ms, ms]
+        else:
+            entry[0] += 1
+            entry[1] += ms
+            entry[2] = max(entry[2], ms)
+            entry[3] = ms
+        if _tracing and len(_events) < MAX_TRACE_EVENTS:
+            _events.append((name, start, end, threading.get_ident()))
+
+
+def span(name: str):
+    """with perf.span('draw'): ... 측정이 꺼져 있으면 아무 일도 하지 않습니다."""
+    return _Span(name) if _enabled else _NULL_SPAN
+
+
+def timed(name: str):
+    """함수 전체를 span으로 감싸는 데코레이터."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled: return func(*args, **kwargs)
+            with _Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name: str, n: int = 1):
+    if not _enabled: return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def enable(trace: bool = False):
+    global _enabled, _tracing
+    _enabled = True
+    _tracing = _tracing or trace
+
+
+def disable():
+    global _enabled, _tracing
+    _enabled = _tracing = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+        _events.clear()
+
+
+def trace_event_count() -> int:
+    with _lock:
+        return len(_events)
+
+
+def clear_trace():
+    """저장한 trace 이벤트만 버립니다 (span / 카운터 통계는 유지)."""
+    with _lock:
+        _events.clear()
+
+
+def span_stats(name: str) -> Optional[dict]:
+    with _lock:
+        entry = _spans.get(name)
+        if entry is None: return None
+        return {'count': entry[0], 'total_ms': entry[1], 'mean_ms': entry[1] / entry[0], 'max_ms': entry[2], 'last_ms': entry[3]}
+
+
+def counter(name: str) -> int:
+    with _lock:
+        return _counters.get(name, 0)
+
+
+def hit_rate(prefix: str) -> Optional[float]:
+    """'<prefix>.hit' / '<prefix>.miss' 카운터로 적중률을 계산합니다. 기록이 없으면 None."""
+    with _lock:
+        hits, misses = _counters.get(prefix + '.hit', 0), _counters.get(prefix + '.miss', 0)
+    return hits / (hits + misses) if hits + misses else None
+
+
+def summary() -> str:
+    with _lock:
+        spans = sorted(_spans.items(), key=lambda item: -item[1][1])
+        counters = sorted(_counters.items())
+    lines = [f"{'span':<24}{'count':>8}{'total ms':>12}{'mean ms':>10}{'max ms':>10}"]
+    lines += [f'{name:<24}{n:>8}{total:>12.1f}{total / n:>10.2f}{peak:>10.2f}' for name, (n, total, peak, _) in spans]
+    lines += [f'{name:<24}{value:>8}' for name, value in counters]
+    return '\n'.join(lines)
+
+
+def dump_trace(path: str) -> int:
+    """기록된 span을 Chrome trace JSON(chrome://tracing, Perfetto에서 열기)으로 저장하고 이벤트 수를 반환합니다."""
+    with _lock:
+        events = list(_events)
+        counters = dict(_counters)
+    pid = os.getpid()
+    trace = [{'name': name, 'ph': 'X', 'pid': pid, 'tid': tid,
+              'ts': round((start - _t0) * 1e6, 1), 'dur': round((end - start) * 1e6, 1)}
+             for name, start, end, tid in events]
+    trace += [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': thread_name}}
+              for tid, thread_name in _thread_names(events).items()]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms', 'otherData': {'counters': counters}}, f)
+    return len(events)
+
+
+def _thread_names(events) -> Dict[int, str]:
+    alive = {t.ident: t.name for t in threading.enumerate()}
+    return {tid: alive.get(tid, f'thread-{tid}') for tid in {e[3] for e in events}}
+
+
+# 환경 변수로 켠 측정은 세션 내내 유지합니다 (HUD를 닫아도 끄지 않음).
+ENABLED_BY_ENV = bool(os.environ.get('AMOD_PERF') or os.environ.get('AMOD_PERF_TRACE'))
+if ENABLED_BY_ENV:
+    enable(trace=bool(os.environ.get('AMOD_PERF_TRACE')))
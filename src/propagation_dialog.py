@@ -0,0 +1,73 @@
+#
+# propagation_dialog.py
+# arma-rs-utils
+#
+# 다른 뷰로 보정 값을 전파하기 전에 뷰별 적용 객체 수와 적용 결과(노란색: 전파된 박스, 보라색: 원래 박스)를 보여줍니다.
+#
+from typing import Callable, Hashable
+
+import cv2
+import numpy as np
+import qimage2ndarray as q2n
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QPixmap
+from PyQt5.QtWidgets import QDialog, QDialogButtonBox, QHBoxLayout, QLabel, QListWidget, QListWidgetItem, QVBoxLayout
+
+from edit_session import PropagationPlan
+
+PREVIEW_WIDTH = 640
+
+
+class PropagationDialog(QDialog):
+    """
+    plan의 대상 뷰 목록과 선택한 뷰의 미리보기. render_preview(key)는 전파를 적용한 BGR 프레임을 반환해야 합니다.
+    Apply를 누르면 accept()됩니다 (실제 적용과 저장은 호출 측에서).
+    """
+    def __init__(self, parent, plan: PropagationPlan, view_label: Callable[[Hashable], str],
+                 render_preview: Callable[[Hashable], np.ndarray]):
+        super().__init__(parent)
+        self.setWindowTitle('Propagate to Views')
+        self.render_preview = render_preview
+
+        views = [key for key, (target_rows, _) in plan.matches.items() if len(target_rows)]
+        summary = QLabel(f'선택한 객체 {len(plan.rows)}개의 보정 값을 {len(views)}개 뷰의 객체 {plan.object_count}개에 적용하고 '
+                         f'현재 뷰와 함께 _modified.csv로 저장합니다.')
+        summary.setWordWrap(True)
+
+        self.view_list = QListWidget(self)
+        self.view_list.setFixedWidth(190)
+        for key in views:
+            text = f'{view_label(key)} : {len(plan.matches[key][0])}'
+            if plan.missing.get(key): text += f' (없음 {plan.missing[key]})'
+            item = QListWidgetItem(text)
+            item.setData(Qt.UserRole, key)
+            self.view_list.addItem(item)
+        self.view_list.currentItemChanged.connect(self.update_preview)
+
+        self.preview = QLabel(self)
+        self.preview.setFixedWidth(PREVIEW_WIDTH)
+        self.preview.setAlignment(Qt.AlignCenter)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Cancel, self)
+        buttons.addButton('Apply && Save', QDialogButtonBox.AcceptRole)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+
+        body = QHBoxLayout()
+        body.addWidget(self.view_list)
+        body.addWidget(self.preview)
+        layout = QVBoxLayout(self)
+        layout.addWidget(summary)
+        layout.addLayout(body)
+        layout.addWidget(buttons)
+
+        if self.view_list.count(): self.view_list.setCurrentRow(0)
+
+    def update_preview(self, item, _previous=None):
+        if item is None: return
+        canvas = self.render_preview(item.data(Qt.UserRole))
+        if canvas is None:
+            self.preview.setText('이미지를 불러올 수 없습니다.')
+            return
+        rgb = cv2.cvtColor(canvas, cv2.COLOR_BGR2RGB)
+        self.preview.setPixmap(QPixmap(q2n.array2qimage(rgb, normalize=False)))
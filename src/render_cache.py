@@ -0,0 +1,141 @@
+#
+# render_cache.py
+# arma-rs-utils
+#
+import weakref
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+import perf
+import renderer
+
+
+class BaseLayerCache:
+    """
+    뷰별 배경 레이어(표시 해상도로 줄인 BGR 이미지)를 캐시합니다.
+    원본 이미지는 약한 참조로만 가리키므로 캐시가 디코딩된 이미지를 붙잡아 두지 않고 (MemoryBudget이 압축하면 해제됨),
+    해제된 이미지의 id가 재사용되어도 다른 이미지로 오인하지 않습니다.
+    캐시된 배열은 읽기 전용으로 취급해야 하며, 그 위에 그릴 때는 반드시 copy() 해야 합니다.
+    """
+    def __init__(self, max_entries: int = 4):
+        self.max_entries = max_entries
+        self.__entries = OrderedDict()  # id(image) -> {'ref': weakref(image), 'resized': {dsize: ndarray}}
+
+    def __entry(self, image: np.ndarray) -> dict:
+        key = id(image)
+        entry = self.__entries.get(key)
+        if entry is None or entry['ref']() is not image:
+            for dead in [k for k, e in self.__entries.items() if e['ref']() is None]:
+                del self.__entries[dead]
+            entry = {'ref': weakref.ref(image), 'resized': {}}
+            self.__entries[key] = entry
+            while len(self.__entries) > self.max_entries:
+                self.__entries.popitem(last=False)
+        else:
+            self.__entries.move_to_end(key)
+        return entry
+
+    def get_resized(self, image: np.ndarray, dsize: Tuple[int, int]) -> np.ndarray:
+        """dsize(w, h)로 줄인 BGR 배경을 반환합니다. (뷰, dsize) 쌍마다 한 번만 resize 합니다."""
+        entry = self.__entry(image)
+        resized = entry['resized'].get(dsize)
+        perf.count('base_layer.hit' if resized is not None else 'base_layer.miss')
+        if resized is None:
+            with perf.span('resize'):
+                # 사전 로딩된 이미지는 RGB입니다. 줄인 뒤에 채널 순서를 바꿔 원본 해상도 BGR 사본을 만들지 않습니다.
+                resized = cv2.resize(image, dsize=dsize, interpolation=cv2.INTER_AREA)
+                if resized.ndim == 3 and resized.shape[2] == 3:
+                    resized = cv2.cvtColor(resized, cv2.COLOR_RGB2BGR)
+            entry['resized'] = {dsize: resized}  # 해상도가 바뀌면 이전 크기는 버립니다.
+        return resized
+
+    def clear(self):
+        self.__entries.clear()
+
+
+def _row_state(store) -> np.ndarray:
+    """그리기 결과를 바꾸는 행별 상태 (좌표, 변환, 수정/Usable 표시)."""
+    n = len(store)
+    return np.concatenate([store.points.reshape(n, 8), store.translation, store.scale, store.angle.reshape(n, 1),
+                           store.modified.reshape(n, 1), store.usable.reshape(n, 1)], axis=1).astype(np.float64)
+
+
+def _union(rects) -> Optional[Tuple[int, int, int, int]]:
+    rects = [r for r in rects if r is not None]
+    if not rects: return None
+    return (min(r[0] for r in rects), min(r[1] for r in rects), max(r[2] for r in rects), max(r[3] for r in rects))
+
+
+class EditLayerCache:
+    """
+    Edit 모드에서 선택된 객체만 바뀌는 갱신(이동/스케일/회전 버튼)을 위한 증분 렌더링.
+    others: 배경 + 선택되지 않은 객체 + Old BBOX를 그린 레이어. 선택, 옵션, 뷰, 다른 객체가 바뀔 때만 다시 만듭니다.
+    frame: 마지막으로 만든 프레임. 선택된 객체만 바뀌었으면 이전/새 영역의 합집합만 others에서 복원하고 선택된 객체를 다시 그립니다.
+    반환하는 frame은 다음 호출에서 제자리 갱신되므로 읽기 전용으로 취급해야 합니다.
+    """
+    def __init__(self):
+        self.invalidate()
+
+    def invalidate(self):
+        self.__key = None
+        self.__image = None
+        self.__store = None
+        self.__old_objects = None
+        self.__others: Optional[np.ndarray] = None
+        self.__frame: Optional[np.ndarray] = None
+        self.__state: Optional[np.ndarray] = None
+        self.__extents: List[Optional[Tuple[int, int, int, int]]] = []
+
+    def render(self, image: np.ndarray, store, options: 'renderer.RenderOptions', base_cache=None,
+               old_objects=None, pyramid=None) -> Tuple[np.ndarray, Optional[Tuple[int, int, int, int]]]:
+        """
+        renderer.render_view와 같은 프레임과 이번에 바뀐 영역 (x0, y0, x1, y1)을 반환합니다.
+        바뀐 영역이 None이면 프레임 전체가 새로 그려진 것입니다 (바뀐 것이 없으면 빈 영역 (0, 0, 0, 0)).
+        """
+        selected = store.selected & options.edit_mode
+        selected_rows = np.flatnonzero(selected)
+        key = (tuple(sorted(options.checked)), options.show_usable_true,
+               options.show_usable_false, options.edit_mode, options.dsize, options.viewport, tuple(selected_rows))
+        state = _row_state(store)
+        disp_scale, disp_offset = renderer.display_transform(image.shape, options)
+
+        # 저장소/Old BBOX는 id() 대신 참조를 보관해서 비교합니다 (해제된 객체의 id는 재사용될 수 있음).
+        if key == self.__key and self.__image is image and self.__store is store and self.__old_objects is old_objects \
+                and self.__state.shape == state.shape:
+            changed = ((state != self.__state) & ~(np.isnan(state) & np.isnan(self.__state))).any(axis=1)
+            if not changed.any():
+                return self.__frame, (0, 0, 0, 0)
+            if not (changed & ~selected).any():
+                with perf.span('draw_partial'):
+                    polygons = store.transformed_points()
+                    extents = [renderer.object_extent(store, i, options, self.__frame.shape, disp_scale, disp_offset,
+                                                      polygons) for i in selected_rows]
+                    dirty = _union(self.__extents + extents)
+                    if dirty is not None:
+                        x0, y0, x1, y1 = dirty
+                        self.__frame[y0:y1, x0:x1] = self.__others[y0:y1, x0:x1]
+                        renderer.draw_annotations(self.__frame, store, options, disp_scale, None, disp_offset,
+                                                  mask=selected)
+                self.__state = state
+                self.__extents = extents
+                perf.count('edit_layer.partial')
+                return self.__frame, dirty or (0, 0, 0, 0)
+
+        perf.count('edit_layer.full')
+        with perf.span('draw'):
+            others = renderer.render_background(image, options, base_cache, pyramid).copy()
+            if options.checked:
+                renderer.draw_annotations(others, store, options, disp_scale, old_objects, disp_offset, mask=~selected)
+            frame = others.copy()
+            if options.checked:
+                renderer.draw_annotations(frame, store, options, disp_scale, None, disp_offset, mask=selected)
+        self.__key, self.__image, self.__state = key, image, state
+        self.__store, self.__old_objects = store, old_objects
+        self.__others, self.__frame = others, frame
+        polygons = store.transformed_points()
+        self.__extents = [renderer.object_extent(store, i, options, frame.shape, disp_scale, disp_offset, polygons)
+                          for i in selected_rows]
+        return frame, None
@@ -0,0 +1,350 @@
+#
+# renderer.py
+# arma-rs-utils
+#
+# Qt에 의존하지 않는 어노테이션 그리기 모듈입니다. ArmaViewer와 배치 렌더러(batch_render.py)가 함께 사용합니다.
+#
+from typing import Iterable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+import pandas as pd
+
+import perf
+from annotation_object import AnnotationStore, POINT_COLUMNS
+from tile_pyramid import crop_and_scale
+
+# Label 체크박스 순서와 같습니다 (ArmaViewer.checked_list의 값).
+CHECK_CENTER, CHECK_OBOX, CHECK_BBOX, CHECK_MAIN, CHECK_MIDDLE, CHECK_ID, CHECK_ORIGINAL, CHECK_OLD = range(8)
+LABEL_OPTION_NAMES = ('center', 'obox', 'bbox', 'main', 'middle', 'id', 'original', 'old')
+
+FIXED_COLOR_STYLE = {
+    'Armored': [(244,67,54), '-'], 'Armored:APC': [(244,67,54), '-'], 'Armored:ASV': [(239,62,49), '--'],
+    'Armored:IFV': [(234,57,44), '-.'], 'Armored:MRAP': [(229,52,39), ':'], 'Artillery': [(255,51,204), '-'],
+    'Boat': [(156,39,176), '-'], 'Boat:Boat': [(156,39,176), '-'], 'Boat:RHIB': [(151,34,171), '--'],
+    'Helicopter': [(103,58,183), '-'], 'Helicopter:AH': [(103,58,183), '-'], 'Helicopter:CH': [(98,53,178), '--'],
+    'Helicopter:OH': [(93,48,173), '-.'], 'Helicopter:UH': [(88,43,168), ':'], 'LCU': [(63,81,181), '-'],
+    'MLRS': [(33,150,243), '-'], 'Plane': [(0,188,212), '-'], 'Plane:Attacker': [(0,188,212), '-'],
+    'Plane:Bomber': [(0,183,207), '--'], 'Plane:Cargo': [(0,178,202), '-.'], 'Plane:Fighter': [(0,173,197), ':'],
+    'RADAR': [(0,150,136), '-'], 'SAM': [(76,175,80), '-'], 'Self-propelled Artillery': [(139,195,74), '-'],
+    'Support': [(205,220,57), '-'], 'Support:Mil_car': [(205,220,57), '-'],
+    'Support:Mil_truck': [(200,215,52), '--'], 'Support:ASV':[(195,210,47), '-.'],
+    'Tank': [(255,122,0), '-'], 'TEL': [(121,85,72), '-'],
+}
+DEFAULT_COLOR = (100, 100, 100) # 기본 회색
+OLD_BOX_COLOR = (128, 128, 128)
+BLANK_COLOR = 240
+
+
+class RenderOptions:
+    """
+    그리기 옵션. ArmaViewer에서는 체크박스 상태로부터, 배치 렌더러에서는 명령행 인자로부터 만들어집니다.
+    checked: 켜진 Label 항목 (CHECK_* 값들)
+    viewport: 확대 시 화면에 보이는 원본 좌표 영역 (x0, y0, w, h). None이면 프레임 전체.
+    """
+    def __init__(self, checked: Iterable[int] = (CHECK_OBOX,), show_usable_true: bool = True,
+                 show_usable_false: bool = False, edit_mode: bool = False, dsize: Tuple[int, int] = (1280, 720),
+                 viewport: Optional[Tuple[float, float, float, float]] = None):
+        self.checked = set(checked)
+        self.show_usable_true = show_usable_true
+        self.show_usable_false = show_usable_false
+        self.edit_mode = edit_mode
+        self.dsize = tuple(dsize)
+        self.viewport = tuple(viewport) if viewport is not None else None
+
+    @property
+    def show_middle(self) -> bool:
+        return CHECK_MIDDLE in self.checked
+
+
+def get_label_and_color(main_class, middle_class, show_middle: bool):
+    if show_middle:
+        # Middle Class가 Main Class와 같으면 Main Class만 표시
+        # 그렇지 않으면 "Main:Middle" 형식으로 표시
+        label = main_class if main_class == middle_class else f'{main_class}:{middle_class}'
+    else:
+        # Middle Class 체크박스가 비활성화되어 있으면 Main Class만 표시
+        label = main_class
+
+    # 1. 먼저 정확한 label (main:middle 또는 main)로 색상 검색 시도
+    color_entry = FIXED_COLOR_STYLE.get(label)
+
+    # 2. 정확한 label로 못 찾았으면, main_class만으로 다시 검색 시도 (폴백)
+    if color_entry is None:
+        color_entry = FIXED_COLOR_STYLE.get(main_class)
+
+    # 3. 그래도 못 찾았으면, 기본 회색으로 설정
+    color_rgb = DEFAULT_COLOR if color_entry is None else color_entry[0]
+    return label, color_rgb
+
+
+def load_old_boxes(csv_data: Optional[pd.DataFrame]) -> Optional[List[dict]]:
+    """CSV의 *_old 좌표 컬럼으로 Old Data BBOX 목록을 만듭니다. old 컬럼이 없으면 None을 반환합니다."""
+    if csv_data is None or 'x1_old' not in csv_data.columns:
+        return None
+    # 행 단위 iterrows 대신 old 좌표 컬럼을 한 번에 배열로 가져옵니다.
+    has_old = csv_data['x1_old'].notna().to_numpy()
+    old_points = csv_data.loc[has_old, [f'{c}_old' for c in POINT_COLUMNS]].to_numpy(dtype=np.float64)
+    old_points = old_points.reshape(-1, 4, 2).astype(np.int32)
+    if 'id' in csv_data.columns:
+        old_ids = csv_data.loc[has_old, 'id'].tolist()
+    else:
+        old_ids = [f'obj_{idx}' for idx in csv_data.index[has_old]]
+    return [{'points': points, 'id': obj_id} for points, obj_id in zip(old_points, old_ids)]
+
+
+def blank_canvas(dsize: Tuple[int, int]) -> np.ndarray:
+    return np.full((dsize[1], dsize[0], 3), BLANK_COLOR, dtype=np.uint8) # 회색 배경 BGR
+
+
+def resize_background(image: np.ndarray, dsize: Tuple[int, int]) -> np.ndarray:
+    """RGB 원본을 dsize의 BGR 배경으로 만듭니다 (캐시를 쓰지 않는 경우)."""
+    bgr = cv2.cvtColor(image, cv2.COLOR_RGB2BGR) if image.ndim == 3 and image.shape[2] == 3 else image
+    return cv2.resize(bgr, dsize=dsize, interpolation=cv2.INTER_AREA)
+
+
+def display_scale(image_shape, dsize: Tuple[int, int]) -> np.ndarray:
+    orig_h, orig_w = image_shape[:2]
+    return np.array([dsize[0] / orig_w, dsize[1] / orig_h], dtype=np.float32)
+
+
+def display_transform(image_shape, options: RenderOptions):
+    """원본 -> 표시 좌표 변환 (scale, offset): display = (p - offset) * scale"""
+    if options.viewport is None:
+        return display_scale(image_shape, options.dsize), np.zeros(2, dtype=np.float32)
+    x0, y0, vw, vh = options.viewport
+    dsize = options.dsize
+    return (np.array([dsize[0] / vw, dsize[1] / vh], dtype=np.float32),
+            np.array([x0, y0], dtype=np.float32))
+
+
+def viewport_mask(store: AnnotationStore, viewport, margin: float = 0.0) -> np.ndarray:
+    """변환 좌표 또는 원본 좌표의 AABB가 viewport와 겹치는 객체만 True (확대 시 화면 밖 객체는 그리지 않음)."""
+    x0, y0, vw, vh = viewport
+    x0, y0, x1, y1 = x0 - margin, y0 - margin, x0 + vw + margin, y0 + vh + margin
+    transformed = store.bounds()
+    originals = np.concatenate([store.points.min(axis=1), store.points.max(axis=1)], axis=1)
+    mask = np.zeros(len(store), dtype=bool)
+    for b in (transformed, originals):
+        mask |= (b[:, 0] <= x1) & (b[:, 2] >= x0) & (b[:, 1] <= y1) & (b[:, 3] >= y0)
+    return mask
+
+
+def line_style(canvas_width: int) -> Tuple[int, int, int]:
+    """선 두께는 표시 해상도 기준입니다: (기본 두께, 선택된 객체 두께, 글자 두께)."""
+    return max(1, round(canvas_width / 640)), max(2, round(canvas_width / 500)), max(1, round(canvas_width / 1000))
+
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+FONT_SCALE = 0.5
+HANDLE_SIZE = 4 # Edit 모드 스케일 핸들(꼭짓점 사각형)의 반 너비, 표시 픽셀
+ROTATE_HANDLE_DISTANCE = 24 # 회전 핸들이 첫 번째 변의 중점에서 바깥쪽으로 떨어진 거리, 표시 픽셀
+ROTATE_HANDLE_RADIUS = 5
+
+
+def edit_handles(display_polygon: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    선택된 객체의 표시 좌표 폴리곤 (4, 2)으로 편집 핸들 위치를 계산합니다.
+    반환: (꼭짓점 스케일 핸들 (4, 2), 첫 번째 변(0-1)의 중점, 회전 핸들) — 모두 표시 좌표(float).
+    """
+    polygon = np.asarray(display_polygon, dtype=np.float64)
+    center = polygon.mean(axis=0)
+    edge_mid = (polygon[0] + polygon[1]) / 2
+    direction = edge_mid - center
+    length = np.hypot(direction[0], direction[1])
+    direction = direction / length if length > 1e-6 else np.array([0.0, -1.0])
+    return polygon, edge_mid, edge_mid + direction * ROTATE_HANDLE_DISTANCE
+
+
+def handle_at(display_polygon: np.ndarray, point, radius: float = 8.0):
+    """
+    표시 좌표 point 근처의 편집 핸들: ('rotate', None), ('scale', 꼭짓점 번호) 또는 None.
+    회전 핸들이 꼭짓점과 겹치면 회전 핸들이 우선합니다.
+    """
+    corners, _, rotate = edit_handles(display_polygon)
+    point = np.asarray(point, dtype=np.float64)
+    if np.hypot(*(rotate - point)) <= radius: return 'rotate', None
+    distances = np.hypot(*(corners - point).T)
+    corner = int(np.argmin(distances))
+    if distances[corner] <= radius: return 'scale', corner
+    return None
+
+
+def draw_annotations(canvas: np.ndarray, store: AnnotationStore, options: RenderOptions, disp_scale: np.ndarray,
+                     old_objects: Optional[List[dict]] = None, disp_offset: Optional[np.ndarray] = None,
+                     mask: Optional[np.ndarray] = None):
+    """
+    표시 해상도 canvas(BGR) 위에 어노테이션을 그립니다. 좌표는 (p - disp_offset) * disp_scale로 원본 -> 표시 좌표로 옮깁니다.
+    mask(N,)가 주어지면 그 중 True인 객체만 그립니다 (Edit 모드의 선택 객체 / 나머지 객체 레이어).
+    """
+    if not len(store) and not old_objects: return # 정제된 객체가 없어도 Old BBOX는 그립니다.
+    checked = options.checked
+    edit_mode = options.edit_mode
+    offset = np.zeros(2, dtype=np.float32) if disp_offset is None else disp_offset
+
+    def to_display(points):
+        return np.round((points - offset) * disp_scale).astype(np.int32)
+
+    thickness, selected_thickness, font_thickness = line_style(canvas.shape[1])
+    font_scale = FONT_SCALE
+    font = FONT
+
+    def draw_text_with_background(text, pos, text_color=(255, 255, 255), bg_color=(0, 0, 0)):
+        (text_width, text_height), _ = cv2.getTextSize(text, font, font_scale, font_thickness)
+        bg_rect_pt1 = (pos[0], pos[1] - text_height - 4)
+        bg_rect_pt2 = (pos[0] + text_width, pos[1])
+        cv2.rectangle(canvas, bg_rect_pt1, bg_rect_pt2, bg_color, -1)
+        cv2.putText(canvas, text, (pos[0], pos[1] - 3), font, font_scale, text_color, font_thickness, cv2.LINE_AA)
+
+    visible = store.visible_mask(options.show_usable_true, options.show_usable_false)
+    if options.viewport is not None:
+        visible &= viewport_mask(store, options.viewport)
+    if mask is not None:
+        visible &= mask
+    # 모든 객체의 변환 좌표를 한 번에(변경된 객체만 다시) 계산하고 표시 좌표로 옮깁니다.
+    polygons = store.transformed_points()
+    display_polygons = to_display(polygons)
+    display_originals = to_display(store.points)
+
+    for i in np.flatnonzero(visible):
+        label_text, class_color_rgb = get_label_and_color(store.main_class[i], store.middle_class[i], options.show_middle)
+
+        # RGB -> BGR 변환 (OpenCV 그리기 함수는 BGR을 사용)
+        current_draw_color = (class_color_rgb[2], class_color_rgb[1], class_color_rgb[0])
+        is_selected = edit_mode and store.selected[i]
+        if edit_mode:
+            if store.selected[i]:
+                current_draw_color = (0, 255, 0)  # 선택된 객체는 초록색 (BGR)
+            elif store.modified[i]:
+                current_draw_color = (0, 255, 255)  # 수정된 객체는 노란색 (BGR)
+
+        draw_thickness = selected_thickness if is_selected else thickness
+
+        oriented_bbox_points = display_polygons[i]
+        # Edit 모드에서는 원본 좌표를, View 모드에서는 변환된 좌표를 기준으로 중심/AABB/라벨을 그립니다.
+        anchor_points = display_originals[i] if edit_mode else oriented_bbox_points
+
+        render_center = np.mean(anchor_points, axis=0).astype(int)
+        min_x, min_y = np.min(anchor_points, axis=0)
+        max_x, max_y = np.max(anchor_points, axis=0)
+        render_id_pos = (int(render_center[0]) + 8, int(render_center[1]) - 8)
+        render_label_pos = (int(render_center[0]) + 8, int(render_center[1]) + 20)
+
+        # Oriented BBOX 그리기
+        if CHECK_OBOX in checked:
+            cv2.polylines(canvas, [oriented_bbox_points], True, current_draw_color, draw_thickness)
+
+        # 선택된 객체의 편집 핸들 (꼭짓점: 스케일, 바깥쪽 원: 회전)
+        if is_selected:
+            _, edge_mid, rotate = edit_handles((polygons[i] - offset) * disp_scale)
+            edge_mid, rotate = tuple(int(round(v)) for v in edge_mid), tuple(int(round(v)) for v in rotate)
+            for x, y in oriented_bbox_points:
+                cv2.rectangle(canvas, (int(x) - HANDLE_SIZE, int(y) - HANDLE_SIZE),
+                              (int(x) + HANDLE_SIZE, int(y) + HANDLE_SIZE), current_draw_color, -1)
+            cv2.line(canvas, edge_mid, rotate, current_draw_color, 1)
+            cv2.circle(canvas, rotate, ROTATE_HANDLE_RADIUS, current_draw_color, -1)
+
+        # AABB (Axis-Aligned BBox) 그리기
+        if CHECK_BBOX in checked:
+            cv2.rectangle(canvas, (int(min_x), int(min_y)), (int(max_x), int(max_y)), current_draw_color, thickness)
+
+        # Center Point 그리기
+        if CHECK_CENTER in checked:
+            cv2.circle(canvas, (int(render_center[0]), int(render_center[1])), 3, current_draw_color, -1)
+
+        if CHECK_ID in checked:
+            obj_id_text = str(store.ids[i]).replace("id_", "")
+            draw_text_with_background(obj_id_text, render_id_pos)
+
+        if CHECK_MAIN in checked or CHECK_MIDDLE in checked:
+            draw_text_with_background(label_text, render_label_pos)
+
+        if CHECK_ORIGINAL in checked and store.modified[i]:  # Show Original Box
+            cv2.polylines(canvas, [display_originals[i]], True, (255, 0, 255), 1)  # 원본은 보라색 (BGR)
+
+    # Old Data BBOX 그리기 (고정된 회색 (128,128,128) BGR)
+    if CHECK_OLD in checked and old_objects:
+        cv2.polylines(canvas, [to_display(old_obj['points']) for old_obj in old_objects], True, OLD_BOX_COLOR, 1)
+
+
+def object_extent(store: AnnotationStore, index: int, options: RenderOptions, canvas_shape,
+                  disp_scale: np.ndarray, disp_offset: np.ndarray,
+                  polygons: Optional[np.ndarray] = None) -> Optional[Tuple[int, int, int, int]]:
+    """
+    draw_annotations가 객체 하나를 그릴 때 건드릴 수 있는 표시 영역 (x0, y0, x1, y1)을 넉넉하게 계산합니다 (x1, y1 제외).
+    변환 박스, 원본 박스, ID/클래스 글자 배경과 선 두께를 모두 포함하며, canvas 밖이면 None을 반환합니다.
+    여러 객체에 대해 호출할 때는 store.transformed_points()를 한 번 구해서 polygons로 넘깁니다.
+    """
+    if polygons is None: polygons = store.transformed_points()
+    polygon = (polygons[index] - disp_offset) * disp_scale
+    original = (store.points[index] - disp_offset) * disp_scale
+    points = np.concatenate([polygon, original])
+    if options.edit_mode and store.selected[index]:
+        points = np.concatenate([points, edit_handles(polygon)[2][None]]) # 회전 핸들
+    x0, y0 = points.min(axis=0)
+    x1, y1 = points.max(axis=0)
+
+    anchor = original if options.edit_mode else polygon
+    cx, cy = np.round(anchor).astype(np.int32).mean(axis=0)
+    _, selected_thickness, font_thickness = line_style(canvas_shape[1])
+    label_text, _ = get_label_and_color(store.main_class[index], store.middle_class[index], options.show_middle)
+    for text in (str(store.ids[index]).replace("id_", ""), str(label_text)):
+        (text_width, text_height), baseline = cv2.getTextSize(text, FONT, FONT_SCALE, font_thickness)
+        x1 = max(x1, cx + 8 + text_width)
+        y0 = min(y0, cy - 8 - text_height - 4)
+        y1 = max(y1, cy + 20 + baseline)
+
+    margin = selected_thickness + max(4, HANDLE_SIZE, ROTATE_HANDLE_RADIUS) # 두꺼운 선, 안티에일리어싱, 중심점/핸들 크기
+    height, width = canvas_shape[:2]
+    x0, y0 = max(0, int(np.floor(x0)) - margin), max(0, int(np.floor(y0)) - margin)
+    x1, y1 = min(width, int(np.ceil(x1)) + margin + 1), min(height, int(np.ceil(y1)) + margin + 1)
+    if x0 >= x1 or y0 >= y1: return None
+    return x0, y0, x1, y1
+
+
+def render_background(image: np.ndarray, options: RenderOptions, base_cache=None, pyramid=None) -> np.ndarray:
+    """options.dsize 크기의 BGR 배경. 캐시된 배열일 수 있으므로 그 위에 그릴 때는 copy() 해야 합니다."""
+    dsize = options.dsize
+    if options.viewport is not None:
+        with perf.span('resize'):
+            if pyramid is not None:
+                return pyramid.render_region(options.viewport, dsize)
+            return crop_and_scale(image, options.viewport, dsize)
+    if base_cache is not None:
+        return base_cache.get_resized(image, dsize)
+    with perf.span('resize'):
+        return resize_background(image, dsize)
+
+
+def selection_mask(store: AnnotationStore, options: RenderOptions) -> Optional[np.ndarray]:
+    """Edit 모드에서 선택된 객체가 있으면 그 마스크. 선택된 객체는 다른 객체와 Old BBOX 위에 마지막으로 그립니다."""
+    if not options.edit_mode or not store.selected.any(): return None
+    return store.selected.copy()
+
+
+def render_view(image: np.ndarray, store: AnnotationStore, options: RenderOptions, base_cache=None,
+                old_objects: Optional[List[dict]] = None, pyramid=None) -> np.ndarray:
+    """
+    RGB 원본 이미지와 어노테이션으로 options.dsize 크기의 BGR 프레임을 만듭니다.
+    base_cache(render_cache.BaseLayerCache)가 주어지면 축소 배경을 재사용합니다.
+    options.viewport가 있으면 보이는 영역만 배경으로 만들며, pyramid(tile_pyramid.TilePyramid)가 주어지면 보이는 타일만 읽습니다.
+    그릴 것이 없으면 캐시된 배경을 그대로 반환하므로 반환값은 읽기 전용으로 취급해야 합니다.
+    """
+    background = render_background(image, options, base_cache, pyramid)
+
+    if (not len(store) and not old_objects) or not options.checked:
+        # 그릴 오버레이가 없으면 축소 배경을 그대로 사용합니다.
+        return background
+
+    # 모든 그리기 작업은 축소 배경(BGR)의 복사본 위에서, 표시 해상도 좌표로 이루어집니다.
+    with perf.span('draw'):
+        canvas = background.copy()
+        disp_scale, disp_offset = display_transform(image.shape, options)
+        selected = selection_mask(store, options)
+        if selected is None:
+            draw_annotations(canvas, store, options, disp_scale, old_objects, disp_offset)
+        else:
+            # render_cache.EditLayerCache와 같은 순서: 나머지 객체 + Old BBOX, 그 위에 선택된 객체
+            draw_annotations(canvas, store, options, disp_scale, old_objects, disp_offset, mask=~selected)
+            draw_annotations(canvas, store, options, disp_scale, None, disp_offset, mask=selected)
+    return canvas
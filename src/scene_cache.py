@@ -0,0 +1,123 @@
+#
+# scene_cache.py
+# arma-rs-utils
+#
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+import perf
+from memory_budget import image_heap_bytes
+
+
+def estimate_view_bytes(view_data: Optional[dict]) -> int:
+    """한 뷰 데이터({'image': ndarray, 'csv': DataFrame})가 차지하는 메모리(byte)를 추정합니다. memmap/압축 이미지는 힙 사용량 기준."""
+    if not view_data:
+        return 0
+    total = 0
+    image = view_data.get('image')
+    total += image_heap_bytes(image)
+    csv_data = view_data.get('csv')
+    if csv_data is not None:
+        total += int(csv_data.memory_usage(index=True, deep=True).sum())
+    return total
+
+
+def estimate_scene_bytes(scene_data: Optional[dict]) -> int:
+    if not scene_data:
+        return 0
+    return sum(estimate_view_bytes(v) for v in scene_data.values())
+
+
+class SceneCache:
+    """
+    씬 인덱스를 키로 하는 LRU 캐시입니다. 전체 크기가 max_bytes를 넘으면
+    가장 오래 사용되지 않은 씬부터 제거합니다. 백그라운드 스레드에서 put()이 호출되므로 lock으로 보호합니다.
+
+    tag는 같은 인덱스가 다른 씬을 가리키게 된 경우(셔플/정렬 등)를 구분하기 위한 값으로,
+    get() 시 tag가 다르면 miss로 처리하고 해당 항목을 버립니다.
+    """
+    def __init__(self, max_bytes: int = 1536 * 1024 ** 2):
+        self.max_bytes = max_bytes
+        self.__entries = OrderedDict()  # key -> (value, nbytes, tag)
+        self.__total_bytes = 0
+        self.__lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self.__lock:
+            return key in self.__entries
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def contains(self, key: Hashable, tag: Any = None) -> bool:
+        """카운터를 건드리지 않고 유효한 항목이 있는지 확인합니다."""
+        with self.__lock:
+            entry = self.__entries.get(key)
+            return entry is not None and entry[2] == tag
+
+    def get(self, key: Hashable, tag: Any = None) -> Optional[Any]:
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None or entry[2] != tag:
+                if entry is not None:
+                    self.__remove(key)
+                self.misses += 1
+                perf.count('scene_cache.miss')
+                return None
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            perf.count('scene_cache.hit')
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, nbytes: Optional[int] = None, tag: Any = None):
+        if nbytes is None:
+            nbytes = estimate_scene_bytes(value)
+        with self.__lock:
+            if key in self.__entries:
+                self.__remove(key)
+            if nbytes > self.max_bytes:
+                # 씬 하나가 예산보다 크면 캐시하지 않습니다.
+                return
+            self.__entries[key] = (value, nbytes, tag)
+            self.__total_bytes += nbytes
+            while self.__total_bytes > self.max_bytes and len(self.__entries) > 1:
+                oldest = next(iter(self.__entries))
+                self.__remove(oldest)
+                self.evictions += 1
+
+    def discard(self, key: Hashable):
+        with self.__lock:
+            if key in self.__entries:
+                self.__remove(key)
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.__total_bytes = 0
+
+    def total_bytes(self) -> int:
+        return self.__total_bytes
+
+    def keys(self):
+        with self.__lock:
+            return list(self.__entries.keys())
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.__entries),
+            'bytes': self.__total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': (self.hits / lookups) if lookups else 0.0,
+        }
+
+    def __remove(self, key: Hashable):
+        _, nbytes, _ = self.__entries.pop(key)
+        self.__total_bytes -= nbytes
@@ -0,0 +1,108 @@
+#
+# scene_loader.py
+# arma-rs-utils
+#
+import threading
+from typing import List, Optional
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class SceneLoader(QObject):
+    """
+    MultiViewSet의 스레드 풀에서 씬의 뷰들을 비동기로 로딩하고, 뷰 하나가 끝날 때마다 시그널을 보냅니다.
+    시그널은 워커 스레드에서 emit되지만 GUI 스레드의 QObject로 전달되므로 Qt가 자동으로 큐잉합니다.
+
+    load()를 호출할 때마다 generation이 증가하며, 슬롯은 generation이 다른(=이미 지나간) 결과를 무시해야 합니다.
+    """
+    view_loaded = pyqtSignal(int, int, str, object)  # generation, scene_index, view_name, data
+    scene_loaded = pyqtSignal(int, int)  # generation, scene_index
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.generation = 0
+        self.scene_index = -1
+        self.total_views = 0
+        self.finished_views = 0
+        self.__prefetching = set() # lazy 모드에서 미리 읽는 중인 (씬 인덱스, 뷰 이름)
+        self.__lock = threading.Lock()
+
+    def is_loading(self) -> bool:
+        return self.finished_views < self.total_views
+
+    def cancel(self):
+        """진행 중인 로딩 결과를 더 이상 전달하지 않습니다."""
+        with self.__lock:
+            self.generation += 1
+            self.total_views = self.finished_views = 0
+
+    def load(self, ds, scene_index: int, first_view: Optional[str] = None, view_names: Optional[List[str]] = None) -> int:
+        """
+        scene_index의 모든 뷰(view_names가 주어지면 그 뷰들만) 로딩을 시작합니다. first_view가 가장 먼저 디코딩됩니다.
+        다른 씬에 대해 아직 시작되지 않은 작업은 취소합니다.
+        """
+        with self.__lock:
+            self.generation += 1
+            generation = self.generation
+            self.scene_index = scene_index
+            self.total_views = self.finished_views = 0
+
+        ds.cancel_stale_loads([scene_index])
+        # 씬 캐시 저장과 압축은 scene_loaded를 받은 GUI 스레드에서 합니다.
+        futures = ds.submit_scene_load(scene_index, first_view=first_view, view_names=view_names, cache_when_done=False)
+        with self.__lock:
+            if generation == self.generation:
+                self.total_views = len(futures)
+        if not futures:
+            self.scene_loaded.emit(generation, scene_index)
+            return generation
+
+        for view_name, future in futures:
+            future.add_done_callback(
+                lambda f, view_name=view_name: self.__on_view_done(generation, scene_index, view_name, f))
+        return generation
+
+    def prefetch(self, ds, scene_index: int, view_names: List[str]):
+        """
+        lazy 모드: 현재 generation을 유지한 채 view_names를 백그라운드로 읽고, 끝나면 view_loaded를 보냅니다.
+        진행 상황(is_loading)에는 포함하지 않으며 scene_loaded도 보내지 않습니다.
+        """
+        with self.__lock:
+            generation = self.generation
+            view_names = [v for v in view_names if (scene_index, v) not in self.__prefetching]
+            self.__prefetching.update((scene_index, v) for v in view_names)
+        for view_name in view_names:
+            ds.submit_view_load(scene_index, view_name).add_done_callback(
+                lambda f, view_name=view_name: self.__on_prefetch_done(generation, scene_index, view_name, f))
+
+    def __on_prefetch_done(self, generation, scene_index, view_name, future):
+        with self.__lock:
+            self.__prefetching.discard((scene_index, view_name))
+            if generation != self.generation: return
+        if future.cancelled(): return
+        try:
+            data = future.result()
+        except Exception as e:
+            print(f"뷰 로딩 오류 (Scene #{scene_index}, View {view_name}): {e}")
+            return
+        self.view_loaded.emit(generation, scene_index, view_name, data)
+
+    def __on_view_done(self, generation, scene_index, view_name, future):
+        # 취소된 뷰도 끝난 것으로 세어야 is_loading()이 풀리고 scene_loaded가 전달됩니다 (실패와 같이 data=None).
+        if future.cancelled():
+            data = None
+        else:
+            try:
+                data = future.result()
+            except Exception as e:
+                print(f"뷰 로딩 오류 (Scene #{scene_index}, View {view_name}): {e}")
+                data = None
+
+        with self.__lock:
+            if generation != self.generation: return
+            self.finished_views += 1
+            scene_done = self.finished_views >= self.total_views
+
+        self.view_loaded.emit(generation, scene_index, view_name, data)
+        if scene_done:
+            self.scene_loaded.emit(generation, scene_index)
@@ -0,0 +1,108 @@
+#
+# spatial_index.py
+# arma-rs-utils
+#
+import math
+from collections import defaultdict
+from typing import Iterable, Optional
+
+import numpy as np
+
+
+class GridIndex:
+    """
+    AABB(min_x, min_y, max_x, max_y)들에 대한 균일 격자(uniform grid) 공간 인덱스입니다.
+    각 객체는 자신의 AABB가 걸치는 모든 셀에 등록되며, 객체 하나가 움직이면 그 객체의 셀만 갱신합니다.
+    너무 많은 셀에 걸치는 (비정상적으로 큰) 박스는 셀에 등록하지 않고 항상 후보로 반환합니다.
+    """
+    MAX_CELLS_PER_ITEM = 1024
+
+    def __init__(self, cell_size: Optional[float] = None):
+        self.cell_size = cell_size
+        self.__cells = defaultdict(set)  # (cx, cy) -> {index, ...}
+        self.__ranges = {}  # index -> (cx0, cy0, cx1, cy1)
+        self.__oversized = set()
+
+    def __len__(self):
+        return len(self.__ranges)
+
+    @staticmethod
+    def suggest_cell_size(bounds: np.ndarray) -> float:
+        """박스 크기의 중앙값 2배 정도를 셀 크기로 사용합니다 (대부분의 박스가 1~4개 셀에 걸치도록)."""
+        valid = bounds[~np.isnan(bounds).any(axis=1)]
+        if not len(valid): return 64.0
+        extent = np.maximum(valid[:, 2] - valid[:, 0], valid[:, 3] - valid[:, 1])
+        return float(max(16.0, 2.0 * np.median(extent)))
+
+    def build(self, bounds: np.ndarray):
+        if self.cell_size is None:
+            self.cell_size = self.suggest_cell_size(bounds)
+        self.__cells.clear()
+        self.__ranges.clear()
+        self.__oversized.clear()
+        self.update(range(len(bounds)), bounds)
+
+    def update(self, indices: Iterable[int], bounds: np.ndarray):
+        """indices 객체들을 bounds[index]의 새 AABB로 다시 등록합니다."""
+        for index in indices:
+            index = int(index)
+            new_range = self.__cell_range(bounds[index])
+            old_range = self.__ranges.get(index)
+            if new_range == old_range: continue
+            if old_range is not None:
+                self.__unregister(index, old_range)
+            if new_range is not None:
+                self.__register(index, new_range)
+
+    def query_rect(self, min_x: float, min_y: float, max_x: float, max_y: float) -> np.ndarray:
+        """사각형과 같은 셀에 걸친 후보 인덱스들을 오름차순으로 반환합니다 (정확한 교차 검사는 호출 측에서)."""
+        cell_range = self.__cell_range((min_x, min_y, max_x, max_y))
+        if cell_range is None:
+            return np.empty(0, dtype=np.int64)
+        cx0, cy0, cx1, cy1 = cell_range
+        found = set(self.__oversized)
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self.__cells):
+            # 질의 영역이 넓으면 비어 있지 않은 셀만 훑습니다.
+            for (cx, cy), members in self.__cells.items():
+                if cx0 <= cx <= cx1 and cy0 <= cy <= cy1:
+                    found.update(members)
+        else:
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    members = self.__cells.get((cx, cy))
+                    if members: found.update(members)
+        return np.array(sorted(found), dtype=np.int64)
+
+    def query_point(self, x: float, y: float) -> np.ndarray:
+        return self.query_rect(x, y, x, y)
+
+    def __cell_range(self, box):
+        min_x, min_y, max_x, max_y = (float(v) for v in box)
+        if math.isnan(min_x) or math.isnan(min_y) or math.isnan(max_x) or math.isnan(max_y):
+            return None
+        size = self.cell_size
+        return (math.floor(min_x / size), math.floor(min_y / size),
+                math.floor(max_x / size), math.floor(max_y / size))
+
+    def __register(self, index, cell_range):
+        cx0, cy0, cx1, cy1 = cell_range
+        self.__ranges[index] = cell_range
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > self.MAX_CELLS_PER_ITEM:
+            self.__oversized.add(index)
+            return
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                self.__cells[(cx, cy)].add(index)
+
+    def __unregister(self, index, cell_range):
+        cx0, cy0, cx1, cy1 = cell_range
+        del self.__ranges[index]
+        if index in self.__oversized:
+            self.__oversized.discard(index)
+            return
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                members = self.__cells.get((cx, cy))
+                if members is None: continue
+                members.discard(index)
+                if not members: del self.__cells[(cx, cy)]
@@ -0,0 +1,134 @@
+#
+# sweep_export.py
+# arma-rs-utils
+#
+# 한 씬의 look-angle 스윕(Dynamic 재생과 같은 순서)을 GIF/MP4 애니메이션으로 내보냅니다.
+# 프레임은 한 장씩 렌더링하여 바로 인코더로 넘기므로 메모리에 전체 시퀀스를 들고 있지 않습니다.
+#   python src/sweep_export.py /path/to/dataset -o ./sweeps --format gif --fps 2 --size 640x360 --workers 8
+#
+import argparse
+import os
+import os.path as pth
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Iterable, Iterator, Optional
+
+import cv2
+import imageio
+import numpy as np
+
+import batch_render
+import multiviewset as MVS
+import renderer
+
+ANIMATION_FORMATS = ('gif', 'mp4')
+
+
+def sweep_view_order(view_names: Iterable[str]):
+    """ArmaViewer.auto_plot_step과 같은 순서 (숫자 각도 오름차순)."""
+    return sorted(view_names, key=int)
+
+
+def iter_sweep_frames(frame_sources: Iterable, options: renderer.RenderOptions) -> Iterator[np.ndarray]:
+    """
+    (이미지, AnnotationStore, old boxes) 를 하나씩 받아 RGB 프레임을 하나씩 만들어 냅니다.
+    options.dsize가 (0, 0)이면 첫 프레임의 원본 크기를 전체 시퀀스 크기로 사용합니다.
+    """
+    dsize = options.dsize if options.dsize[0] else None
+    for image, store, old_boxes in frame_sources:
+        if dsize is None:
+            dsize = (image.shape[1], image.shape[0])
+        frame_options = renderer.RenderOptions(options.checked, options.show_usable_true, options.show_usable_false,
+                                               options.edit_mode, dsize)
+        frame = renderer.render_view(image, store, frame_options, old_objects=old_boxes)
+        yield cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+
+def open_animation_writer(out_path: str, fps: float):
+    ext = pth.splitext(out_path)[1].lower().lstrip('.')
+    if ext == 'gif':
+        # Pillow GIF writer: duration은 프레임당 ms, loop=0은 무한 반복
+        return imageio.v2.get_writer(out_path, mode='I', duration=1000.0 / fps, loop=0)
+    if ext == 'mp4':
+        try:
+            return imageio.v2.get_writer(out_path, mode='I', fps=fps, codec='libx264', quality=8)
+        except (ImportError, ValueError) as e:
+            raise RuntimeError("MP4 내보내기에는 imageio-ffmpeg가 필요합니다 (pip install imageio-ffmpeg)") from e
+    raise ValueError(f'지원하지 않는 애니메이션 형식입니다: {out_path}')
+
+
+def write_animation(frames: Iterable[np.ndarray], out_path: str, fps: float,
+                    progress: Optional[Callable[[int], None]] = None) -> int:
+    """프레임을 하나씩 인코더로 스트리밍합니다. 기록한 프레임 수를 반환합니다."""
+    written = 0
+    writer = open_animation_writer(out_path, fps)
+    try:
+        for frame in frames:
+            writer.append_data(frame)
+            written += 1
+            if progress is not None: progress(written)
+    finally:
+        writer.close()
+    return written
+
+
+def iter_dataset_sources(ds: MVS.MultiViewSet, scene_index: int, views_arg: str, options: renderer.RenderOptions):
+    """디스크에서 뷰를 하나씩 읽어 프레임 소스를 만듭니다."""
+    view_names = batch_render.select_views(ds.get_view_names_for_scene(scene_index), views_arg)
+    for view_name in sweep_view_order(view_names):
+        loaded = batch_render.load_view(ds, scene_index, view_name, options)
+        if loaded is not None:
+            image, store, old_boxes, _ = loaded
+            yield image, store, old_boxes
+
+
+def export_scene(scene_index: int, views_arg: str, options: renderer.RenderOptions, out_dir: str, ext: str,
+                 fps: float):
+    """워커에서 실행: 씬 하나의 스윕을 out_dir/AMOD_Viewer_<scene>.<ext>로 저장합니다."""
+    ds = batch_render._worker_ds
+    scene_name = ds.get_scene_name_list()[scene_index]
+    out_path = pth.join(out_dir, f'AMOD_Viewer_{scene_name}.{ext}')
+    t_start = time.perf_counter()
+    frames = iter_sweep_frames(iter_dataset_sources(ds, scene_index, views_arg, options), options)
+    written = write_animation(frames, out_path, fps)
+    return scene_name, written, time.perf_counter() - t_start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='AMOD 씬 look-angle 스윕을 GIF/MP4로 내보내기 (GUI 불필요)')
+    batch_render.add_render_arguments(parser)
+    parser.add_argument('--format', choices=ANIMATION_FORMATS, default='gif', help='애니메이션 형식')
+    parser.add_argument('--fps', type=float, default=2.0, help='초당 프레임 수 (Dynamic 재생 기본값 2)')
+    args = parser.parse_args(argv)
+
+    options = batch_render.options_from_args(args)
+    ds = MVS.MultiViewSet(num_workers=1)
+    ds.set_path_and_name(args.dataset)
+    scene_indices = batch_render.select_scenes(ds, args.scenes, args.limit)
+    if not scene_indices:
+        print('내보낼 씬이 없습니다.')
+        return 1
+    os.makedirs(args.out, exist_ok=True)
+
+    workers = max(1, args.workers)
+    print(f'Exporting {len(scene_indices)} scene sweeps ({args.format}, {args.fps:g} fps) with {workers} workers -> {args.out}')
+    t_start = time.perf_counter()
+    total_frames = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=batch_render.init_worker,
+                             initargs=(args.dataset, batch_render.image_cache_bytes_from_args(args))) as executor:
+        futures = [executor.submit(export_scene, i, args.views, options, args.out, args.format, args.fps)
+                   for i in scene_indices]
+        for done, future in enumerate(as_completed(futures), 1):
+            scene_name, written, seconds = future.result()
+            total_frames += written
+            print(f'  [{done}/{len(futures)}] scene {scene_name}: {written} frames in {seconds:.2f} s')
+
+    elapsed = time.perf_counter() - t_start
+    print(f'Done: {len(scene_indices)} sweeps, {total_frames} frames in {elapsed:.2f} s '
+          f'({total_frames / elapsed:.1f} frames/s)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
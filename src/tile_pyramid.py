@@ -0,0 +1,203 @@
+#
+# tile_pyramid.py
+# arma-rs-utils
+#
+# 확대/이동(zoom/pan) 표시를 위한 다중 해상도 타일 피라미드입니다.
+# level k 타일은 원본을 1/2^k로 줄인 영상의 tile_size x tile_size 조각이며, 처음 필요할 때 원본의 해당 영역만
+# 줄여서 만들고 디스크(.npy)에 저장합니다. 화면에 보이는 타일만 읽어서 합성하므로 큰 프레임에서도 메모리 사용량이 일정합니다.
+#
+import math
+import os
+import os.path as pth
+import shutil
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+BLANK_COLOR = 240
+
+
+def crop_and_scale(image: np.ndarray, viewport, dsize: Tuple[int, int], to_bgr: bool = True) -> np.ndarray:
+    """피라미드 없이 원본에서 viewport(x0, y0, w, h) 영역을 dsize로 옮깁니다 (보이는 영역만 변환)."""
+    x0, y0, vw, vh = viewport
+    h, w = image.shape[:2]
+    ix0, iy0 = max(0, int(math.floor(x0))), max(0, int(math.floor(y0)))
+    ix1, iy1 = min(w, int(math.ceil(x0 + vw)) + 1), min(h, int(math.ceil(y0 + vh)) + 1)
+    crop = image[iy0:iy1, ix0:ix1]
+    if to_bgr and crop.ndim == 3 and crop.shape[2] == 3:
+        crop = cv2.cvtColor(crop, cv2.COLOR_RGB2BGR)
+    return _warp(crop, x0 - ix0, y0 - iy0, vw / dsize[0], vh / dsize[1], dsize)
+
+
+def _warp(source: np.ndarray, bx0: float, by0: float, sx: float, sy: float, dsize: Tuple[int, int]) -> np.ndarray:
+    """출력 픽셀 (u, v) <- source (bx0 + u*sx, by0 + v*sy). 소수점 위치까지 맞춰서 확대 시 흔들림이 없도록 합니다."""
+    if sx >= 2 or sy >= 2:
+        # 많이 줄이는 경우 (피라미드 없이 호출된 경우) 에일리어싱을 막기 위해 먼저 INTER_AREA로 줄입니다.
+        fx, fy = max(1, int(sx)), max(1, int(sy))
+        source = cv2.resize(source, (max(1, source.shape[1] // fx), max(1, source.shape[0] // fy)),
+                            interpolation=cv2.INTER_AREA)
+        bx0, by0, sx, sy = bx0 / fx, by0 / fy, sx / fx, sy / fy
+    matrix = np.array([[sx, 0, bx0 + 0.5 * sx - 0.5], [0, sy, by0 + 0.5 * sy - 0.5]], dtype=np.float64)
+    interpolation = cv2.INTER_NEAREST if sx < 0.5 else cv2.INTER_LINEAR  # 크게 확대하면 픽셀 경계를 그대로 보여줍니다.
+    border = (BLANK_COLOR,) * (source.shape[2] if source.ndim == 3 else 1)
+    return cv2.warpAffine(source, matrix, dsize, flags=interpolation | cv2.WARP_INVERSE_MAP,
+                          borderMode=cv2.BORDER_CONSTANT, borderValue=border)
+
+
+class TilePyramid:
+    """
+    원본 RGB 이미지 하나에 대한 타일 피라미드. 타일은 BGR로 저장합니다.
+    tile_dir이 주어지면 만든 타일을 L<k>_<tx>_<ty>.npy로 저장하고 다음에는 memmap으로 읽습니다.
+    """
+    def __init__(self, image: np.ndarray, tile_dir: Optional[str] = None, tile_size: int = 512, max_tiles: int = 64):
+        self.image = image
+        self.height, self.width = image.shape[:2]
+        self.tile_size = tile_size
+        self.tile_dir = tile_dir
+        self.max_tiles = max_tiles
+        self.num_levels = 1 + max(0, math.ceil(math.log2(max(self.height, self.width) / tile_size)))
+        self.__tiles = OrderedDict()  # (level, tx, ty) -> BGR 타일
+        self.__lock = threading.Lock()
+
+    def level_shape(self, level: int) -> Tuple[int, int]:
+        factor = 2 ** level
+        return math.ceil(self.height / factor), math.ceil(self.width / factor)
+
+    def choose_level(self, source_px_per_display_px: float) -> int:
+        """표시 픽셀 하나에 원본 픽셀이 s개 들어가면 2^k <= s인 가장 높은 level을 사용합니다."""
+        if source_px_per_display_px <= 1: return 0
+        return min(self.num_levels - 1, int(math.floor(math.log2(source_px_per_display_px))))
+
+    def get_tile(self, level: int, tx: int, ty: int) -> np.ndarray:
+        key = (level, tx, ty)
+        with self.__lock:
+            tile = self.__tiles.get(key)
+            if tile is not None:
+                self.__tiles.move_to_end(key)
+                return tile
+        tile = self.__load_tile(level, tx, ty)
+        if tile is None:
+            tile = self.__build_tile(level, tx, ty)
+            self.__save_tile(level, tx, ty, tile)
+        with self.__lock:
+            self.__tiles[key] = tile
+            while len(self.__tiles) > self.max_tiles:
+                self.__tiles.popitem(last=False)
+        return tile
+
+    def render_region(self, viewport, dsize: Tuple[int, int]) -> np.ndarray:
+        """원본 좌표 viewport(x0, y0, w, h)를 dsize 크기의 BGR 배경으로 만듭니다. 보이는 타일만 읽습니다."""
+        x0, y0, vw, vh = viewport
+        level = self.choose_level(min(vw / dsize[0], vh / dsize[1]))
+        factor = 2 ** level
+        size = self.tile_size
+        level_h, level_w = self.level_shape(level)
+        lx0, ly0, lx1, ly1 = x0 / factor, y0 / factor, (x0 + vw) / factor, (y0 + vh) / factor
+        tx0, ty0 = max(0, int(lx0 // size)), max(0, int(ly0 // size))
+        tx1 = min(math.ceil(level_w / size) - 1, int(lx1 // size))
+        ty1 = min(math.ceil(level_h / size) - 1, int(ly1 // size))
+
+        mosaic = np.full(((ty1 - ty0 + 1) * size, (tx1 - tx0 + 1) * size, 3), BLANK_COLOR, dtype=np.uint8)
+        for ty in range(ty0, ty1 + 1):
+            for tx in range(tx0, tx1 + 1):
+                tile = self.get_tile(level, tx, ty)
+                oy, ox = (ty - ty0) * size, (tx - tx0) * size
+                mosaic[oy:oy + tile.shape[0], ox:ox + tile.shape[1]] = tile
+        return _warp(mosaic, lx0 - tx0 * size, ly0 - ty0 * size, (vw / factor) / dsize[0], (vh / factor) / dsize[1], dsize)
+
+    def __tile_path(self, level: int, tx: int, ty: int) -> Optional[str]:
+        if self.tile_dir is None: return None
+        return pth.join(self.tile_dir, f'L{level}_{tx}_{ty}.npy')
+
+    def __load_tile(self, level: int, tx: int, ty: int) -> Optional[np.ndarray]:
+        path = self.__tile_path(level, tx, ty)
+        if path is None: return None
+        try:
+            return np.load(path, mmap_mode='r', allow_pickle=False)
+        except (OSError, ValueError):
+            return None
+
+    def __build_tile(self, level: int, tx: int, ty: int) -> np.ndarray:
+        """원본에서 이 타일이 덮는 영역만 잘라 1/2^level로 줄입니다."""
+        factor = 2 ** level
+        span = self.tile_size * factor
+        sx0, sy0 = tx * span, ty * span
+        crop = self.image[sy0:min(self.height, sy0 + span), sx0:min(self.width, sx0 + span)]
+        if factor > 1:
+            out_w, out_h = math.ceil(crop.shape[1] / factor), math.ceil(crop.shape[0] / factor)
+            crop = cv2.resize(crop, (out_w, out_h), interpolation=cv2.INTER_AREA)
+        if crop.ndim == 3 and crop.shape[2] == 3:
+            return cv2.cvtColor(crop, cv2.COLOR_RGB2BGR)
+        return np.ascontiguousarray(crop)
+
+    def __save_tile(self, level: int, tx: int, ty: int, tile: np.ndarray):
+        path = self.__tile_path(level, tx, ty)
+        if path is None: return
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            os.makedirs(self.tile_dir, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                np.save(f, tile, allow_pickle=False)
+            os.replace(tmp_path, path)
+        except OSError:
+            self.tile_dir = None # 쓸 수 없으면 메모리에서만 유지합니다.
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+class TilePyramidCache:
+    """
+    최근 이미지 몇 장의 TilePyramid를 유지합니다 (BaseLayerCache처럼 배열 자체를 키로 사용).
+    root_dir 아래에 이미지마다 '<이름>.<크기>_<mtime_ns>' 폴더를 두며, 폴더가 max_dirs개를 넘으면 오래된 것부터 지웁니다.
+    """
+    def __init__(self, root_dir: Optional[str] = None, max_entries: int = 4, max_dirs: int = 256):
+        self.root_dir = root_dir
+        self.max_entries = max_entries
+        self.max_dirs = max_dirs
+        self.__entries = OrderedDict()  # id(image) -> TilePyramid
+
+    def get(self, image: np.ndarray, image_path: Optional[str] = None) -> TilePyramid:
+        key = id(image)
+        pyramid = self.__entries.get(key)
+        if pyramid is not None and pyramid.image is image:
+            self.__entries.move_to_end(key)
+            return pyramid
+        pyramid = TilePyramid(image, self.__tile_dir_for(image_path))
+        self.__entries[key] = pyramid
+        while len(self.__entries) > self.max_entries:
+            self.__entries.popitem(last=False)
+        return pyramid
+
+    def clear(self):
+        self.__entries.clear()
+
+    def __tile_dir_for(self, image_path: Optional[str]) -> Optional[str]:
+        if self.root_dir is None or not image_path: return None
+        try:
+            st = os.stat(image_path)
+        except OSError:
+            return None
+        stem = pth.splitext(pth.basename(image_path))[0]
+        tile_dir = pth.join(self.root_dir, f'{stem}.{st.st_size}_{st.st_mtime_ns}')
+        if pth.isdir(tile_dir):
+            try:
+                os.utime(tile_dir) # LRU: 마지막 사용 시각 갱신
+            except OSError:
+                pass
+        else:
+            self.__evict_dirs()
+        return tile_dir
+
+    def __evict_dirs(self):
+        try:
+            with os.scandir(self.root_dir) as it:
+                dirs = sorted((entry.stat().st_mtime, entry.path) for entry in it if entry.is_dir())
+        except OSError:
+            return
+        for _, path in dirs[:max(0, len(dirs) - self.max_dirs + 1)]:
+            shutil.rmtree(path, ignore_errors=True)
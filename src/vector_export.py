@@ -0,0 +1,183 @@
+#
+# vector_export.py
+# arma-rs-utils
+#
+# 어노테이션 기하 정보를 래스터화하지 않고 SVG/PDF 벡터 도형으로 내보냅니다.
+# 좌표계는 원본 이미지 픽셀이므로 확대해도 선과 글자가 깨지지 않습니다.
+# 배경 이미지는 SVG에 base64로 포함(embed)하거나 원본 파일을 링크(link)할 수 있습니다.
+#
+import base64
+import os.path as pth
+from typing import List, Optional
+from xml.sax.saxutils import escape, quoteattr
+
+import cv2
+import numpy as np
+
+import renderer
+from annotation_object import AnnotationStore
+
+VECTOR_FORMATS = ('svg', 'pdf')
+IMAGE_MODES = ('embed', 'link', 'none')
+
+
+def build_primitives(image_shape, store: AnnotationStore, options: renderer.RenderOptions,
+                     old_objects: Optional[List[dict]] = None) -> List[dict]:
+    """
+    renderer.draw_annotations와 같은 규칙으로 그릴 도형 목록을 만듭니다 (원본 이미지 좌표, RGB 색상).
+    도형: {'type': 'polygon'|'rect'|'circle'|'text', ...}
+    """
+    primitives = []
+    if not len(store): return primitives
+    checked = options.checked
+    edit_mode = options.edit_mode
+    image_w = image_shape[1]
+    # 화면 표시 기준의 오프셋/글자 크기를 원본 좌표로 환산합니다.
+    unit = image_w / options.dsize[0] if options.dsize[0] else 1.0
+
+    visible = store.visible_mask(options.show_usable_true, options.show_usable_false)
+    polygons = store.transformed_points()
+
+    for i in np.flatnonzero(visible):
+        label_text, color = renderer.get_label_and_color(store.main_class[i], store.middle_class[i], options.show_middle)
+        is_selected = edit_mode and store.selected[i]
+        if edit_mode:
+            if store.selected[i]: color = (0, 255, 0)
+            elif store.modified[i]: color = (255, 255, 0)
+        width = 2.0 if is_selected else 1.0
+
+        anchor = store.points[i] if edit_mode else polygons[i]
+        center = anchor.mean(axis=0)
+        min_xy, max_xy = anchor.min(axis=0), anchor.max(axis=0)
+
+        if renderer.CHECK_OBOX in checked:
+            primitives.append({'type': 'polygon', 'points': polygons[i], 'color': color, 'width': width})
+        if renderer.CHECK_BBOX in checked:
+            primitives.append({'type': 'rect', 'min': min_xy, 'max': max_xy, 'color': color, 'width': 1.0})
+        if renderer.CHECK_CENTER in checked:
+            primitives.append({'type': 'circle', 'center': center, 'r': 3 * unit, 'color': color})
+        if renderer.CHECK_ID in checked:
+            primitives.append({'type': 'text', 'pos': center + np.array([8, -8]) * unit,
+                               'text': str(store.ids[i]).replace("id_", ""), 'size': 12 * unit})
+        if renderer.CHECK_MAIN in checked or renderer.CHECK_MIDDLE in checked:
+            primitives.append({'type': 'text', 'pos': center + np.array([8, 20]) * unit,
+                               'text': str(label_text), 'size': 12 * unit})
+        if renderer.CHECK_ORIGINAL in checked and store.modified[i]:
+            primitives.append({'type': 'polygon', 'points': store.points[i], 'color': (255, 0, 255), 'width': 1.0})
+
+    if renderer.CHECK_OLD in checked and old_objects:
+        for old_obj in old_objects:
+            primitives.append({'type': 'polygon', 'points': old_obj['points'], 'color': renderer.OLD_BOX_COLOR, 'width': 1.0})
+    return primitives
+
+
+def _rgb(color) -> str:
+    return '#%02x%02x%02x' % tuple(int(c) for c in color)
+
+
+def _encode_image(image: np.ndarray, max_side: int, jpeg_quality: int = 90) -> str:
+    """RGB 이미지를 (필요하면 줄여서) JPEG base64 data URI로 만듭니다."""
+    h, w = image.shape[:2]
+    scale = min(1.0, max_side / max(h, w)) if max_side else 1.0
+    if scale < 1.0:
+        image = cv2.resize(image, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+    ok, buf = cv2.imencode('.jpg', cv2.cvtColor(image, cv2.COLOR_RGB2BGR), [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality])
+    if not ok: raise RuntimeError('배경 이미지 인코딩 실패')
+    return 'data:image/jpeg;base64,' + base64.b64encode(buf.tobytes()).decode('ascii')
+
+
+def write_svg(out_path: str, image: np.ndarray, primitives: List[dict], image_mode: str = 'embed',
+              image_path: Optional[str] = None, max_image_side: int = 2048):
+    h, w = image.shape[:2]
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+        f'width="{w}" height="{h}" viewBox="0 0 {w} {h}">',
+    ]
+    if image_mode == 'embed':
+        href = _encode_image(image, max_image_side)
+    elif image_mode == 'link' and image_path:
+        href = pth.relpath(image_path, pth.dirname(pth.abspath(out_path)))
+    else:
+        href = None
+    if href:
+        lines.append(f'<image x="0" y="0" width="{w}" height="{h}" preserveAspectRatio="none" '
+                     f'xlink:href={quoteattr(href)} href={quoteattr(href)}/>')
+
+    # 확대해도 선 두께가 일정하도록 non-scaling-stroke를 사용합니다.
+    lines.append('<g fill="none" vector-effect="non-scaling-stroke">')
+    for p in primitives:
+        kind = p['type']
+        if kind == 'polygon':
+            pts = ' '.join(f'{x:.1f},{y:.1f}' for x, y in np.asarray(p['points'], dtype=np.float64))
+            lines.append(f'<polygon points="{pts}" stroke="{_rgb(p["color"])}" stroke-width="{p["width"]}" '
+                         f'vector-effect="non-scaling-stroke"/>')
+        elif kind == 'rect':
+            (x0, y0), (x1, y1) = p['min'], p['max']
+            lines.append(f'<rect x="{x0:.1f}" y="{y0:.1f}" width="{x1 - x0:.1f}" height="{y1 - y0:.1f}" '
+                         f'stroke="{_rgb(p["color"])}" stroke-width="{p["width"]}" vector-effect="non-scaling-stroke"/>')
+        elif kind == 'circle':
+            cx, cy = p['center']
+            lines.append(f'<circle cx="{cx:.1f}" cy="{cy:.1f}" r="{p["r"]:.1f}" fill="{_rgb(p["color"])}"/>')
+        elif kind == 'text':
+            x, y = p['pos']
+            size = p['size']
+            lines.append(f'<text x="{x:.1f}" y="{y:.1f}" font-family="sans-serif" font-size="{size:.1f}" '
+                         f'fill="#ffffff" stroke="#000000" stroke-width="{size / 4:.1f}" paint-order="stroke">'
+                         f'{escape(p["text"])}</text>')
+    lines.append('</g>')
+    lines.append('</svg>')
+    with open(out_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines))
+
+
+def write_pdf(out_path: str, image: np.ndarray, primitives: List[dict], image_mode: str = 'embed',
+              max_image_side: int = 2048):
+    """matplotlib PDF 백엔드로 기록합니다 (pyplot/GUI 백엔드를 쓰지 않음). PDF는 링크를 지원하지 않아 embed/none만 의미가 있습니다."""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_pdf import FigureCanvasPdf
+    from matplotlib.patches import Circle, Polygon, Rectangle
+
+    h, w = image.shape[:2]
+    dpi = 72
+    fig = Figure(figsize=(w / dpi, h / dpi), dpi=dpi)
+    FigureCanvasPdf(fig)
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.set_xlim(0, w)
+    ax.set_ylim(h, 0)
+    ax.axis('off')
+    if image_mode != 'none':
+        scale = min(1.0, max_image_side / max(h, w)) if max_image_side else 1.0
+        shown = cv2.resize(image, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA) if scale < 1.0 else image
+        ax.imshow(shown, extent=(0, w, h, 0), interpolation='none')
+
+    for p in primitives:
+        kind = p['type']
+        if kind in ('polygon', 'rect', 'circle'):
+            color = tuple(c / 255 for c in p['color'])
+        if kind == 'polygon':
+            ax.add_patch(Polygon(np.asarray(p['points'], dtype=np.float64), closed=True, fill=False,
+                                 edgecolor=color, linewidth=p['width']))
+        elif kind == 'rect':
+            (x0, y0), (x1, y1) = p['min'], p['max']
+            ax.add_patch(Rectangle((x0, y0), x1 - x0, y1 - y0, fill=False, edgecolor=color, linewidth=p['width']))
+        elif kind == 'circle':
+            ax.add_patch(Circle(tuple(p['center']), p['r'], color=color))
+        elif kind == 'text':
+            x, y = p['pos']
+            ax.text(x, y, p['text'], fontsize=p['size'] * 72 / dpi, color='white',
+                    bbox={'facecolor': 'black', 'edgecolor': 'none', 'pad': 1})
+    fig.savefig(out_path, format='pdf', dpi=dpi)
+
+
+def export_view(out_path: str, image: np.ndarray, store: AnnotationStore, options: renderer.RenderOptions,
+                old_objects: Optional[List[dict]] = None, image_mode: str = 'embed', image_path: Optional[str] = None):
+    """확장자(.svg / .pdf)에 따라 뷰 하나를 벡터 파일로 저장합니다."""
+    primitives = build_primitives(image.shape, store, options, old_objects)
+    ext = pth.splitext(out_path)[1].lower().lstrip('.')
+    if ext == 'svg':
+        write_svg(out_path, image, primitives, image_mode, image_path)
+    elif ext == 'pdf':
+        write_pdf(out_path, image, primitives, image_mode)
+    else:
+        raise ValueError(f'지원하지 않는 벡터 형식입니다: {out_path}')